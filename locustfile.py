@@ -3,16 +3,18 @@
 import numpy as np
 from locust import HttpUser, between, tag, task
 
-from italiclas import ml
 from italiclas.config import cfg
+from italiclas.etl import clean_store
 
 GLOBAL_RNG = np.random.default_rng(seed=42)
+# : the (memory-mapped) training dataset
+CLEAN_STORE = clean_store.CleanStore(cfg.data_dir / cfg.clean_filename)
 
 
 def _get_random_text() -> str:
     """Get random text from training dataset."""
-    data = ml.model.training_data(cfg.data_dir / cfg.clean_filename)
-    return data.features.sample(1, random_state=GLOBAL_RNG).iloc[0]
+    i = int(GLOBAL_RNG.integers(len(CLEAN_STORE)))
+    return CLEAN_STORE.texts(i, i + 1)[0]
 
 
 class LocustUser(HttpUser):
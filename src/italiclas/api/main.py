@@ -6,8 +6,8 @@ from contextlib import asynccontextmanager
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware import cors
 
-from italiclas import etl, ml
-from italiclas.api.routers import ping, predict
+from italiclas.api.routers import ping, predict, update
+from italiclas.cli import pipeline
 from italiclas.config import cfg, info
 
 
@@ -15,9 +15,7 @@ from italiclas.config import cfg, info
 async def lifespan(_: FastAPI) -> AsyncGenerator:
     """Manage the application lifespan."""
     # : Startup
-    etl.raw_data.fetcher()
-    etl.clean_data.processor()
-    ml.train()
+    pipeline.run_pipeline()
 
     yield
 
@@ -50,4 +48,6 @@ app.add_middleware(
 router = APIRouter(prefix=cfg.api_base_endpoint)
 router.include_router(ping.router)
 router.include_router(predict.router)
+if cfg.admin_api:
+    router.include_router(update.router)
 app.include_router(router)
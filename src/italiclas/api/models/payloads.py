@@ -1,13 +1,53 @@
 """Payload Models."""
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+from italiclas.config import cfg
+
 
 # ======================================================================
 class PredictPayload(BaseModel):
     """Payload for POST /predict endpoint."""
 
+    text: str = Field(
+        ...,
+        max_length=cfg.max_text_length,
+        json_schema_extra={"example": "questa è una frase in italiano!"},
+    )
+
+
+# ======================================================================
+class SegmentsPayload(BaseModel):
+    """Payload for POST /predict/segments endpoint."""
+
+    text: str = Field(
+        ...,
+        max_length=cfg.max_text_length,
+        json_schema_extra={
+            "example": "Questa è una frase in italiano! This is not.",
+        },
+    )
+    mode: Literal["sentence", "window"] = Field(
+        default="sentence",
+        json_schema_extra={"example": "sentence"},
+    )
+
+
+# ======================================================================
+class LabeledText(BaseModel):
+    """A labeled text sample."""
+
     text: str = Field(
         ...,
         json_schema_extra={"example": "questa è una frase in italiano!"},
     )
+    is_italian: bool = Field(..., json_schema_extra={"example": True})
+
+
+# ======================================================================
+class UpdatePayload(BaseModel):
+    """Payload for POST /update endpoint."""
+
+    samples: list[LabeledText] = Field(..., min_length=1)
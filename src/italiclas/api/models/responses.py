@@ -12,6 +12,46 @@ class PingResponse(BaseModel):
 
 # ======================================================================
 class PredictResponse(BaseModel):
-    """Response of POST /predict endpoint."""
+    """Response of POST /predict endpoint.
+
+    For long texts, predicted progressively, `exited_early` reports if
+    the prediction stopped before processing the whole text.
+    """
 
     is_italian: bool
+    exited_early: bool | None = None
+
+
+# ======================================================================
+class SegmentResponse(BaseModel):
+    """A classified text segment (with character offsets)."""
+
+    start: int
+    end: int
+    is_italian: bool
+    probability: float
+
+
+# ======================================================================
+class SegmentsResponse(BaseModel):
+    """Response of POST /predict/segments endpoint."""
+
+    segments: list[SegmentResponse]
+    italian_fraction: float
+
+
+# ======================================================================
+class CascadeStatsResponse(BaseModel):
+    """Response of GET /predict/stats endpoint."""
+
+    fast: int
+    full: int
+    fast_fraction: float
+
+
+# ======================================================================
+class UpdateResponse(BaseModel):
+    """Response of POST /update endpoint."""
+
+    num_samples: int
+    version: str
@@ -1,12 +1,19 @@
 """Predict endpoint."""
 
 import asyncio
+import dataclasses
 
 from fastapi import APIRouter, HTTPException, status
 
 from italiclas import ml
-from italiclas.api.models.payloads import PredictPayload
-from italiclas.api.models.responses import PredictResponse
+from italiclas.api.models.payloads import PredictPayload, SegmentsPayload
+from italiclas.api.models.responses import (
+    CascadeStatsResponse,
+    PredictResponse,
+    SegmentResponse,
+    SegmentsResponse,
+)
+from italiclas.config import cfg
 from italiclas.logger import logger
 
 router = APIRouter()
@@ -16,19 +23,71 @@ router = APIRouter()
     "/predict",
     status_code=status.HTTP_200_OK,
     response_model=PredictResponse,
+    response_model_exclude_none=True,
 )
 async def predict(payload: PredictPayload) -> PredictResponse:
-    """Predict if the input language is Italian."""
-    logger.info("[API] POST /predict payload: %s", payload)
+    """Predict if the input language is Italian.
+
+    Long texts are predicted progressively, with bounded latency
+    (by the long texts pipeline of the length router, if enabled).
+    """
+    logger.info("[API] POST /predict payload: %.256s", payload)
     try:
+        if len(payload.text) > cfg.progressive_min_length:
+            result = ml.progressive.predict(payload.text)
+            return PredictResponse(
+                is_italian=result.is_italian,
+                exited_early=result.exited_early,
+            )
         prediction = ml.predict(payload.text)
     except FileNotFoundError as e:
         # if a race condition where the model could not be load is met
-        # retrain the model
-        async with asyncio.TaskGroup() as tg:
-            tg.create_task(asyncio.to_thread(ml.train))
+        # retrain the model (the clean data may be missing too)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(asyncio.to_thread(ml.train))
+        except* FileNotFoundError:
+            logger.exception("[API] Could not retrain the model")
         raise HTTPException(
             status_code=503,
             detail="Internal Data Temporarily Unavailable",
         ) from e
     return PredictResponse(is_italian=prediction)
+
+
+@router.post(
+    "/predict/segments",
+    status_code=status.HTTP_200_OK,
+    response_model=SegmentsResponse,
+)
+async def predict_segments(payload: SegmentsPayload) -> SegmentsResponse:
+    """Predict which segments of the input text are Italian."""
+    logger.info("[API] POST /predict/segments payload: %.256s", payload)
+    try:
+        result = await asyncio.to_thread(
+            ml.segmentation.predict,
+            payload.text,
+            payload.mode,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Internal Data Temporarily Unavailable",
+        ) from e
+    return SegmentsResponse(
+        segments=[
+            SegmentResponse(**dataclasses.asdict(segment))
+            for segment in result.segments
+        ],
+        italian_fraction=result.italian_fraction,
+    )
+
+
+@router.get(
+    "/predict/stats",
+    status_code=status.HTTP_200_OK,
+    response_model=CascadeStatsResponse,
+)
+async def predict_stats() -> CascadeStatsResponse:
+    """Get the fraction of predictions handled by each cascade stage."""
+    return CascadeStatsResponse(**ml.cascade.stats())
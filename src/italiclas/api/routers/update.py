@@ -0,0 +1,43 @@
+"""Update endpoint (admin)."""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, status
+
+from italiclas import ml
+from italiclas.api.models.payloads import UpdatePayload
+from italiclas.api.models.responses import UpdateResponse
+from italiclas.logger import logger
+
+router = APIRouter()
+
+
+@router.post(
+    "/update",
+    status_code=status.HTTP_200_OK,
+    response_model=UpdateResponse,
+)
+async def update(payload: UpdatePayload) -> UpdateResponse:
+    """Update the model with new labeled texts."""
+    logger.info("[API] POST /update samples: %d", len(payload.samples))
+    try:
+        filepath = await asyncio.to_thread(
+            ml.update_with,
+            [sample.text for sample in payload.samples],
+            [sample.is_italian for sample in payload.samples],
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Internal Data Temporarily Unavailable",
+        ) from e
+    except ValueError as e:
+        # : the cascade fast stage or the length router are used
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        ) from e
+    return UpdateResponse(
+        num_samples=len(payload.samples),
+        version=filepath.name,
+    )
@@ -4,7 +4,8 @@
 import argparse
 import logging
 
-from italiclas import etl, ml
+from italiclas import ml
+from italiclas.cli import pipeline
 from italiclas.logger import logger
 from italiclas.utils import misc, stopwatch
 
@@ -33,9 +34,7 @@ def main() -> None:
 
     misc.cli_logging(args, __doc__.strip())
 
-    etl.raw_data.fetcher()
-    etl.clean_data.processor()
-    ml.train()
+    pipeline.run_pipeline()
     result = ml.predict(args.text)
     logger.info("'%s' -> is_italian=%s", args.text, result)
     print(result)  # noqa: T201
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""CLI Pipeline Application."""
+
+import argparse
+import functools
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+from italiclas.config import cfg
+from italiclas.etl import clean_data, raw_data
+from italiclas.logger import logger
+from italiclas.ml import training
+from italiclas.utils import core, dag, misc, stopwatch
+
+
+# ======================================================================
+def _train_cascade(
+    full_filepath: Path,
+    data_filepath: Path,
+    cascade_filepath: Path,
+) -> None:
+    """Train the cascade fast stage for the saved full model."""
+    full = core.load_obj(full_filepath)
+    training.train_cascade(full, data_filepath, cascade_filepath)
+
+
+# ======================================================================
+def stages(
+    data_dirpath: Path = cfg.data_dir,
+    ml_dirpath: Path = cfg.ml_dir,
+    *,
+    with_cascade: bool = cfg.ml_cascade,
+    with_router: bool = cfg.ml_router,
+) -> list[dag.Stage]:
+    """Get the stages of the ETL and ML pipeline.
+
+    The raw data is fetched, processed into the clean data, and the ML
+    model pipeline is trained on it; the length router (which does not
+    depend on the ML model pipeline) and the cascade fast stage are
+    trained as separate stages, the latter calibrated against the model
+    it falls back to (the length router, if used).
+
+    Args:
+        data_dirpath: The data directory.
+            Defaults to cfg.data_dir.
+        ml_dirpath: The ML models directory.
+            Defaults to cfg.ml_dir.
+        with_cascade: Also train the cascade fast stage.
+            Defaults to cfg.ml_cascade.
+        with_router: Also train the length router.
+            Defaults to cfg.ml_router.
+
+    Returns:
+        The pipeline stages.
+
+    """
+    raw_filepath = data_dirpath / cfg.raw_filename
+    clean_filepath = data_dirpath / cfg.clean_filename
+    pipeline_filepath = ml_dirpath / cfg.ml_model_pipeline_filename
+    params_filepath = ml_dirpath / cfg.optim_params_filename
+    cascade_filepath = ml_dirpath / cfg.ml_cascade_filename
+    router_filepath = ml_dirpath / cfg.ml_router_filename
+    result = [
+        dag.Stage(
+            "raw_data",
+            functools.partial(
+                raw_data.fetcher,
+                cfg.raw_filename,
+                data_dirpath,
+            ),
+            outputs=[raw_filepath],
+            # : the fetcher checks if the source was modified
+            always=cfg.fetch_revalidate,
+        ),
+        dag.Stage(
+            "clean_data",
+            functools.partial(
+                clean_data.processor,
+                cfg.raw_filename,
+                cfg.clean_filename,
+                data_dirpath,
+                force=True,
+            ),
+            inputs=[raw_filepath],
+            outputs=[clean_filepath],
+        ),
+        dag.Stage(
+            "training",
+            functools.partial(
+                training.train,
+                clean_filepath,
+                pipeline_filepath,
+                params_filepath,
+                with_cascade=False,
+                with_router=False,
+                force=True,
+            ),
+            inputs=[clean_filepath],
+            outputs=[pipeline_filepath],
+        ),
+    ]
+    if with_router:
+        result.append(
+            dag.Stage(
+                "router",
+                functools.partial(
+                    training.train_router,
+                    clean_filepath,
+                    params_filepath,
+                    router_filepath,
+                ),
+                inputs=[clean_filepath],
+                outputs=[router_filepath],
+            ),
+        )
+    if with_cascade:
+        full_filepath = router_filepath if with_router else pipeline_filepath
+        result.append(
+            dag.Stage(
+                "cascade",
+                functools.partial(
+                    _train_cascade,
+                    full_filepath,
+                    clean_filepath,
+                    cascade_filepath,
+                ),
+                inputs=[clean_filepath, full_filepath],
+                outputs=[cascade_filepath],
+            ),
+        )
+    return result
+
+
+# ======================================================================
+def run_pipeline(
+    targets: Iterable[str] | None = None,
+    state_filepath: Path = cfg.ml_dir / cfg.pipeline_state_filename,
+    *,
+    n_jobs: int | None = None,
+    force: bool = False,
+) -> list[dag.StageResult]:
+    """Bring the ETL and ML pipeline artifacts up to date.
+
+    Only the stale stages are run, and the run time of each stage is
+    logged (see `dag.Pipeline`).
+
+    Args:
+        targets: The stages to bring up to date (see `stages()`).
+            If None, all the stages.
+            Defaults to None.
+        state_filepath: The pipeline state filepath.
+            Defaults to cfg.ml_dir/cfg.pipeline_state_filename.
+        n_jobs: The maximum number of stages run in parallel.
+            If None, all the independent stages.
+            Defaults to None.
+        force: Run all the (target) stages, even if up to date.
+            Defaults to False.
+
+    Returns:
+        The stage results, in completion order.
+
+    Examples:
+        >>> run_pipeline()  # doctest: +SKIP
+
+    """
+    pipeline = dag.Pipeline(stages(), state_filepath)
+    return pipeline.run(targets, n_jobs=n_jobs, force=force)
+
+
+# ======================================================================
+def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Handle more command-line application arguments."""
+    arg_parser.add_argument(
+        "targets",
+        metavar="STAGE",
+        type=str,
+        nargs="*",
+        help="stages to bring up to date (all if none) [%(default)s]",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "-s",
+        "--state_filepath",
+        metavar="FILE",
+        type=Path,
+        help="pipeline state filepath [%(default)s]",
+        default=cfg.ml_dir / cfg.pipeline_state_filename,
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--n_jobs",
+        metavar="NUM",
+        type=int,
+        help="maximum number of parallel stages (all if none) [%(default)s]",
+        default=None,
+    )
+    return arg_parser
+
+
+# ======================================================================
+@stopwatch.clockit_log(logger, logging.INFO)
+def main() -> None:
+    """Execute main script."""
+    # : init args and add common parameters
+    arg_parser = misc.common_args(description=__doc__)
+    # : add script parameters
+    arg_parser = more_args(arg_parser)
+    args = arg_parser.parse_args()
+
+    misc.cli_logging(args, __doc__.strip())
+
+    run_pipeline(
+        args.targets or None,
+        args.state_filepath,
+        n_jobs=args.n_jobs,
+        force=args.force,
+    )
+
+
+# ======================================================================
+if __name__ == "__main__":
+    main()
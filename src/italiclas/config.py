@@ -2,6 +2,7 @@
 
 import importlib.metadata
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -64,6 +65,42 @@ class Settings(BaseSettings):
         ...,
         json_schema_extra={"env": "RAW_DATA_SOURCE_FILENAME"},
     )
+    raw_data_source_sha256: str | None = Field(
+        default=None,
+        json_schema_extra={"env": "RAW_DATA_SOURCE_SHA256"},
+    )
+    fetch_chunk_size: int = Field(
+        default=1_048_576,
+        json_schema_extra={"env": "FETCH_CHUNK_SIZE"},
+    )
+    fetch_n_parts: int = Field(
+        default=4,
+        json_schema_extra={"env": "FETCH_N_PARTS"},
+    )
+    fetch_min_part_size: int = Field(
+        default=8_388_608,
+        json_schema_extra={"env": "FETCH_MIN_PART_SIZE"},
+    )
+    fetch_revalidate: bool = Field(
+        default=False,
+        json_schema_extra={"env": "FETCH_REVALIDATE"},
+    )
+    etl_chunk_size: int = Field(
+        default=100_000,
+        json_schema_extra={"env": "ETL_CHUNK_SIZE"},
+    )
+    etl_incremental: bool = Field(
+        default=True,
+        json_schema_extra={"env": "ETL_INCREMENTAL"},
+    )
+    etl_dedup: Literal["none", "exact", "near"] = Field(
+        default="exact",
+        json_schema_extra={"env": "ETL_DEDUP"},
+    )
+    etl_dedup_similarity: float = Field(
+        default=0.8,
+        json_schema_extra={"env": "ETL_DEDUP_SIMILARITY"},
+    )
 
     raw_filename: str = Field(..., json_schema_extra={"env": "RAW_FILENAME"})
     clean_filename: str = Field(
@@ -78,6 +115,148 @@ class Settings(BaseSettings):
         ...,
         json_schema_extra={"env": "OPTIM_PARAMS_FILENAME"},
     )
+    ml_cascade_filename: str = Field(
+        default="cascade_pipeline.pkl.lzma",
+        json_schema_extra={"env": "ML_CASCADE_FILENAME"},
+    )
+    ml_router_filename: str = Field(
+        default="router_pipeline.pkl.lzma",
+        json_schema_extra={"env": "ML_ROUTER_FILENAME"},
+    )
+    pipeline_state_filename: str = Field(
+        default="pipeline_state.json",
+        json_schema_extra={"env": "PIPELINE_STATE_FILENAME"},
+    )
+    feature_store_dirname: str = Field(
+        default="features",
+        json_schema_extra={"env": "FEATURE_STORE_DIRNAME"},
+    )
+    feature_store_max_bytes: int = Field(
+        default=4_294_967_296,
+        json_schema_extra={"env": "FEATURE_STORE_MAX_BYTES"},
+    )
+
+    admin_api: bool = Field(
+        default=False,
+        json_schema_extra={"env": "ADMIN_API"},
+    )
+    max_text_length: int = Field(
+        default=1_000_000,
+        json_schema_extra={"env": "MAX_TEXT_LENGTH"},
+    )
+
+    progressive_min_length: int = Field(
+        default=10_000,
+        json_schema_extra={"env": "PROGRESSIVE_MIN_LENGTH"},
+    )
+    progressive_chunk_size: int = Field(
+        default=2_000,
+        json_schema_extra={"env": "PROGRESSIVE_CHUNK_SIZE"},
+    )
+    progressive_margin: float = Field(
+        default=20.0,
+        json_schema_extra={"env": "PROGRESSIVE_MARGIN"},
+    )
+    progressive_max_chars: int = Field(
+        default=100_000,
+        json_schema_extra={"env": "PROGRESSIVE_MAX_CHARS"},
+    )
+    progressive_max_time: float = Field(
+        default=0.05,
+        json_schema_extra={"env": "PROGRESSIVE_MAX_TIME"},
+    )
+
+    segment_window_size: int = Field(
+        default=200,
+        json_schema_extra={"env": "SEGMENT_WINDOW_SIZE"},
+    )
+    segment_max_length: int = Field(
+        default=1_000,
+        json_schema_extra={"env": "SEGMENT_MAX_LENGTH"},
+    )
+    segment_parallel_min: int = Field(
+        default=2_000,
+        json_schema_extra={"env": "SEGMENT_PARALLEL_MIN"},
+    )
+
+    ml_n_jobs: int = Field(default=1, json_schema_extra={"env": "ML_N_JOBS"})
+    ml_backend: Literal["loky", "threading", "multiprocessing"] = Field(
+        default="loky",
+        json_schema_extra={"env": "ML_BACKEND"},
+    )
+    ml_max_nbytes: str | None = Field(
+        default="1M",
+        json_schema_extra={"env": "ML_MAX_NBYTES"},
+    )
+    ml_feature_cache_bytes: int = Field(
+        default=1_073_741_824,
+        json_schema_extra={"env": "ML_FEATURE_CACHE_BYTES"},
+    )
+    ml_cascade: bool = Field(
+        default=False,
+        json_schema_extra={"env": "ML_CASCADE"},
+    )
+    ml_cascade_agreement: float = Field(
+        default=0.995,
+        json_schema_extra={"env": "ML_CASCADE_AGREEMENT"},
+    )
+    ml_router: bool = Field(
+        default=False,
+        json_schema_extra={"env": "ML_ROUTER"},
+    )
+    ml_router_bounds: list[int] = Field(
+        default=[100],
+        json_schema_extra={"env": "ML_ROUTER_BOUNDS"},
+    )
+    ml_keep_versions: int = Field(
+        default=5,
+        json_schema_extra={"env": "ML_KEEP_VERSIONS"},
+    )
+
+    optim_strategy: Literal["grid", "halving", "random"] = Field(
+        default="halving",
+        json_schema_extra={"env": "OPTIM_STRATEGY"},
+    )
+    optim_max_time: float = Field(
+        default=0.0,
+        json_schema_extra={"env": "OPTIM_MAX_TIME"},
+    )
+    optim_max_candidates: int = Field(
+        default=0,
+        json_schema_extra={"env": "OPTIM_MAX_CANDIDATES"},
+    )
+    optim_patience: int = Field(
+        default=0,
+        json_schema_extra={"env": "OPTIM_PATIENCE"},
+    )
+    optim_warm_start: bool = Field(
+        default=False,
+        json_schema_extra={"env": "OPTIM_WARM_START"},
+    )
+    optim_warm_tol: float = Field(
+        default=0.01,
+        json_schema_extra={"env": "OPTIM_WARM_TOL"},
+    )
+    optim_max_latency: float = Field(
+        default=0.0,
+        json_schema_extra={"env": "OPTIM_MAX_LATENCY"},
+    )
+    optim_max_size: int = Field(
+        default=0,
+        json_schema_extra={"env": "OPTIM_MAX_SIZE"},
+    )
+    optim_sample_size: float = Field(
+        default=0.0,
+        json_schema_extra={"env": "OPTIM_SAMPLE_SIZE"},
+    )
+    optim_sample_strategy: Literal["stratified", "balanced"] = Field(
+        default="stratified",
+        json_schema_extra={"env": "OPTIM_SAMPLE_STRATEGY"},
+    )
+    optim_sample_seed: int = Field(
+        default=0,
+        json_schema_extra={"env": "OPTIM_SAMPLE_SEED"},
+    )
 
     @property
     def api_base_endpoint(self) -> str:
@@ -2,15 +2,21 @@
 """ETL Clean Data."""
 
 import argparse
+import hashlib
+import itertools
+import json
 import logging
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 
 from italiclas.config import cfg
-from italiclas.etl import raw_data
+from italiclas.etl import clean_store, dedup, raw_data
 from italiclas.logger import logger
-from italiclas.utils import misc, stopwatch
+from italiclas.utils import core, misc, stopwatch
 
 
 # ======================================================================
@@ -34,14 +40,623 @@ def is_valid(df: pd.DataFrame) -> bool:
     )
 
 
+# ======================================================================
+def load(
+    filepath: Path,
+    columns: Sequence[str] = clean_store.COLUMNS,
+    *,
+    mmap: bool = True,
+    max_rows: int | None = None,
+) -> pd.DataFrame:
+    """Load (some columns of) the clean data.
+
+    Args:
+        filepath: The clean data filepath: a columnar store directory
+            (see `clean_store.CleanStore`) or a CSV file (if ".csv").
+        columns: The columns to load.
+            Defaults to clean_store.COLUMNS.
+        mmap: Memory-map the store columns (instead of reading them).
+            Defaults to True.
+        max_rows: The maximum number of rows to load.
+            If None, all rows are loaded.
+            Defaults to None.
+
+    Returns:
+        The clean data.
+
+    Raises:
+        FileNotFoundError: if the clean data does not exist.
+
+    """
+    filepath = Path(filepath)
+    if filepath.suffix == ".csv":
+        return pd.read_csv(
+            filepath,
+            usecols=list(columns),
+            dtype={"text": str},
+            nrows=max_rows,
+        )[list(columns)]
+    store = clean_store.CleanStore(filepath, mmap=mmap)
+    return store.read(columns, 0, max_rows)
+
+
+# ======================================================================
+def iter_chunks(
+    filepath: Path,
+    chunk_size: int = 10_000,
+    columns: Sequence[str] = clean_store.COLUMNS,
+    max_rows: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Load (some columns of) the clean data in chunks.
+
+    Only one chunk at a time is kept in memory.
+
+    Args:
+        filepath: The clean data filepath (see `load()`).
+        chunk_size: The number of rows per chunk.
+            Defaults to 10_000.
+        columns: The columns to load.
+            Defaults to clean_store.COLUMNS.
+        max_rows: The maximum number of rows to load.
+            If None, all rows are loaded.
+            Defaults to None.
+
+    Yields:
+        The clean data chunks.
+
+    """
+    filepath = Path(filepath)
+    if filepath.suffix == ".csv":
+        with pd.read_csv(
+            filepath,
+            usecols=list(columns),
+            dtype={"text": str},
+            chunksize=chunk_size,
+            nrows=max_rows,
+        ) as reader:
+            for chunk in reader:
+                yield chunk[list(columns)]
+    else:
+        store = clean_store.CleanStore(filepath)
+        yield from store.iter_chunks(chunk_size, columns, max_rows)
+
+
+# ======================================================================
+def save_chunks(
+    chunks: Iterable[pd.DataFrame],
+    filepath: Path,
+) -> tuple[int, int]:
+    """Save the clean data chunk by chunk, replacing existing data.
+
+    The chunks are appended to a temporary file (or store), which
+    replaces the existing data only once all chunks are written.
+
+    Args:
+        chunks: The clean data chunks.
+        filepath: The clean data filepath: a columnar store directory
+            (see `clean_store.CleanStore`) or a CSV file (if ".csv").
+
+    Returns:
+        The total number of rows and the number of Italian rows.
+
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    # : keep the suffix, which determines the format
+    temp_filepath = filepath.with_name(
+        f".{filepath.stem}.tmp{filepath.suffix}",
+    )
+    clean_store.remove(temp_filepath)
+    num_total = num_italian = 0
+    try:
+        for chunk in chunks:
+            _append(chunk, temp_filepath)
+            num_total += len(chunk)
+            num_italian += int(chunk["is_italian"].sum())
+        if not temp_filepath.exists():
+            # : no chunks
+            _append(pd.DataFrame(columns=clean_store.COLUMNS), temp_filepath)
+        clean_store.replace_store(temp_filepath, filepath)
+    finally:
+        clean_store.remove(temp_filepath)
+    return num_total, num_italian
+
+
+# ======================================================================
+def _append(data: pd.DataFrame, filepath: Path) -> None:
+    """Append clean data to a CSV file (with header if new) or a store."""
+    if filepath.suffix == ".csv":
+        data.to_csv(
+            filepath,
+            mode="a",
+            header=not filepath.exists(),
+            index=False,
+        )
+    else:
+        store = clean_store.CleanStore(filepath)
+        store.append(data["text"], data["is_italian"])
+
+
+# ======================================================================
+def save(data: pd.DataFrame, filepath: Path) -> Path:
+    """Save the clean data, replacing existing data.
+
+    Args:
+        data: The clean data.
+        filepath: The clean data filepath: a columnar store directory
+            (see `clean_store.CleanStore`) or a CSV file (if ".csv").
+
+    Returns:
+        The clean data filepath.
+
+    """
+    save_chunks([data], filepath)
+    return filepath
+
+
+# ======================================================================
+def count_labels(filepath: Path) -> tuple[int, int]:
+    """Count the rows of the clean data.
+
+    For the columnar store, the counts are read from its metadata,
+    otherwise the labels are read in chunks.
+
+    Args:
+        filepath: The clean data filepath (see `load()`).
+
+    Returns:
+        The total number of rows and the number of Italian rows.
+
+    """
+    filepath = Path(filepath)
+    if filepath.suffix != ".csv":
+        meta = clean_store.CleanStore(filepath).meta
+        return meta["num_rows"], meta["num_italian"]
+    num_total = num_italian = 0
+    for chunk in iter_chunks(filepath, columns=["is_italian"]):
+        num_total += len(chunk)
+        num_italian += int(chunk["is_italian"].sum())
+    return num_total, num_italian
+
+
+# ======================================================================
+def clean_chunk(data: pd.DataFrame) -> pd.DataFrame:
+    """Clean (a chunk of) the raw data.
+
+    Args:
+        data: The raw data.
+
+    Returns:
+        The clean data.
+
+    Raises:
+        ValueError: if the content of the raw data cannot be processed
+
+    Examples:
+        >>> raw = pd.DataFrame({"Text": ["ciao"], "Language": ["Italian"]})
+        >>> clean_chunk(raw)
+           text  is_italian
+        0  ciao        True
+
+    """
+    data = data.rename(columns=str.lower)
+    if not raw_data.is_valid(data):
+        msg = (
+            "Invalid raw data input: expecting columns "
+            "['text', 'language'] (case ignored) of string data type."
+        )
+        raise ValueError(msg)
+    data["is_italian"] = data["language"] == "Italian"
+    return data[["text", "is_italian"]]
+
+
+# ======================================================================
+def iter_clean_chunks(
+    raw_filepath: Path,
+    chunk_size: int = cfg.etl_chunk_size,
+    checksums: list[dict[str, Any]] | None = None,
+    duplicates: dedup.DuplicateFilter | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Clean the raw data chunk by chunk.
+
+    Only one chunk at a time is kept in memory.
+
+    Args:
+        raw_filepath: The raw data filepath.
+        chunk_size: The number of rows per chunk.
+            Defaults to cfg.etl_chunk_size.
+        checksums: The list where to collect the raw chunks sizes and
+            checksums (see `chunk_checksum()`).
+            If None, they are not computed.
+            Defaults to None.
+        duplicates: The filter of the duplicate texts.
+            If None, duplicates are kept.
+            Defaults to None.
+
+    Yields:
+        The clean data chunks.
+
+    Raises:
+        ValueError: if the content of the raw data cannot be processed
+
+    """
+    # : as strings, since the types inferred per chunk may differ
+    with pd.read_csv(
+        raw_filepath,
+        dtype=str,
+        chunksize=chunk_size,
+    ) as reader:
+        for chunk in reader:
+            data = _clean(chunk, duplicates)
+            if checksums is not None:
+                checksums.append(
+                    {
+                        "num_rows": len(chunk),
+                        "num_clean": len(data),
+                        "sha256": chunk_checksum(chunk),
+                    },
+                )
+            yield data
+
+
+# ======================================================================
+def _clean(
+    data: pd.DataFrame,
+    duplicates: dedup.DuplicateFilter | None,
+) -> pd.DataFrame:
+    """Clean (a chunk of) the raw data, removing duplicates."""
+    data = clean_chunk(data)
+    if duplicates is not None:
+        data = data[duplicates.filter(data["text"])]
+    return data
+
+
+# ======================================================================
+def chunk_checksum(data: pd.DataFrame) -> str:
+    """Compute the checksum of (a chunk of) the raw data.
+
+    The checksum depends on the columns and on the row values,
+    but not on the index.
+
+    Args:
+        data: The raw data.
+
+    Returns:
+        The SHA-256 hex digest.
+
+    Examples:
+        >>> data = pd.DataFrame({"Text": ["ciao"], "Language": ["Italian"]})
+        >>> chunk_checksum(data) == chunk_checksum(data.set_axis([5]))
+        True
+
+    """
+    digest = hashlib.sha256(",".join(data.columns).encode("utf-8"))
+    hashes = pd.util.hash_pandas_object(data, index=False)
+    digest.update(hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# ======================================================================
+def manifest_filepath(clean_filepath: Path) -> Path:
+    """Get the processing manifest filepath, next to the clean data.
+
+    Args:
+        clean_filepath: The clean data filepath.
+
+    Returns:
+        The processing manifest filepath.
+
+    Examples:
+        >>> print(manifest_filepath(Path("data/clean_data")))
+        data/clean_data.manifest.json
+
+    """
+    return clean_filepath.with_name(f"{clean_filepath.name}.manifest.json")
+
+
+# ======================================================================
+def load_manifest(clean_filepath: Path) -> dict[str, Any] | None:
+    """Load the processing manifest of the clean data.
+
+    Args:
+        clean_filepath: The clean data filepath.
+
+    Returns:
+        The processing manifest, or None if missing or invalid.
+
+    """
+    try:
+        return json.loads(manifest_filepath(clean_filepath).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+# ======================================================================
+def _save_manifest(clean_filepath: Path, manifest: dict[str, Any]) -> None:
+    """Save the processing manifest atomically."""
+    filepath = manifest_filepath(clean_filepath)
+    temp_filepath = filepath.with_name(f".{filepath.name}.tmp")
+    temp_filepath.write_text(json.dumps(manifest, indent=2))
+    temp_filepath.replace(filepath)
+
+
+# ======================================================================
+def _is_reusable(
+    manifest: dict[str, Any] | None,
+    raw_filepath: Path,
+    clean_filepath: Path,
+    chunk_size: int,
+    duplicates: dedup.DuplicateFilter,
+) -> bool:
+    """Check if the clean data matches its processing manifest."""
+    return (
+        manifest is not None
+        and clean_filepath.suffix != ".csv"
+        and clean_store.CleanStore(clean_filepath).exists
+        and manifest.get("raw") == raw_filepath.name
+        and manifest.get("chunk_size") == chunk_size
+        and manifest.get("dedup") == _dedup_settings(duplicates)
+        and len(clean_store.CleanStore(clean_filepath))
+        == sum(chunk["num_clean"] for chunk in manifest["chunks"])
+    )
+
+
+# ======================================================================
+def _dedup_settings(duplicates: dedup.DuplicateFilter) -> dict[str, Any]:
+    """Get the duplicate filter settings (for the manifest)."""
+    return {"mode": duplicates.mode, "similarity": duplicates.similarity}
+
+
+# ======================================================================
+def update_chunks(
+    raw_filepath: Path,
+    clean_filepath: Path,
+    chunk_size: int,
+    manifest: dict[str, Any],
+    duplicates: dedup.DuplicateFilter | None = None,
+) -> dict[str, Any]:
+    """Clean only the new or changed raw data chunks.
+
+    The raw data chunks are compared with the checksums of the manifest:
+    the clean data of the leading unchanged chunks is kept, while the
+    following chunks are cleaned and appended to the clean data store.
+    A grown last chunk (i.e. rows appended to the raw data) only has its
+    new rows cleaned.
+    New texts duplicating kept texts are removed too.
+
+    Args:
+        raw_filepath: The raw data filepath.
+        clean_filepath: The clean data store directory.
+        chunk_size: The number of raw data rows per chunk.
+        manifest: The processing manifest of the clean data.
+        duplicates: The filter of the duplicate texts.
+            If None, duplicates are kept.
+            Defaults to None.
+
+    Returns:
+        The new processing manifest.
+
+    Raises:
+        ValueError: if the content of the raw data cannot be processed
+
+    """
+    store = clean_store.CleanStore(clean_filepath)
+    old_chunks = manifest["chunks"]
+    chunks = []
+    num_kept = 0
+    is_unchanged = True
+    # : as strings, since the types inferred per chunk may differ
+    with pd.read_csv(
+        raw_filepath,
+        dtype=str,
+        chunksize=chunk_size,
+    ) as reader:
+        for i, chunk in enumerate(reader):
+            checksum = chunk_checksum(chunk)
+            entry = {
+                "num_rows": len(chunk),
+                "num_clean": 0,
+                "sha256": checksum,
+            }
+            chunks.append(entry)
+            new_chunk = chunk
+            if is_unchanged and i < len(old_chunks):
+                old_chunk = old_chunks[i]
+                num_old = old_chunk["num_rows"]
+                if checksum == old_chunk["sha256"] or (
+                    len(chunk) > num_old
+                    and chunk_checksum(chunk.iloc[:num_old])
+                    == old_chunk["sha256"]
+                ):
+                    entry["num_clean"] = old_chunk["num_clean"]
+                    num_kept += old_chunk["num_clean"]
+                    new_chunk = chunk.iloc[num_old:]
+                    if new_chunk.empty:
+                        continue
+            if is_unchanged:
+                is_unchanged = False
+                store.truncate(num_kept)
+                if duplicates is not None:
+                    for data in store.iter_chunks(chunk_size, ["text"]):
+                        duplicates.add(data["text"])
+            data = _clean(new_chunk, duplicates)
+            store.append(data["text"], data["is_italian"])
+            entry["num_clean"] += len(data)
+    if is_unchanged:
+        # : e.g. raw data rows removed from the end
+        store.truncate(num_kept)
+    num_old_total = sum(chunk["num_clean"] for chunk in old_chunks)
+    logger.info(
+        "[ETL] Raw data chunks: %d unchanged rows, %d new rows",
+        num_kept,
+        len(store) - num_kept,
+    )
+    return {
+        **manifest,
+        "chunks": chunks,
+        "delta": {
+            "start": num_kept,
+            "stop": len(store),
+            "append": num_kept == num_old_total,
+        },
+    }
+
+
+# ======================================================================
+def load_delta(clean_filepath: Path) -> pd.DataFrame | None:
+    """Load the clean data rows appended by the last processing.
+
+    Args:
+        clean_filepath: The clean data filepath.
+
+    Returns:
+        The appended clean data (possibly empty), or None if the last
+        processing has also changed or removed existing rows (or if
+        unknown), in which case a full retraining is needed.
+
+    """
+    manifest = load_manifest(clean_filepath)
+    if manifest is None or not manifest["delta"]["append"]:
+        return None
+    store = clean_store.CleanStore(clean_filepath)
+    start = manifest["delta"]["start"]
+    stop = manifest["delta"]["stop"]
+    if not store.exists or len(store) != stop:
+        return None
+    return store.read(clean_store.COLUMNS, start, stop)
+
+
+# ======================================================================
+def delta_id(clean_filepath: Path) -> str | None:
+    """Get the identifier of the clean data delta of the last processing.
+
+    The identifier is a hash of the raw data chunks checksums and of the
+    delta rows range in the processing manifest, hence it changes with
+    each processing of new (or changed) raw data.
+
+    Args:
+        clean_filepath: The clean data filepath.
+
+    Returns:
+        The delta identifier, or None if the manifest is missing.
+
+    """
+    manifest = load_manifest(clean_filepath)
+    if manifest is None:
+        return None
+    content = {"chunks": manifest["chunks"], "delta": manifest["delta"]}
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True).encode("utf-8"),
+    ).hexdigest()
+
+
+# ======================================================================
+def export_csv(
+    filepath: Path,
+    csv_filepath: Path,
+    chunk_size: int = 10_000,
+) -> Path:
+    """Export the clean data store to CSV, for compatibility.
+
+    Args:
+        filepath: The clean data store directory.
+        csv_filepath: The output CSV filepath.
+        chunk_size: The number of rows per chunk.
+            Defaults to 10_000.
+
+    Returns:
+        The CSV filepath.
+
+    """
+    logger.info("[ETL] Export clean data to '%s'", csv_filepath)
+    return clean_store.CleanStore(filepath).to_csv(csv_filepath, chunk_size)
+
+
+# ======================================================================
+def profile_formats(
+    filepath: Path = cfg.data_dir / cfg.clean_filename,
+    repeats: int = 3,
+) -> list[dict[str, Any]]:
+    """Compare the size and load time of the store and of the CSV formats.
+
+    The clean data store is exported to a temporary CSV file, and the
+    best load times (of `repeats`) are measured for all the columns
+    and for the labels only.
+
+    Args:
+        filepath: The clean data store directory.
+            Defaults to cfg.data_dir/cfg.clean_filename.
+        repeats: The number of timing repetitions.
+            Defaults to 3.
+
+    Returns:
+        The measurements, one per format and columns.
+
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as dirpath:
+        csv_filepath = export_csv(filepath, Path(dirpath) / "clean_data.csv")
+        sizes = {
+            "csv": csv_filepath.stat().st_size,
+            "store": clean_store.CleanStore(filepath).nbytes,
+            "store (no mmap)": clean_store.CleanStore(filepath).nbytes,
+        }
+        for fmt, columns in itertools.product(
+            sizes,
+            (clean_store.COLUMNS, ("is_italian",)),
+        ):
+            source = csv_filepath if fmt == "csv" else filepath
+            elapsed = min(
+                core.measure(
+                    load,
+                    source,
+                    columns,
+                    mmap=fmt == "store",
+                )[1]
+                for _ in range(repeats)
+            )
+            logger.info(
+                "[ETL] Format=%s columns=%s: size=%sB, load time=%ss",
+                fmt,
+                ",".join(columns),
+                core.number2str(sizes[fmt]),
+                core.number2str(elapsed),
+            )
+            results.append(
+                {
+                    "format": fmt,
+                    "columns": columns,
+                    "size": sizes[fmt],
+                    "time": elapsed,
+                },
+            )
+    return results
+
+
+# ======================================================================
+def _log_duplicates(duplicates: dedup.DuplicateFilter) -> None:
+    """Log how many duplicates were removed."""
+    counts = duplicates.counts
+    if duplicates.mode != "none" and counts["total"]:
+        logger.info(
+            "[ETL] Duplicates: exact=%d, near=%d; removed %.2f%% of %d rows",
+            counts["exact"],
+            counts["near"],
+            100 * (counts["total"] - counts["kept"]) / counts["total"],
+            counts["total"],
+        )
+
+
 # ======================================================================
 @stopwatch.clockit_log(logger, logging.INFO)
-def processor(
+def processor(  # noqa: PLR0913
     raw_filename: str = cfg.raw_filename,
     clean_filename: str = cfg.clean_filename,
     dirpath: Path = cfg.data_dir,
     *,
     force: bool = False,
+    chunk_size: int = cfg.etl_chunk_size,
+    incremental: bool = cfg.etl_incremental,
+    dedup_mode: dedup.DedupType = cfg.etl_dedup,
 ) -> Path | None:
     """Clean data by preprocessing the raw data.
 
@@ -50,6 +665,22 @@ def processor(
      - 'Text' contain free-form non-cleaned text.
      - 'Language' contain the main language in English
 
+    The raw data is read, validated and cleaned in chunks, which are
+    appended to the clean data, hence the peak memory depends on the
+    chunk size, and not on the raw data size.
+    The clean data is saved as a columnar store (see `save_chunks()`),
+    or as CSV if the clean filename ends with ".csv".
+
+    The size and checksum of the raw data chunks are stored in a manifest
+    next to the clean data (see `manifest_filepath()`): when processing
+    incrementally, only new or changed chunks are cleaned and appended
+    to the clean data store (see `update_chunks()`).
+    The manifest also records the rows appended by the last processing
+    (the delta), for incremental model updates (see `load_delta()`).
+
+    Exact and near duplicate texts are removed while cleaning
+    (see `dedup.DuplicateFilter`), with bounded memory.
+
     Args:
         raw_filename: The input raw data filename.
             It must exists in 'dirpath'.
@@ -57,7 +688,19 @@ def processor(
             It will be created in 'dirpath'.
         dirpath: The directory where to store the data.
         force: Force new computation.
+            Otherwise, the clean data is computed only if missing or older
+            than the raw data.
             Defaults to False.
+        chunk_size: The number of raw data rows per chunk.
+            Defaults to cfg.etl_chunk_size.
+        incremental: Clean only the new or changed raw data chunks.
+            Otherwise (or if the clean data does not match its manifest,
+            or it is CSV), all the raw data is cleaned.
+            Defaults to cfg.etl_incremental.
+        dedup_mode: The duplicate texts to remove
+            (see `dedup.DuplicateFilter`), with the similarity threshold
+            of near duplicates from cfg.etl_dedup_similarity.
+            Defaults to cfg.etl_dedup.
 
     Returns:
         The path to the clean data file.
@@ -66,37 +709,63 @@ def processor(
         ValueError: if the content of the raw data cannot be processed
     Examples:
         >>> data_cleaner()  # doctest: +SKIP
-        PosixPath('artifacts/data/clean_data.csv')
+        PosixPath('artifacts/data/clean_data')
 
     """
     raw_filepath = dirpath / raw_filename
     clean_filepath = dirpath / clean_filename
-    if force or not clean_filepath.is_file():
+    if force or core.is_outdated(clean_filepath, raw_filepath):
         logger.info("[ETL] Cleaning data '%s'", raw_filepath)
-        data = pd.read_csv(raw_filepath).rename(columns=str.lower)
-        if raw_data.is_valid(data):
-            data["is_italian"] = data["language"] == "Italian"
-            data = data[["text", "is_italian"]]
-            logger.info(data.columns)
-            data.to_csv(clean_filepath, index=False)
-            logger.info("[ETL] Clean data stored to '%s'", clean_filepath)
+        manifest = load_manifest(clean_filepath) if incremental else None
+        duplicates = dedup.DuplicateFilter(
+            dedup_mode,
+            cfg.etl_dedup_similarity,
+        )
+        if _is_reusable(
+            manifest,
+            raw_filepath,
+            clean_filepath,
+            chunk_size,
+            duplicates,
+        ):
+            manifest = update_chunks(
+                raw_filepath,
+                clean_filepath,
+                chunk_size,
+                manifest,
+                duplicates,
+            )
+            num_total, num_italian = count_labels(clean_filepath)
         else:
-            msg = (
-                "Invalid raw data input: expecting columns "
-                "['text', 'language'] (case ignored) of string data type."
+            chunks: list[dict[str, Any]] = []
+            num_total, num_italian = save_chunks(
+                iter_clean_chunks(
+                    raw_filepath,
+                    chunk_size,
+                    chunks,
+                    duplicates,
+                ),
+                clean_filepath,
             )
-            raise ValueError(msg)
+            manifest = {
+                "raw": raw_filepath.name,
+                "chunk_size": chunk_size,
+                "dedup": _dedup_settings(duplicates),
+                "chunks": chunks,
+                "delta": {"start": 0, "stop": num_total, "append": False},
+            }
+        _log_duplicates(duplicates)
+        _save_manifest(clean_filepath, manifest)
+        logger.info("[ETL] Clean data stored to '%s'", clean_filepath)
     else:
         logger.info("[ETL] Load clean data from '%s'", clean_filepath)
-        data = pd.read_csv(clean_filepath)
+        num_total, num_italian = count_labels(clean_filepath)
     # : inspect clean dataset
-    num_total = data["is_italian"].count()
-    num_italian = data["is_italian"].sum()
     logger.info(
         "Total: %d; Italian: %d (%.2f%%)",
         num_total,
         num_italian,
-        100 * num_italian / num_total,
+        100 * num_italian / num_total if num_total else 0.0,
     )
     return clean_filepath
 
@@ -124,10 +793,42 @@ def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         "-d",
         "--dirpath",
         metavar="PATH",
-        type=str,
+        type=Path,
         help="data path [%(default)s]",
         default=cfg.data_dir,
     )
+    arg_parser.add_argument(
+        "-c",
+        "--chunk_size",
+        metavar="NUM",
+        type=int,
+        help="raw data rows per chunk [%(default)s]",
+        default=cfg.etl_chunk_size,
+    )
+    arg_parser.add_argument(
+        "-n",
+        "--no_incremental",
+        dest="incremental",
+        action="store_false",
+        help="clean all the raw data, not only new or changed chunks",
+        default=cfg.etl_incremental,
+    )
+    arg_parser.add_argument(
+        "-u",
+        "--dedup_mode",
+        metavar="MODE",
+        type=str,
+        choices=dedup.DEDUPS,
+        help="duplicate texts to remove [%(default)s]",
+        default=cfg.etl_dedup,
+    )
+    arg_parser.add_argument(
+        "-e",
+        "--export_csv",
+        metavar="CSV_FILE",
+        type=Path,
+        help="also export the clean data to CSV [%(default)s]",
+    )
     return arg_parser
 
 
@@ -149,7 +850,10 @@ def main() -> None:
         for k, v in vars(args).items()
         if k not in to_skip and v is not None
     }
-    processor(**kws)
+    csv_filepath = kws.pop("export_csv", None)
+    clean_filepath = processor(**kws)
+    if csv_filepath is not None:
+        export_csv(clean_filepath, csv_filepath)
 
 
 # ======================================================================
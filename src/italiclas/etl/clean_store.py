@@ -0,0 +1,386 @@
+"""ETL Columnar Clean Data Store."""
+
+import itertools
+import json
+import mmap
+import os
+import shutil
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+TEXT_FILENAME = "text.bin"
+OFFSETS_FILENAME = "offsets.bin"
+LABELS_FILENAME = "is_italian.bin"
+META_FILENAME = "meta.json"
+COLUMNS = ("text", "is_italian")
+# : the on-disk types of the offsets and of the labels
+OFFSETS_DTYPE = np.dtype("<i8")
+LABELS_DTYPE = np.dtype("?")
+# : the UTF-8 continuation bytes are `0b10xxxxxx`
+_CONTINUATION_MASK = 0b1100_0000
+_CONTINUATION_BITS = 0b1000_0000
+
+
+# ======================================================================
+class CleanStore:
+    """Columnar on-disk store of the clean data.
+
+    The store is a directory with:
+     - the UTF-8 encoded texts, concatenated (`text.bin`);
+     - the byte offsets of the texts, with a leading 0 (`offsets.bin`);
+     - the boolean labels (`is_italian.bin`);
+     - the metadata, i.e. the number of rows, of text bytes and of
+       Italian texts (`meta.json`).
+
+    The columns can be read separately, and memory-mapped, so that
+    a range of rows is read without loading the whole data.
+    Rows are appended by writing the columns first and the metadata
+    last (atomically): data past the metadata sizes (e.g. from an
+    interrupted append) is ignored and overwritten by the next append.
+
+    Args:
+        dirpath: The store directory.
+        mmap: Memory-map the columns (instead of reading them).
+            Defaults to True.
+
+    """
+
+    def __init__(self, dirpath: Path, *, mmap: bool = True) -> None:
+        """Initialize the store."""
+        self.dirpath = Path(dirpath)
+        self.mmap = mmap
+
+    @property
+    def exists(self) -> bool:
+        """Check if the store exists (i.e. has metadata)."""
+        return (self.dirpath / META_FILENAME).is_file()
+
+    @property
+    def meta(self) -> dict[str, Any]:
+        """Get the store metadata.
+
+        Raises:
+            FileNotFoundError: if the store does not exist.
+
+        """
+        filepath = self.dirpath / META_FILENAME
+        if not filepath.is_file():
+            msg = f"Clean data store not found: {self.dirpath}"
+            raise FileNotFoundError(msg)
+        return json.loads(filepath.read_text())
+
+    def __len__(self) -> int:
+        """Get the number of rows."""
+        return self.meta["num_rows"]
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the store (in bytes)."""
+        if not self.dirpath.is_dir():
+            return 0
+        return sum(path.stat().st_size for path in self.dirpath.iterdir())
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        """Write the metadata atomically."""
+        temp_filepath = self.dirpath / f".{META_FILENAME}.tmp"
+        temp_filepath.write_text(json.dumps(meta, indent=2))
+        temp_filepath.replace(self.dirpath / META_FILENAME)
+
+    def append(self, features: Iterable[str], target: Iterable[bool]) -> None:
+        """Append rows to the store.
+
+        Args:
+            features: The texts.
+            target: The labels (True if the text is Italian).
+
+        """
+        meta = (
+            self.meta
+            if self.exists
+            else {"num_rows": 0, "num_bytes": 0, "num_italian": 0}
+        )
+        num_rows = meta["num_rows"]
+        num_bytes = meta["num_bytes"]
+        encoded = [text.encode("utf-8") for text in features]
+        labels = np.asarray(list(target), dtype=LABELS_DTYPE)
+        if len(labels) != len(encoded):
+            msg = f"Size mismatch: {len(encoded)} texts, {len(labels)} labels"
+            raise ValueError(msg)
+        lengths = np.fromiter(map(len, encoded), dtype=OFFSETS_DTYPE)
+        offsets = num_bytes + np.cumsum(lengths, dtype=OFFSETS_DTYPE)
+        if not num_rows:
+            # : initialize (or reset) the store
+            self.dirpath.mkdir(parents=True, exist_ok=True)
+            offsets = np.concatenate([np.zeros(1, OFFSETS_DTYPE), offsets])
+        columns = (
+            (TEXT_FILENAME, num_bytes, b"".join(encoded)),
+            (
+                OFFSETS_FILENAME,
+                (num_rows + 1) * OFFSETS_DTYPE.itemsize if num_rows else 0,
+                offsets.tobytes(),
+            ),
+            (
+                LABELS_FILENAME,
+                num_rows * LABELS_DTYPE.itemsize,
+                labels.tobytes(),
+            ),
+        )
+        for filename, size, data in columns:
+            filepath = self.dirpath / filename
+            with filepath.open("ab") as file_obj:
+                # : discard any uncommitted data
+                file_obj.truncate(size)
+                file_obj.write(data)
+                file_obj.flush()
+                os.fsync(file_obj.fileno())
+        meta.update(
+            {
+                "num_rows": num_rows + len(labels),
+                "num_bytes": int(offsets[-1]) if len(offsets) else num_bytes,
+                "num_italian": meta["num_italian"] + int(labels.sum()),
+                "columns": {"text": "utf-8", "is_italian": LABELS_DTYPE.str},
+            },
+        )
+        self._write_meta(meta)
+
+    def truncate(self, num_rows: int) -> None:
+        """Truncate the store to its first rows.
+
+        Only the metadata is rewritten: the data past the new sizes is
+        ignored, and overwritten by the next append.
+
+        Args:
+            num_rows: The number of rows to keep.
+
+        """
+        meta = self.meta
+        if num_rows >= meta["num_rows"]:
+            return
+        meta.update(
+            {
+                "num_rows": num_rows,
+                "num_bytes": int(self.offsets(0, num_rows)[-1]),
+                "num_italian": int(self.labels(0, num_rows).sum()),
+            },
+        )
+        self._write_meta(meta)
+
+    def _array(self, filename: str, dtype: np.dtype, size: int) -> np.ndarray:
+        """Get a (memory-mapped) column array."""
+        filepath = self.dirpath / filename
+        if not size:
+            return np.empty(0, dtype=dtype)
+        if self.mmap:
+            return np.memmap(filepath, dtype=dtype, mode="r", shape=(size,))
+        return np.fromfile(filepath, dtype=dtype, count=size)
+
+    def offsets(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Get the text byte offsets of a range of rows.
+
+        Args:
+            start: The first row.
+                Defaults to 0.
+            stop: The row after the last (as for slicing).
+                If None, up to the last row.
+                Defaults to None.
+
+        Returns:
+            The byte offsets (one more than the rows).
+
+        """
+        num_rows = len(self)
+        stop = num_rows if stop is None else min(stop, num_rows)
+        offsets = self._array(
+            OFFSETS_FILENAME,
+            OFFSETS_DTYPE,
+            num_rows + 1 if num_rows else 0,
+        )
+        return offsets[start : stop + 1] if num_rows else np.zeros(1, int)
+
+    def labels(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Get the labels of a range of rows.
+
+        Args:
+            start: The first row.
+                Defaults to 0.
+            stop: The row after the last (as for slicing).
+                If None, up to the last row.
+                Defaults to None.
+
+        Returns:
+            The labels (True if the text is Italian).
+
+        """
+        return self._array(LABELS_FILENAME, LABELS_DTYPE, len(self))[
+            start:stop
+        ]
+
+    def texts(self, start: int = 0, stop: int | None = None) -> list[str]:
+        """Get the texts of a range of rows.
+
+        Args:
+            start: The first row.
+                Defaults to 0.
+            stop: The row after the last (as for slicing).
+                If None, up to the last row.
+                Defaults to None.
+
+        Returns:
+            The texts.
+
+        """
+        offsets = self.offsets(start, stop).tolist()
+        if offsets[-1] == offsets[0]:
+            # : no text bytes (e.g. no rows)
+            return [""] * (len(offsets) - 1)
+        filepath = self.dirpath / TEXT_FILENAME
+        with filepath.open("rb") as file_obj:
+            if self.mmap:
+                with mmap.mmap(
+                    file_obj.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ,
+                ) as buffer:
+                    data = buffer[offsets[0] : offsets[-1]]
+            else:
+                file_obj.seek(offsets[0])
+                data = file_obj.read(offsets[-1] - offsets[0])
+        return _decode(data, offsets)
+
+    def read(
+        self,
+        columns: Sequence[str] = COLUMNS,
+        start: int = 0,
+        stop: int | None = None,
+    ) -> pd.DataFrame:
+        """Read (some columns of) a range of rows.
+
+        Args:
+            columns: The columns to read.
+                Defaults to COLUMNS.
+            start: The first row.
+                Defaults to 0.
+            stop: The row after the last (as for slicing).
+                If None, up to the last row.
+                Defaults to None.
+
+        Returns:
+            The data, indexed from `start`.
+
+        Raises:
+            ValueError: if a column is unknown.
+
+        """
+        data: dict[str, Any] = {}
+        for column in columns:
+            if column == "text":
+                data[column] = self.texts(start, stop)
+            elif column == "is_italian":
+                # : copy, not to keep the file mapped
+                data[column] = np.array(self.labels(start, stop))
+            else:
+                msg = f"Unknown column: {column}. Must be in: {COLUMNS}"
+                raise ValueError(msg)
+        num_rows = len(next(iter(data.values()))) if data else 0
+        return pd.DataFrame(data, index=pd.RangeIndex(start, start + num_rows))
+
+    def iter_chunks(
+        self,
+        chunk_size: int = 10_000,
+        columns: Sequence[str] = COLUMNS,
+        max_rows: int | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Read (some columns of) the rows in chunks.
+
+        Args:
+            chunk_size: The number of rows per chunk.
+                Defaults to 10_000.
+            columns: The columns to read.
+                Defaults to COLUMNS.
+            max_rows: The maximum number of rows to read.
+                If None, all rows are read.
+                Defaults to None.
+
+        Yields:
+            The data chunks.
+
+        """
+        num_rows = len(self) if max_rows is None else min(max_rows, len(self))
+        for start in range(0, num_rows, chunk_size):
+            yield self.read(columns, start, min(start + chunk_size, num_rows))
+
+    def to_csv(self, filepath: Path, chunk_size: int = 10_000) -> Path:
+        """Export the store to a CSV file.
+
+        Args:
+            filepath: The CSV filepath.
+            chunk_size: The number of rows per chunk.
+                Defaults to 10_000.
+
+        Returns:
+            The CSV filepath.
+
+        """
+        filepath.write_text(",".join(COLUMNS) + "\n")
+        for chunk in self.iter_chunks(chunk_size):
+            chunk.to_csv(filepath, mode="a", header=False, index=False)
+        return filepath
+
+
+# ======================================================================
+def replace_store(source: Path, target: Path) -> None:
+    """Replace a store directory (or a file) with another store directory.
+
+    The target is swapped by renames, hence it is never partially
+    written, although it is briefly missing.
+
+    Args:
+        source: The source store directory.
+        target: The target store directory.
+
+    """
+    old = target.with_name(f".{target.name}.old")
+    remove(old)
+    if target.exists():
+        target.rename(old)
+    source.rename(target)
+    remove(old)
+
+
+# ======================================================================
+def _decode(data: bytes, offsets: Sequence[int]) -> list[str]:
+    """Decode the UTF-8 texts between consecutive byte offsets.
+
+    The data is decoded at once, and the byte offsets are converted to
+    character offsets by discounting the UTF-8 continuation bytes.
+    """
+    offsets = np.asarray(offsets, dtype=OFFSETS_DTYPE) - offsets[0]
+    lengths = np.diff(offsets)
+    is_continuation = (
+        np.frombuffer(data, dtype=np.uint8) & _CONTINUATION_MASK
+    ) == _CONTINUATION_BITS
+    num_continuation = np.add.reduceat(
+        is_continuation,
+        np.minimum(offsets[:-1], len(data) - 1),
+        dtype=OFFSETS_DTYPE,
+    )
+    # : empty texts have no continuation bytes (`reduceat()` quirk)
+    num_continuation[lengths == 0] = 0
+    char_offsets = np.concatenate(
+        [[0], np.cumsum(lengths - num_continuation)],
+    ).tolist()
+    text = data.decode("utf-8")
+    return [text[begin:end] for begin, end in itertools.pairwise(char_offsets)]
+
+
+# ======================================================================
+def remove(path: Path) -> None:
+    """Remove a directory tree or a file, if it exists."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
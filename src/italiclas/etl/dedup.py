@@ -0,0 +1,347 @@
+"""ETL Duplicate Removal."""
+
+import collections
+import math
+import re
+from collections.abc import Iterable, Sequence
+from typing import Literal, get_args
+
+import numpy as np
+import pandas as pd
+
+# : the whitespace runs (collapsed by the normalization)
+_WHITESPACE = re.compile(r"\s+")
+# : the multiplier of the shingle hash (the 64-bit FNV prime)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+# ======================================================================
+DedupType = Literal["none", "exact", "near"]
+DEDUPS = get_args(DedupType)
+
+
+# ======================================================================
+def normalize(text: str) -> str:
+    r"""Normalize a text for duplicate detection.
+
+    Args:
+        text: The input text.
+
+    Returns:
+        The case-folded text, with collapsed whitespace.
+
+    Examples:
+        >>> normalize("  Ciao,\n  MONDO! ")
+        'ciao, mondo!'
+
+    """
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+# ======================================================================
+def text_hashes(texts: Sequence[str]) -> np.ndarray:
+    """Compute the 64-bit hashes of the normalized texts.
+
+    Args:
+        texts: The input texts.
+
+    Returns:
+        The hashes (equal for exact duplicates, up to normalization).
+
+    Examples:
+        >>> a, b, c = text_hashes(["Ciao  mondo", "ciao mondo", "ciao"])
+        >>> bool(a == b), bool(a == c)
+        (True, False)
+
+    """
+    normalized = np.asarray([normalize(text) for text in texts], dtype=object)
+    return pd.util.hash_array(normalized)
+
+
+# ======================================================================
+def _mix(values: np.ndarray) -> np.ndarray:
+    """Mix the bits of 64-bit values (the SplitMix64 finalizer)."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+# ======================================================================
+def _shingle_hashes(
+    texts: Sequence[str],
+    shingle_size: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Hash the character shingles of all the normalized texts at once.
+
+    Returns:
+        The shingle hashes (grouped by text), and the group starts.
+
+    """
+    normalized = [normalize(text) for text in texts]
+    # : each text is padded, so that shingles do not cross texts
+    pad = "\0" * shingle_size
+    codes = np.frombuffer(
+        (pad.join(normalized) + pad).encode("utf-32-le"),
+        dtype=np.uint32,
+    ).astype(np.uint64)
+    num_shingles = len(codes) - shingle_size + 1
+    hashes = np.zeros(num_shingles, dtype=np.uint64)
+    for i in range(shingle_size):
+        hashes = (hashes ^ codes[i : i + num_shingles]) * _FNV_PRIME
+    # : the shingles within each text (at least one, even if shorter)
+    lengths = np.fromiter(map(len, normalized), dtype=np.int64)
+    counts = np.maximum(lengths - shingle_size + 1, 1)
+    text_starts = np.cumsum(lengths + shingle_size) - lengths - shingle_size
+    group_starts = np.cumsum(counts) - counts
+    positions = np.repeat(text_starts - group_starts, counts)
+    return hashes[positions + np.arange(counts.sum())], group_starts
+
+
+# ======================================================================
+def minhashes(
+    texts: Sequence[str],
+    num_hashes: int,
+    shingle_size: int = 4,
+) -> np.ndarray:
+    """Compute the MinHash signatures of the normalized texts.
+
+    Each signature value is the minimum over the character shingles
+    (n-grams) of the text of a different hash function, hence the
+    fraction of equal values of two signatures estimates the Jaccard
+    similarity of their shingle sets.
+
+    Args:
+        texts: The input texts.
+        num_hashes: The number of hash functions (signature values).
+        shingle_size: The number of characters per shingle.
+            Defaults to 4.
+
+    Returns:
+        The signatures, one row per text.
+
+    Examples:
+        >>> a, b, c = minhashes(["ciao a tutti", "Ciao a tutti!", "hi"], 64)
+        >>> bool(np.mean(a == b) > np.mean(a == c))
+        True
+
+    """
+    result = np.zeros((len(texts), num_hashes), dtype=np.uint64)
+    if not len(texts):
+        return result
+    hashes, group_starts = _shingle_hashes(texts, shingle_size)
+    seeds = _mix(np.arange(1, num_hashes + 1, dtype=np.uint64) * _FNV_PRIME)
+    for i, seed in enumerate(seeds):
+        result[:, i] = np.minimum.reduceat(_mix(hashes ^ seed), group_starts)
+    return result
+
+
+# ======================================================================
+def band_hashes(signatures: np.ndarray, n_bands: int) -> np.ndarray:
+    """Hash the bands of the MinHash signatures.
+
+    Args:
+        signatures: The MinHash signatures (see `minhashes()`).
+            The number of values must be a multiple of the bands.
+        n_bands: The number of bands.
+
+    Returns:
+        The band hashes, one row per signature.
+
+    """
+    bands = signatures.reshape(len(signatures), n_bands, -1)
+    result = np.zeros(bands.shape[:2], dtype=np.uint64)
+    for i in range(bands.shape[2]):
+        result = _mix(result ^ bands[:, :, i])
+    return result
+
+
+# ======================================================================
+def rows_per_band(similarity: float, n_bands: int) -> int:
+    """Get the rows per band for a target similarity threshold.
+
+    Two texts share a band with probability `1 - (1 - s**r)**b`, for
+    Jaccard similarity `s`, `r` rows per band and `b` bands, which
+    steeply increases around the threshold `(1 / b) ** (1 / r)`.
+
+    Args:
+        similarity: The Jaccard similarity threshold.
+        n_bands: The number of bands.
+
+    Returns:
+        The number of rows per band.
+
+    Examples:
+        >>> rows_per_band(0.8, 8)
+        9
+
+    """
+    return max(1, round(math.log(1 / n_bands) / math.log(similarity)))
+
+
+# ======================================================================
+def _merge(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Merge values into a sorted array."""
+    values = np.sort(values)
+    return np.insert(
+        sorted_values,
+        np.searchsorted(sorted_values, values),
+        values,
+    )
+
+
+# ======================================================================
+def _is_in(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Check which values are in a sorted array."""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    index = np.searchsorted(sorted_values, values)
+    return sorted_values[np.minimum(index, len(sorted_values) - 1)] == values
+
+
+# ======================================================================
+class DuplicateFilter:
+    """Streaming filter of exact and near duplicate texts.
+
+    Exact duplicates have the same normalized text hash (see
+    `text_hashes()`).
+    Near duplicates share at least one band of their MinHash signatures
+    (see `minhashes()` and `band_hashes()`), i.e. their shingle sets
+    have (approximately) at least the Jaccard similarity threshold
+    (locality-sensitive hashing).
+    The hashes of the kept texts are stored in sorted arrays (one per
+    band), hence each chunk is checked at once by binary search.
+
+    The texts are filtered chunk by chunk, against all the previously
+    kept texts: the memory is independent of the chunk and text sizes,
+    but it grows by 8 bytes per kept text (plus 8 bytes per band,
+    for near duplicates).
+
+    Args:
+        mode: The duplicates to remove.
+            If "none", no text is removed.
+            If "exact", only exact duplicates are removed.
+            If "near", both exact and near duplicates are removed.
+            Defaults to "exact".
+        similarity: The Jaccard similarity threshold of near duplicates.
+            Defaults to 0.8.
+        n_bands: The number of bands of the MinHash signatures.
+            Defaults to 8.
+        shingle_size: The number of characters per shingle.
+            Defaults to 4.
+
+    Raises:
+        ValueError: if the mode or the similarity are invalid.
+
+    """
+
+    def __init__(
+        self,
+        mode: DedupType = "exact",
+        similarity: float = 0.8,
+        n_bands: int = 8,
+        shingle_size: int = 4,
+    ) -> None:
+        """Initialize the filter."""
+        if mode not in DEDUPS:
+            msg = f"Unknown deduplication: {mode}. Must be in: {DEDUPS}"
+            raise ValueError(msg)
+        if not 0 < similarity < 1:
+            msg = f"Invalid similarity: {similarity}. Must be in (0, 1)"
+            raise ValueError(msg)
+        self.mode = mode
+        self.similarity = similarity
+        self.n_bands = n_bands
+        self.shingle_size = shingle_size
+        self.num_hashes = n_bands * rows_per_band(similarity, n_bands)
+        self.counts: collections.Counter = collections.Counter()
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._tables = [np.empty(0, dtype=np.uint64) for _ in range(n_bands)]
+
+    def _bands(self, texts: Sequence[str]) -> np.ndarray:
+        """Compute the band hashes of the texts."""
+        signatures = minhashes(texts, self.num_hashes, self.shingle_size)
+        return band_hashes(signatures, self.n_bands)
+
+    def _is_near_chunk(
+        self,
+        bands: np.ndarray,
+        mask: np.ndarray,
+    ) -> np.ndarray:
+        """Check which texts share a band with a previous one in the chunk."""
+        result = np.zeros(len(bands), dtype=bool)
+        seen: list[set[int]] = [set() for _ in self._tables]
+        for i in np.flatnonzero(mask):
+            keys = bands[i].tolist()
+            result[i] = any(
+                key in band_seen
+                for band_seen, key in zip(seen, keys, strict=True)
+            )
+            if not result[i]:
+                for band_seen, key in zip(seen, keys, strict=True):
+                    band_seen.add(key)
+        return result
+
+    def _add(self, hashes: np.ndarray, bands: np.ndarray) -> None:
+        """Add the hashes of kept texts."""
+        self._hashes = _merge(self._hashes, hashes)
+        if self.mode == "near":
+            self._tables = [
+                _merge(table, bands[:, i])
+                for i, table in enumerate(self._tables)
+            ]
+
+    def add(self, texts: Iterable[str]) -> None:
+        """Add texts to the filter, without filtering them.
+
+        This is useful to resume filtering after already filtered texts.
+
+        Args:
+            texts: The input texts.
+
+        """
+        if self.mode == "none":
+            return
+        texts = list(texts)
+        bands = self._bands(texts) if self.mode == "near" else None
+        self._add(text_hashes(texts), bands)
+
+    def filter(self, texts: Iterable[str]) -> np.ndarray:
+        """Filter out the duplicate texts, and add the others.
+
+        Within the texts, the first occurrence is kept.
+
+        Args:
+            texts: The input texts.
+
+        Returns:
+            The mask of the texts to keep.
+
+        """
+        texts = list(texts)
+        keep = np.ones(len(texts), dtype=bool)
+        if self.mode != "none" and texts:
+            hashes = text_hashes(texts)
+            _, first = np.unique(hashes, return_index=True)
+            keep[:] = False
+            keep[first] = True
+            keep &= ~_is_in(self._hashes, hashes)
+            self.counts["exact"] += len(texts) - int(keep.sum())
+            bands = None
+            if self.mode == "near":
+                bands = self._bands(texts)
+                is_near = keep & np.any(
+                    [
+                        _is_in(table, bands[:, i])
+                        for i, table in enumerate(self._tables)
+                    ],
+                    axis=0,
+                )
+                is_near |= self._is_near_chunk(bands, keep & ~is_near)
+                keep &= ~is_near
+                self.counts["near"] += int(is_near.sum())
+                bands = bands[keep]
+            self._add(hashes[keep], bands)
+        self.counts["total"] += len(texts)
+        self.counts["kept"] += int(keep.sum())
+        return keep
@@ -2,12 +2,15 @@
 """ETL Fetch Raw Data."""
 
 import argparse
+import concurrent.futures
+import hashlib
+import json
 import logging
 import shutil
-import tempfile
 import zipfile
 from http import HTTPStatus
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 import requests
@@ -34,6 +37,370 @@ def is_valid(df: pd.DataFrame) -> bool:
     )
 
 
+# ======================================================================
+def conditional_headers(meta: dict[str, Any] | None) -> dict[str, str]:
+    """Get the headers of a conditional request from previous metadata.
+
+    Args:
+        meta: The metadata of the previous fetch (see `probe()`).
+
+    Returns:
+        The conditional request headers.
+
+    Examples:
+        >>> conditional_headers({"etag": '"abc"', "last_modified": None})
+        {'If-None-Match': '"abc"'}
+
+    """
+    headers = {}
+    if meta and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+# ======================================================================
+def probe(
+    url: str,
+    timeout: float = 180,
+    meta: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """Get the metadata of a remote file, possibly conditionally.
+
+    Args:
+        url: The remote file URL.
+        timeout: The request timeout (in s).
+            Defaults to 180.
+        meta: The metadata of a previous fetch, for a conditional request.
+            If None, the request is not conditional.
+            Defaults to None.
+
+    Returns:
+        The metadata: "etag", "last_modified", "size" (in bytes, if known)
+        and "accepts_ranges" (the support of range requests),
+        or None if not modified since the previous fetch.
+
+    Raises:
+        requests.RequestException: if the request is not successful.
+
+    """
+    response = requests.head(
+        url,
+        headers=conditional_headers(meta),
+        allow_redirects=True,
+        timeout=timeout,
+    )
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return None
+    response.raise_for_status()
+    size = response.headers.get("Content-Length")
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "size": int(size) if size is not None else None,
+        "accepts_ranges": response.headers.get("Accept-Ranges") == "bytes",
+    }
+
+
+# ======================================================================
+def _try_probe(url: str, timeout: float) -> dict[str, Any]:
+    """Get the metadata of a remote file, or none if the request fails."""
+    try:
+        return probe(url, timeout) or {}
+    except requests.RequestException:
+        # : e.g. HEAD not supported
+        return {}
+
+
+# ======================================================================
+def fetch_range(  # noqa: PLR0913
+    url: str,
+    filepath: Path,
+    begin: int = 0,
+    end: int | None = None,
+    *,
+    timeout: float = 180,
+    chunk_size: int = cfg.fetch_chunk_size,
+    etag: str | None = None,
+) -> None:
+    """Fetch a byte range of a remote file, resuming a partial fetch.
+
+    If the file already exists, only the missing bytes are requested
+    (via HTTP Range) and appended; if the server ignores the range,
+    or the remote file changed (its ETag differs), the whole file is
+    fetched again.
+
+    Args:
+        url: The remote file URL.
+        filepath: The (partial) local file.
+        begin: The first byte of the range.
+            Defaults to 0.
+        end: The last byte of the range (included).
+            If None, up to the end of the remote file.
+            Defaults to None.
+        timeout: The request timeout (in s).
+            Defaults to 180.
+        chunk_size: The size of the chunks written (in bytes).
+            Defaults to cfg.fetch_chunk_size.
+        etag: The expected ETag of the remote file (for resuming).
+            If None, the remote file is assumed unchanged.
+            Defaults to None.
+
+    Raises:
+        requests.HTTPError: if the request is not successful.
+
+    """
+    offset = begin + (filepath.stat().st_size if filepath.is_file() else 0)
+    if end is not None and offset > end:
+        return
+    headers = {}
+    if offset > 0 or end is not None:
+        headers["Range"] = f"bytes={offset}-{'' if end is None else end}"
+        if etag:
+            headers["If-Range"] = etag
+    with requests.get(
+        url,
+        headers=headers,
+        stream=True,
+        timeout=timeout,
+    ) as response:
+        if (
+            response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            and end is None
+        ):
+            # : the partial file is already complete
+            return
+        response.raise_for_status()
+        if response.status_code == HTTPStatus.PARTIAL_CONTENT:
+            mode = "ab"
+        elif begin == 0 and end is None:
+            # : the server ignored the range, fetch the whole file again
+            mode = "wb"
+        else:
+            filepath.unlink(missing_ok=True)
+            msg = f"Range requests not supported by: {url}"
+            raise requests.HTTPError(msg, response=response)
+        with filepath.open(mode) as file_obj:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file_obj.write(chunk)
+
+
+# ======================================================================
+def _remove_parts(filepath: Path) -> None:
+    """Remove the parts of a parallel fetch (and their state)."""
+    for part in filepath.parent.glob(f"{filepath.name}.part[0-9]*"):
+        part.unlink(missing_ok=True)
+    filepath.with_name(f"{filepath.name}.parts.json").unlink(missing_ok=True)
+
+
+# ======================================================================
+def _fetch_parts(  # noqa: PLR0913
+    url: str,
+    filepath: Path,
+    part_filepath: Path,
+    size: int,
+    n_parts: int,
+    kws: dict[str, Any],
+) -> None:
+    """Fetch a remote file in parallel parts, and join them."""
+    step = -(-size // n_parts)
+    ranges = [
+        [begin, min(begin + step, size) - 1] for begin in range(0, size, step)
+    ]
+    part_filepaths = [
+        filepath.with_name(f"{filepath.name}.part{i}")
+        for i in range(len(ranges))
+    ]
+    # : the parts are resumed only if fetched from the same remote file
+    state = {"etag": kws["etag"], "ranges": ranges}
+    state_filepath = filepath.with_name(f"{filepath.name}.parts.json")
+    try:
+        is_resumable = json.loads(state_filepath.read_text()) == state
+    except (OSError, ValueError):
+        is_resumable = False
+    if not is_resumable:
+        _remove_parts(filepath)
+        state_filepath.write_text(json.dumps(state))
+    with concurrent.futures.ThreadPoolExecutor(len(ranges)) as executor:
+        futures = [
+            executor.submit(fetch_range, url, part, begin, end, **kws)
+            for part, (begin, end) in zip(part_filepaths, ranges, strict=True)
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except requests.HTTPError as error:
+            if (
+                error.response is not None
+                and error.response.status_code == HTTPStatus.OK
+            ):
+                # : the remote file changed (If-Range failed),
+                # : none of the parts can be resumed
+                concurrent.futures.wait(futures)
+                _remove_parts(filepath)
+            raise
+    with part_filepath.open("wb") as file_obj:
+        for part in part_filepaths:
+            with part.open("rb") as part_obj:
+                shutil.copyfileobj(part_obj, file_obj, kws["chunk_size"])
+    _remove_parts(filepath)
+
+
+# ======================================================================
+def download(  # noqa: PLR0913
+    url: str,
+    filepath: Path,
+    *,
+    timeout: float = 180,
+    chunk_size: int = cfg.fetch_chunk_size,
+    n_parts: int = cfg.fetch_n_parts,
+    min_part_size: int = cfg.fetch_min_part_size,
+    sha256: str | None = None,
+    remote: dict[str, Any] | None = None,
+) -> Path:
+    """Download a remote file, resumable and with parallel range requests.
+
+    The data is fetched to a partial file (with the ".part" suffix),
+    which is resumed by later calls if interrupted, and atomically
+    renamed to the target file once complete (and verified).
+    If the server supports range requests, large files are fetched
+    in `n_parts` parallel parts (each resumable on its own, as long as
+    the remote file is unchanged: otherwise all parts are discarded).
+
+    Args:
+        url: The remote file URL.
+        filepath: The target filepath.
+        timeout: The request timeout (in s).
+            Defaults to 180.
+        chunk_size: The size of the chunks written (in bytes).
+            Defaults to cfg.fetch_chunk_size.
+        n_parts: The maximum number of parallel range requests.
+            Defaults to cfg.fetch_n_parts.
+        min_part_size: The minimum size of each part (in bytes).
+            Defaults to cfg.fetch_min_part_size.
+        sha256: The expected SHA-256 hex digest.
+            If None or empty, the checksum is not verified.
+            Defaults to None.
+        remote: The metadata of the remote file (see `probe()`).
+            If None, it is requested.
+            Defaults to None.
+
+    Returns:
+        The target filepath.
+
+    Raises:
+        requests.HTTPError: if a request is not successful.
+        ValueError: if the size or the checksum do not match.
+
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    part_filepath = filepath.with_name(f"{filepath.name}.part")
+    if remote is None:
+        remote = _try_probe(url, timeout)
+    size = remote.get("size")
+    n_parts = min(n_parts, size // min_part_size) if size else 1
+    kws = {
+        "timeout": timeout,
+        "chunk_size": chunk_size,
+        "etag": remote.get("etag"),
+    }
+    if n_parts > 1 and remote.get("accepts_ranges"):
+        logger.info("[ETL] Fetch %d bytes in %d parts", size, n_parts)
+        _fetch_parts(url, filepath, part_filepath, size, n_parts, kws)
+    else:
+        if part_filepath.is_file():
+            logger.info(
+                "[ETL] Resume fetch from byte %d",
+                part_filepath.stat().st_size,
+            )
+        fetch_range(url, part_filepath, **kws)
+    if size is not None and part_filepath.stat().st_size != size:
+        msg = (
+            f"Size mismatch for '{part_filepath}':"
+            f" {part_filepath.stat().st_size} != {size}"
+        )
+        part_filepath.unlink()
+        raise ValueError(msg)
+    if sha256:
+        with part_filepath.open("rb") as file_obj:
+            digest = hashlib.file_digest(file_obj, "sha256").hexdigest()
+        if digest != sha256.lower():
+            msg = f"Checksum mismatch for '{part_filepath}': {digest}"
+            part_filepath.unlink()
+            raise ValueError(msg)
+    part_filepath.replace(filepath)
+    return filepath
+
+
+# ======================================================================
+def extract(
+    zip_filepath: Path,
+    member: str,
+    filepath: Path,
+    chunk_size: int = cfg.fetch_chunk_size,
+) -> Path:
+    """Extract a ZIP member to a file, with an atomic rename.
+
+    Args:
+        zip_filepath: The ZIP filepath.
+        member: The name of the member to extract.
+        filepath: The target filepath.
+        chunk_size: The size of the chunks written (in bytes).
+            Defaults to cfg.fetch_chunk_size.
+
+    Returns:
+        The target filepath.
+
+    """
+    temp_filepath = filepath.with_name(f"{filepath.name}.tmp")
+    with (
+        zipfile.ZipFile(zip_filepath, "r") as zip_ref,
+        zip_ref.open(member) as member_obj,
+        temp_filepath.open("wb") as file_obj,
+    ):
+        shutil.copyfileobj(member_obj, file_obj, chunk_size)
+    temp_filepath.replace(filepath)
+    return filepath
+
+
+# ======================================================================
+def meta_filepath(raw_filepath: Path) -> Path:
+    """Get the fetch metadata filepath, next to the raw data.
+
+    Args:
+        raw_filepath: The raw data filepath.
+
+    Returns:
+        The fetch metadata filepath.
+
+    Examples:
+        >>> print(meta_filepath(Path("data/raw_data.csv")))
+        data/raw_data.csv.meta.json
+
+    """
+    return raw_filepath.with_name(f"{raw_filepath.name}.meta.json")
+
+
+# ======================================================================
+def load_meta(filepath: Path, source: str) -> dict[str, Any] | None:
+    """Load the fetch metadata, if it refers to the same source.
+
+    Args:
+        filepath: The fetch metadata filepath.
+        source: The raw data source URL.
+
+    Returns:
+        The fetch metadata, or None if missing, invalid or stale.
+
+    """
+    try:
+        meta = json.loads(filepath.read_text())
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("source") == source else None
+
+
 # ======================================================================
 @stopwatch.clockit_log(logger, logging.INFO)
 def fetcher(  # noqa: PLR0913
@@ -42,14 +409,27 @@ def fetcher(  # noqa: PLR0913
     *,
     source: str = cfg.raw_data_source,
     source_filename: str = cfg.raw_data_source_filename,
-    timeout: int = 180,
-    chunk_size: int = 4096,
+    sha256: str | None = cfg.raw_data_source_sha256,
+    timeout: float = 180,
+    chunk_size: int = cfg.fetch_chunk_size,
+    n_parts: int = cfg.fetch_n_parts,
+    revalidate: bool = cfg.fetch_revalidate,
     force: bool = False,
 ) -> Path | None:
     """Fetch raw data.
 
     Expects the source to point to a ZIP file containing the name specified
     in the source filename.
+    The ZIP file is downloaded next to the raw data (see `download()`),
+    so that an interrupted download is resumed, then the raw data is
+    extracted from it (see `extract()`) and the ZIP file is removed.
+
+    The ETag, Last-Modified and size of the source are stored next to the
+    raw data (see `meta_filepath()`).
+    With `revalidate`, existing raw data is checked with a conditional
+    request, and it is fetched again only if the source was modified;
+    otherwise, the raw data file is left untouched, so that the
+    downstream steps (which compare modification times) are skipped.
 
     Args:
         raw_filename: The output raw data filename.
@@ -57,10 +437,17 @@ def fetcher(  # noqa: PLR0913
         source: The raw data source URL.
         source_filename: The raw data source filename inside the ZIP file.
             Defaults to cfg.raw_data_source_filename.
+        sha256: The expected SHA-256 hex digest of the ZIP file.
+            If None or empty, the checksum is not verified.
+            Defaults to cfg.raw_data_source_sha256.
         timeout: The request timeout.
             Defaults to 180.
         chunk_size: The chunk size for fetching data from the request.
-            Defaults to 4096.
+            Defaults to cfg.fetch_chunk_size.
+        n_parts: The maximum number of parallel range requests.
+            Defaults to cfg.fetch_n_parts.
+        revalidate: Check if existing raw data is outdated.
+            Defaults to cfg.fetch_revalidate.
         force: Force new computation.
             Defaults to False.
 
@@ -73,25 +460,42 @@ def fetcher(  # noqa: PLR0913
 
     """
     raw_filepath = dirpath / raw_filename
-    if force or not raw_filepath.is_file():
-        response = requests.get(source, stream=True, timeout=timeout)
-        if response.status_code == HTTPStatus.OK:  # 200
-            logger.info("[ETL] Fetching raw data")
-            with tempfile.NamedTemporaryFile() as temp_file:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:  # filter out keep-alive new chunks
-                        temp_file.write(chunk)
-                temp_file.flush()
-                temp_file.seek(0)
-                with zipfile.ZipFile(temp_file, "r") as zip_ref:
-                    zip_ref.extract(source_filename, dirpath)
-            logger.info("[ETL] Save raw data to '%s'", raw_filepath)
-            shutil.move(dirpath / source_filename, raw_filepath)
-        else:
-            logger.error("[ETL] Could not get raw data")
-            return None
-    else:
-        logger.info("[ETL] Raw data already present in '%s'", raw_filepath)
+    remote = None
+    if not force and raw_filepath.is_file():
+        if not revalidate:
+            logger.info("[ETL] Raw data already present in '%s'", raw_filepath)
+            return raw_filepath
+        meta = load_meta(meta_filepath(raw_filepath), source)
+        try:
+            remote = probe(source, timeout, meta)
+        except requests.RequestException as e:
+            logger.warning("[ETL] Could not revalidate raw data: %s", e)
+            return raw_filepath
+        if remote is None:
+            logger.info("[ETL] Raw data not modified in '%s'", raw_filepath)
+            return raw_filepath
+    zip_filepath = raw_filepath.with_suffix(".zip")
+    logger.info("[ETL] Fetching raw data")
+    if remote is None:
+        remote = _try_probe(source, timeout)
+    try:
+        download(
+            source,
+            zip_filepath,
+            timeout=timeout,
+            chunk_size=chunk_size,
+            n_parts=n_parts,
+            sha256=sha256,
+            remote=remote,
+        )
+    except (requests.RequestException, ValueError) as e:
+        logger.error("[ETL] Could not get raw data: %s", e)
+        return None
+    logger.info("[ETL] Save raw data to '%s'", raw_filepath)
+    extract(zip_filepath, source_filename, raw_filepath, chunk_size)
+    zip_filepath.unlink()
+    meta = {"source": source, **remote}
+    meta_filepath(raw_filepath).write_text(json.dumps(meta, indent=2))
     return raw_filepath
 
 
@@ -134,7 +538,7 @@ def _more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         "-t",
         "--timeout",
         metavar="SEC",
-        type=str,
+        type=float,
         help="fetch connection timeout in seconds [%(default)s]",
         default=180,
     )
@@ -142,9 +546,32 @@ def _more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         "-b",
         "--chunk_size",
         metavar="BYTES",
-        type=str,
+        type=int,
         help="fetch chunk size in bytes [%(default)s]",
-        default=4096,
+        default=cfg.fetch_chunk_size,
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--n_parts",
+        metavar="NUM",
+        type=int,
+        help="maximum number of parallel range requests [%(default)s]",
+        default=cfg.fetch_n_parts,
+    )
+    arg_parser.add_argument(
+        "-c",
+        "--sha256",
+        metavar="HEX",
+        type=str,
+        help="expected SHA-256 digest of the data source [%(default)s]",
+        default=cfg.raw_data_source_sha256,
+    )
+    arg_parser.add_argument(
+        "-r",
+        "--revalidate",
+        action=argparse.BooleanOptionalAction,
+        help="check if existing raw data is outdated [%(default)s]",
+        default=cfg.fetch_revalidate,
     )
     return arg_parser
 
@@ -1,5 +1,13 @@
 """Machine Learning (ML) Pipeline."""
 
-from italiclas.ml import model, optim  #  # noqa: F401
+from italiclas.ml import (  # noqa: F401
+    cascade,
+    model,
+    optim,
+    progressive,
+    routing,
+    segmentation,
+)
 from italiclas.ml.prediction import predict  # noqa: F401
 from italiclas.ml.training import train  # noqa: F401
+from italiclas.ml.updating import update, update_with  # noqa: F401
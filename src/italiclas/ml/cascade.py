@@ -0,0 +1,257 @@
+"""ML Cascade Classifier."""
+
+import collections
+import functools
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from italiclas.config import cfg
+from italiclas.logger import logger
+from italiclas.ml import features
+from italiclas.utils import core
+
+# : the number of predictions handled by each stage
+_STAGE_COUNTS: collections.Counter = collections.Counter()
+_STAGE_COUNTS_LOCK = threading.Lock()
+
+
+# ======================================================================
+def fast_pipeline(n_features: int = 2**12) -> Pipeline:
+    """Get the (tiny) fast stage ML model pipeline.
+
+    Args:
+        n_features: The number of hashed character trigrams.
+            Defaults to 2**12.
+
+    Returns:
+        The (untrained) fast stage ML model pipeline.
+
+    """
+    vect = features.NgramHashingVectorizer(
+        "char",
+        (3, 3),
+        n_features=n_features,
+    )
+    return Pipeline([("vect", vect), ("clf", MultinomialNB())])
+
+
+# ======================================================================
+def log_odds(pipeline: Pipeline, texts: Sequence[str]) -> np.ndarray:
+    """Compute the log-odds of being Italian of a Naive Bayes pipeline.
+
+    Args:
+        pipeline: The trained ML model pipeline (Naive Bayes).
+        texts: The input texts.
+
+    Returns:
+        The log-odds of being Italian (positive if Italian).
+
+    """
+    clf = pipeline["clf"]
+    jll = clf.predict_joint_log_proba(pipeline["vect"].transform(texts))
+    is_italian = np.flatnonzero(clf.classes_)[0]
+    return jll[:, is_italian] - jll[:, 1 - is_italian]
+
+
+# ======================================================================
+def calibrate(
+    margins: Sequence[float],
+    fast_labels: Sequence[bool],
+    full_labels: Sequence[bool],
+    agreement: float = cfg.ml_cascade_agreement,
+) -> float:
+    """Calibrate the fast stage threshold to a target agreement rate.
+
+    The fast stage answers when the absolute margin exceeds the
+    threshold, the full model otherwise.
+    The threshold is the lowest for which the cascade agrees with
+    the full model on at least the `agreement` fraction of the inputs.
+
+    Args:
+        margins: The fast stage log-odds (preferably out-of-fold).
+        fast_labels: The fast stage predictions.
+        full_labels: The full model predictions.
+        agreement: The target agreement rate with the full model.
+            Defaults to cfg.ml_cascade_agreement.
+
+    Returns:
+        The threshold on the absolute margin.
+
+    Examples:
+        >>> margins = [5.0, -4.0, 3.0, -2.0, 1.0]
+        >>> fast = [True, False, True, False, True]
+        >>> full = [True, False, False, False, False]
+        >>> calibrate(margins, fast, full, 1.0)
+        3.0
+        >>> calibrate(margins, fast, full, 0.8)
+        1.0
+        >>> calibrate(margins, fast, full, 0.6)
+        0.0
+
+    """
+    abs_margins = np.abs(np.asarray(margins, dtype=float))
+    order = np.argsort(-abs_margins, kind="stable")
+    disagree = np.cumsum(
+        np.asarray(fast_labels)[order] != np.asarray(full_labels)[order],
+    )
+    # : the number of (most confident) inputs the fast stage can answer
+    num_fast = int(np.sum(1 - disagree / len(order) >= agreement))
+    if num_fast < len(order):
+        return float(abs_margins[order[num_fast]])
+    return 0.0
+
+
+# ======================================================================
+@dataclass
+class FastStage:
+    """The calibrated fast stage of the cascade."""
+
+    pipeline: Pipeline
+    # : the absolute log-odds above which the fast stage answers
+    threshold: float
+    # : the fraction of calibration inputs answered by the fast stage
+    coverage: float
+
+
+# ======================================================================
+def fit_fast_stage(
+    full: Pipeline,
+    features: Sequence[str],
+    target: Sequence[bool],
+    agreement: float = cfg.ml_cascade_agreement,
+    cross_validation: int = 3,
+) -> FastStage:
+    """Fit and calibrate the fast stage for a trained full model.
+
+    The threshold is calibrated on out-of-fold margins of the fast stage
+    against the full model predictions, then the fast stage is fitted on
+    all the data.
+
+    Args:
+        full: The trained full model (the ML model pipeline, or the
+            length router), whose predictions the fast stage must agree
+            with.
+        features: The input texts.
+        target: The target labels.
+        agreement: The target agreement rate with the full model.
+            Defaults to cfg.ml_cascade_agreement.
+        cross_validation: The number of folds for the calibration.
+            Defaults to 3.
+
+    Returns:
+        The calibrated fast stage.
+
+    """
+    fast = fast_pipeline()
+    log_proba = cross_val_predict(
+        clone(fast),
+        features,
+        target,
+        cv=StratifiedKFold(cross_validation),
+        method="predict_log_proba",
+    )
+    margins = log_proba[:, 1] - log_proba[:, 0]
+    threshold = calibrate(
+        margins,
+        margins > 0,
+        full.predict(features),
+        agreement,
+    )
+    coverage = float(np.mean(np.abs(margins) > threshold))
+    logger.info(
+        "[ML] Cascade threshold: %s, fast stage coverage: %s",
+        core.number2str(threshold),
+        core.number2str(coverage),
+    )
+    return FastStage(fast.fit(features, target), threshold, coverage)
+
+
+# ======================================================================
+@functools.lru_cache(None)
+def pre_trained_fast_stage(filepath: Path) -> FastStage:
+    """Load pre-trained fast stage.
+
+    Args:
+        filepath: The cascade fast stage filepath.
+
+    Returns:
+        The pre-trained fast stage.
+
+    """
+    logger.info("[ML] Load cascade fast stage '%s'", filepath)
+    return core.load_obj(filepath)
+
+
+# ======================================================================
+class CascadeClassifier:
+    """Two-stage cascade: a fast stage with a full model fallback.
+
+    Args:
+        fast: The calibrated fast stage.
+        full: The trained full ML model pipeline.
+
+    """
+
+    def __init__(self, fast: FastStage, full: Pipeline) -> None:
+        """Initialize the cascade."""
+        self.fast = fast
+        self.full = full
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        """Predict if the texts are Italian.
+
+        Only the inputs for which the fast stage is not confident
+        are predicted by the full model.
+
+        Args:
+            texts: The input texts.
+
+        Returns:
+            The predictions (True if the text is Italian).
+
+        """
+        texts = np.asarray(texts, dtype=object)
+        margins = log_odds(self.fast.pipeline, texts)
+        result = margins > 0
+        uncertain = np.abs(margins) <= self.fast.threshold
+        if uncertain.any():
+            result[uncertain] = self.full.predict(texts[uncertain])
+        num_full = int(uncertain.sum())
+        with _STAGE_COUNTS_LOCK:
+            _STAGE_COUNTS["fast"] += len(texts) - num_full
+            _STAGE_COUNTS["full"] += num_full
+        return result
+
+
+# ======================================================================
+def stats() -> dict[str, float]:
+    """Get the number and the fraction of predictions per cascade stage.
+
+    Returns:
+        The cascade statistics.
+
+    """
+    with _STAGE_COUNTS_LOCK:
+        num_fast = _STAGE_COUNTS["fast"]
+        num_full = _STAGE_COUNTS["full"]
+    total = num_fast + num_full
+    return {
+        "fast": num_fast,
+        "full": num_full,
+        "fast_fraction": num_fast / total if total else 0.0,
+    }
+
+
+# ======================================================================
+def reset_stats() -> None:
+    """Reset the cascade statistics."""
+    with _STAGE_COUNTS_LOCK:
+        _STAGE_COUNTS.clear()
@@ -0,0 +1,85 @@
+"""ML Search Checkpoint."""
+
+import contextlib
+import fcntl
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import joblib
+
+from italiclas.logger import logger
+
+
+# ======================================================================
+class Checkpoint:
+    """Append-only checkpoint of evaluation results.
+
+    Each result is a JSON line with a unique `key`.
+    Lines are appended under an exclusive lock with a single write,
+    so that concurrent workers (threads or processes) can safely share
+    the same file; a truncated last line (e.g. after the process was
+    killed) is ignored on loading, and terminated before appending.
+
+    Args:
+        filepath: The checkpoint filepath.
+
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        """Initialize the checkpoint."""
+        self.filepath = Path(filepath)
+
+    @staticmethod
+    def key(*items: Any) -> str:  # noqa: ANN401
+        """Compute the key of an evaluation from its inputs."""
+        return joblib.hash(items)
+
+    def load(self) -> dict[str, dict[str, Any]]:
+        """Load the checkpointed results.
+
+        Returns:
+            The results by key.
+
+        """
+        results = {}
+        with contextlib.suppress(FileNotFoundError):
+            for line in self.filepath.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("[ML] Skip invalid checkpoint line")
+                    continue
+                results[record["key"]] = record
+        return results
+
+    def append(self, records: Iterable[dict[str, Any]]) -> None:
+        """Append results to the checkpoint.
+
+        Args:
+            records: The results (each must have a `key`).
+
+        """
+        data = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n"
+            for record in records
+        ).encode()
+        if not data:
+            return
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.filepath, os.O_RDWR | os.O_APPEND | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                # : do not glue the first record to a truncated line
+                data = b"\n" + data
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def remove(self) -> None:
+        """Remove the checkpoint."""
+        self.filepath.unlink(missing_ok=True)
@@ -0,0 +1,205 @@
+"""ML Feature Store."""
+
+import os
+import shutil
+import tempfile
+from collections.abc import Hashable, Sequence
+from pathlib import Path
+
+import joblib
+import numpy as np
+import scipy.sparse
+from sklearn.base import TransformerMixin, clone
+
+from italiclas.config import cfg
+from italiclas.logger import logger
+from italiclas.utils import core
+
+VECT_FILENAME = "vect.pkl"
+ARRAY_NAMES = ("data", "indices", "indptr", "shape")
+
+
+# ======================================================================
+def _entry_nbytes(dirpath: Path) -> int:
+    """Get the size of a store entry (in bytes)."""
+    return sum(path.stat().st_size for path in dirpath.iterdir())
+
+
+# ======================================================================
+class FeatureStore:
+    """On-disk store of document-term matrices.
+
+    Each entry is a directory (named after its key) with the CSR arrays
+    of the matrices (as `.npy` files, loaded memory-mapped) and,
+    optionally, the fitted vectorizer.
+    Entries are written atomically, so that the store can be shared by
+    concurrent processes.
+    When the store exceeds its maximum size, the least recently used
+    entries are evicted.
+
+    Args:
+        dirpath: The store directory.
+            Defaults to cfg.ml_dir/cfg.feature_store_dirname.
+        max_bytes: The maximum size of the store (in bytes).
+            If 0, nothing is stored.
+            Defaults to cfg.feature_store_max_bytes.
+
+    """
+
+    def __init__(
+        self,
+        dirpath: Path = cfg.ml_dir / cfg.feature_store_dirname,
+        max_bytes: int = cfg.feature_store_max_bytes,
+    ) -> None:
+        """Initialize the store."""
+        self.dirpath = Path(dirpath)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(vect: TransformerMixin, *data_keys: Hashable) -> str:
+        """Compute the key of the features of some data.
+
+        Args:
+            vect: The (unfitted) vectorizer.
+            *data_keys: The data identifiers (e.g. checksum, fold).
+
+        Returns:
+            The key.
+
+        """
+        return joblib.hash(
+            (type(vect).__qualname__, vect.get_params(), data_keys),
+        )
+
+    def entries(self) -> list[Path]:
+        """Get the store entries, from the least recently used."""
+        if not self.dirpath.is_dir():
+            return []
+        entries = [
+            path
+            for path in self.dirpath.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        ]
+        return sorted(entries, key=lambda path: path.stat().st_mtime)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the store (in bytes)."""
+        return sum(_entry_nbytes(entry) for entry in self.entries())
+
+    def get(
+        self,
+        key: str,
+    ) -> tuple[tuple[scipy.sparse.csr_matrix, ...], TransformerMixin] | None:
+        """Load an entry.
+
+        Args:
+            key: The entry key.
+
+        Returns:
+            The matrices and the fitted vectorizer (None if not stored),
+            or None if the entry is missing.
+
+        """
+        entry = self.dirpath / key
+        try:
+            num = len(list(entry.glob("*.shape.npy")))
+            matrices = tuple(
+                scipy.sparse.csr_matrix(
+                    tuple(
+                        np.load(entry / f"{i}.{name}.npy", mmap_mode="r")
+                        for name in ARRAY_NAMES[:-1]
+                    ),
+                    shape=tuple(np.load(entry / f"{i}.shape.npy")),
+                    copy=False,
+                )
+                for i in range(num)
+            )
+            vect_filepath = entry / VECT_FILENAME
+            vect = (
+                core.load_obj(vect_filepath, decompressor=None)
+                if vect_filepath.is_file()
+                else None
+            )
+            # : mark as recently used
+            os.utime(entry)
+        except (OSError, ValueError, EOFError):
+            # : missing (or evicted concurrently)
+            return None
+        if not matrices:
+            return None
+        return matrices, vect
+
+    def put(
+        self,
+        key: str,
+        matrices: Sequence[scipy.sparse.spmatrix],
+        vect: TransformerMixin | None = None,
+    ) -> None:
+        """Store an entry and evict the least recently used, if needed.
+
+        Args:
+            key: The entry key.
+            matrices: The document-term matrices.
+            vect: The fitted vectorizer.
+                If None, it is not stored.
+                Defaults to None.
+
+        """
+        entry = self.dirpath / key
+        if self.max_bytes <= 0 or entry.is_dir():
+            return
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        temp_dirpath = Path(tempfile.mkdtemp(prefix=".", dir=self.dirpath))
+        for i, matrix in enumerate(matrices):
+            csr = scipy.sparse.csr_matrix(matrix)
+            arrays = (csr.data, csr.indices, csr.indptr, np.array(csr.shape))
+            for name, array in zip(ARRAY_NAMES, arrays, strict=True):
+                np.save(temp_dirpath / f"{i}.{name}.npy", array)
+        if vect is not None:
+            core.save_obj(vect, temp_dirpath / VECT_FILENAME, compressor=None)
+        try:
+            temp_dirpath.rename(entry)
+        except OSError:
+            # : stored concurrently
+            shutil.rmtree(temp_dirpath, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries exceeding the size."""
+        entries = self.entries()
+        sizes = [_entry_nbytes(entry) for entry in entries]
+        total = sum(sizes)
+        for entry, size in zip(entries, sizes, strict=True):
+            if total <= self.max_bytes:
+                break
+            logger.debug("[ML] Evict features '%s'", entry.name)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def fit_transform(
+        self,
+        vect: TransformerMixin,
+        features: Sequence[str],
+    ) -> tuple[TransformerMixin, scipy.sparse.csr_matrix]:
+        """Fit a vectorizer and transform, reusing stored results.
+
+        Args:
+            vect: The (unfitted) vectorizer.
+            features: The input texts.
+
+        Returns:
+            The fitted vectorizer and the document-term matrix.
+
+        """
+        features = np.asarray(features, dtype=object)
+        key = self.key(vect, joblib.hash(features))
+        entry = self.get(key)
+        if entry is not None and entry[1] is not None:
+            logger.info("[ML] Load features from store '%s'", key)
+            (matrix,), vect = entry
+            return vect, matrix
+        vect = clone(vect)
+        matrix = vect.fit_transform(features)
+        self.put(key, [matrix], vect)
+        return vect, matrix
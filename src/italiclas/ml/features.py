@@ -0,0 +1,431 @@
+"""ML Feature Extraction (compiled n-gram hashing)."""
+
+import re
+from collections.abc import Iterable
+from typing import Literal
+
+import numba
+import numpy as np
+import scipy.sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import (
+    strip_accents_ascii,
+    strip_accents_unicode,
+)
+
+AnalyzerType = Literal["word", "char", "char_wb"]
+StripAccentsType = Literal["ascii", "unicode"] | None
+
+# : analyzer codes understood by the compiled kernels
+_ANALYZERS = {"char": 0, "char_wb": 1, "word": 2}
+# : FNV-1a (64 bit) parameters
+_FNV_OFFSET = 14695981039346656037
+_FNV_PRIME = 1099511628211
+_MASK = (1 << 64) - 1
+# : the (single) separator used between words / tokens by the kernels
+_SPACE = ord(" ")
+# : number of documents to featurize at once (bounds peak memory)
+_BATCH_SIZE = 4096
+
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+# : the default token pattern (same as `CountVectorizer`)
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"  # noqa: S105
+
+
+# ======================================================================
+def ngram_hash(ngram: str) -> int:
+    """Compute the hash of an n-gram, as used by the compiled kernels.
+
+    This is the reference (pure Python) implementation of the FNV-1a hash
+    computed on the Unicode code points of the n-gram.
+
+    Args:
+        ngram: The input n-gram.
+
+    Returns:
+        The 64 bit (unsigned) hash value.
+
+    Examples:
+        >>> ngram_hash("")
+        14695981039346656037
+        >>> ngram_hash("ciao") == ngram_hash("ciao")
+        True
+        >>> ngram_hash("ciao") == ngram_hash("oaic")
+        False
+
+    """
+    result = _FNV_OFFSET
+    for char in ngram:
+        result = ((result ^ ord(char)) * _FNV_PRIME) & _MASK
+    return result
+
+
+# ======================================================================
+@numba.njit(cache=True, nogil=True)
+def _hash_span(codes: np.ndarray, start: int, stop: int) -> np.uint64:
+    """Compute the FNV-1a hash of `codes[start:stop]`."""
+    result = np.uint64(_FNV_OFFSET)
+    for i in range(start, stop):
+        result = (result ^ np.uint64(codes[i])) * np.uint64(_FNV_PRIME)
+    return result
+
+
+# ======================================================================
+@numba.njit(cache=True, nogil=True)
+def _word_spans(
+    codes: np.ndarray,
+    start: int,
+    stop: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the spans of the space-separated words in `codes[start:stop]`."""
+    begins = np.empty(stop - start, dtype=np.int64)
+    ends = np.empty(stop - start, dtype=np.int64)
+    num = 0
+    i = start
+    while i < stop:
+        if codes[i] == _SPACE:
+            i += 1
+        else:
+            begins[num] = i
+            while i < stop and codes[i] != _SPACE:
+                i += 1
+            ends[num] = i
+            num += 1
+    return begins[:num], ends[:num]
+
+
+# ======================================================================
+@numba.njit(cache=True, nogil=True)
+def _doc_ngrams(  # noqa: C901, PLR0912, PLR0913
+    codes: np.ndarray,
+    start: int,
+    stop: int,
+    analyzer: int,
+    min_n: int,
+    max_n: int,
+    n_features: int,
+    out: np.ndarray,
+    pos: int,
+) -> int:
+    """Emit the hashed n-grams of a single document.
+
+    If `out` is empty, the n-grams are only counted.
+    Returns the position after the last emitted (or counted) n-gram.
+    """
+    emit = out.size > 0
+    modulo = np.uint64(n_features)
+    if analyzer == 0:  # char
+        size = stop - start
+        for n in range(min_n, max_n + 1):
+            if n > size:
+                break
+            for i in range(start, stop - n + 1):
+                if emit:
+                    out[pos] = _hash_span(codes, i, i + n) % modulo
+                pos += 1
+    elif analyzer == 1:  # char_wb (the text is padded with spaces)
+        begins, ends = _word_spans(codes, start, stop)
+        for k in range(begins.size):
+            # : include the padding spaces around the word
+            w_begin = begins[k] - 1
+            w_end = ends[k] + 1
+            w_len = w_end - w_begin
+            for n in range(min_n, max_n + 1):
+                if w_len > n:
+                    for i in range(w_begin, w_end - n + 1):
+                        if emit:
+                            out[pos] = _hash_span(codes, i, i + n) % modulo
+                        pos += 1
+                else:  # count a short word only once
+                    if emit:
+                        out[pos] = _hash_span(codes, w_begin, w_end) % modulo
+                    pos += 1
+                    break
+    else:  # word (tokens are joined by a single space)
+        begins, ends = _word_spans(codes, start, stop)
+        num_tokens = begins.size
+        for n in range(min_n, min(max_n, num_tokens) + 1):
+            for i in range(num_tokens - n + 1):
+                if emit:
+                    out[pos] = (
+                        _hash_span(codes, begins[i], ends[i + n - 1]) % modulo
+                    )
+                pos += 1
+    return pos
+
+
+# ======================================================================
+@numba.njit(cache=True, nogil=True)
+def _hash_ngrams(  # noqa: PLR0913
+    codes: np.ndarray,
+    offsets: np.ndarray,
+    analyzer: int,
+    min_n: int,
+    max_n: int,
+    n_features: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the hashed n-gram feature indices of multiple documents."""
+    num_docs = offsets.size - 1
+    dummy = np.empty(0, dtype=np.int32)
+    size = 0
+    for k in range(num_docs):
+        size = _doc_ngrams(
+            codes,
+            offsets[k],
+            offsets[k + 1],
+            analyzer,
+            min_n,
+            max_n,
+            n_features,
+            dummy,
+            size,
+        )
+    indices = np.empty(size, dtype=np.int32)
+    indptr = np.zeros(num_docs + 1, dtype=np.int64)
+    pos = 0
+    for k in range(num_docs):
+        pos = _doc_ngrams(
+            codes,
+            offsets[k],
+            offsets[k + 1],
+            analyzer,
+            min_n,
+            max_n,
+            n_features,
+            indices,
+            pos,
+        )
+        indptr[k + 1] = pos
+    return indices, indptr
+
+
+# ======================================================================
+def preprocess(
+    text: str,
+    strip_accents: StripAccentsType = None,
+    *,
+    lowercase: bool = True,
+) -> str:
+    """Preprocess a text like `CountVectorizer` does.
+
+    Args:
+        text: The input text.
+        strip_accents: The accent stripping method.
+            Defaults to None.
+        lowercase: Convert the text to lowercase.
+            Defaults to True.
+
+    Returns:
+        The preprocessed text.
+
+    Examples:
+        >>> preprocess("Perché NO?", "ascii")
+        'perche no?'
+        >>> preprocess("Perché NO?", lowercase=False)
+        'Perché NO?'
+
+    """
+    if lowercase:
+        text = text.lower()
+    if strip_accents == "ascii":
+        text = strip_accents_ascii(text)
+    elif strip_accents == "unicode":
+        text = strip_accents_unicode(text)
+    elif strip_accents is not None:
+        msg = f"Invalid value for 'strip_accents': {strip_accents}"
+        raise ValueError(msg)
+    return text
+
+
+# ======================================================================
+def ngram_indices(  # noqa: PLR0913
+    texts: Iterable[str],
+    analyzer: AnalyzerType = "char_wb",
+    ngram_range: tuple[int, int] = (1, 1),
+    n_features: int = 2**20,
+    strip_accents: StripAccentsType = None,
+    token_pattern: str = TOKEN_PATTERN,
+    *,
+    lowercase: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the hashed n-gram feature indices of the input texts.
+
+    The n-grams are the same as those produced by `CountVectorizer`
+    (with the same parameters), but are hashed by a compiled kernel
+    directly to feature indices.
+
+    Args:
+        texts: The input texts.
+        analyzer: The n-gram type.
+            Defaults to "char_wb".
+        ngram_range: The min and max n-gram size.
+            Defaults to (1, 1).
+        n_features: The number of features (hash buckets).
+            Defaults to 2**20.
+        strip_accents: The accent stripping method.
+            Defaults to None.
+        token_pattern: The token regular expression for the "word" analyzer.
+            Defaults to TOKEN_PATTERN.
+        lowercase: Convert the text to lowercase.
+            Defaults to True.
+
+    Returns:
+        The feature indices (one per n-gram) and the index pointer
+        (in CSR format) of each text.
+
+    Examples:
+        >>> indices, indptr = ngram_indices(["ciao", "a"], "char", (1, 2))
+        >>> indptr.tolist()
+        [0, 7, 8]
+
+    """
+    if analyzer not in _ANALYZERS:
+        msg = f"Invalid value for 'analyzer': {analyzer}"
+        raise ValueError(msg)
+    min_n, max_n = ngram_range
+    if not 1 <= min_n <= max_n:
+        msg = f"Invalid value for 'ngram_range': {ngram_range}"
+        raise ValueError(msg)
+    tokenizer = re.compile(token_pattern)
+    docs = []
+    for text in texts:
+        doc = preprocess(text, strip_accents, lowercase=lowercase)
+        if analyzer == "char":
+            doc = _WHITE_SPACES.sub(" ", doc)
+        elif analyzer == "char_wb":
+            doc = " " + " ".join(doc.split()) + " "
+        else:
+            doc = " ".join(tokenizer.findall(doc))
+        docs.append(doc)
+    offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    np.cumsum([len(doc) for doc in docs], out=offsets[1:])
+    codes = np.frombuffer("".join(docs).encode("utf-32-le"), dtype=np.uint32)
+    return _hash_ngrams(
+        codes,
+        offsets,
+        _ANALYZERS[analyzer],
+        min_n,
+        max_n,
+        n_features,
+    )
+
+
+# ======================================================================
+class NgramHashingVectorizer(TransformerMixin, BaseEstimator):
+    """Stateless n-gram count vectorizer based on compiled hashing.
+
+    A drop-in replacement for `CountVectorizer` (for the parameters
+    used in the pipeline), which does not need fitting and hence can be
+    used for streaming / sharded featurization.
+
+    Args:
+        analyzer: The n-gram type.
+            Defaults to "word".
+        ngram_range: The min and max n-gram size.
+            Defaults to (1, 1).
+        strip_accents: The accent stripping method.
+            Defaults to None.
+        lowercase: Convert the text to lowercase.
+            Defaults to True.
+        token_pattern: The token regular expression for the "word" analyzer.
+            Defaults to TOKEN_PATTERN.
+        n_features: The number of features (hash buckets).
+            Defaults to 2**20.
+        binary: Set all non-zero counts to 1.
+            Defaults to False.
+        dtype: The type of the output matrix.
+            Defaults to np.int64.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        analyzer: AnalyzerType = "word",
+        ngram_range: tuple[int, int] = (1, 1),
+        strip_accents: StripAccentsType = None,
+        *,
+        lowercase: bool = True,
+        token_pattern: str = TOKEN_PATTERN,
+        n_features: int = 2**20,
+        binary: bool = False,
+        dtype: type = np.int64,
+    ) -> None:
+        """Initialize the vectorizer."""
+        self.analyzer = analyzer
+        self.ngram_range = ngram_range
+        self.strip_accents = strip_accents
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.n_features = n_features
+        self.binary = binary
+        self.dtype = dtype
+
+    def fit(
+        self,
+        raw_documents: Iterable[str],  # noqa: ARG002
+        y: Iterable | None = None,  # noqa: ARG002
+    ) -> "NgramHashingVectorizer":
+        """Do nothing (the vectorizer is stateless)."""
+        return self
+
+    def partial_fit(
+        self,
+        raw_documents: Iterable[str],  # noqa: ARG002
+        y: Iterable | None = None,  # noqa: ARG002
+    ) -> "NgramHashingVectorizer":
+        """Do nothing (the vectorizer is stateless)."""
+        return self
+
+    def transform(
+        self,
+        raw_documents: Iterable[str],
+    ) -> scipy.sparse.csr_matrix:
+        """Transform documents to a document-term (count) matrix.
+
+        Args:
+            raw_documents: The input texts.
+
+        Returns:
+            The document-term matrix.
+
+        """
+        if isinstance(raw_documents, str):
+            msg = "Iterable over raw text documents expected, string found."
+            raise TypeError(msg)
+        batch: list[str] = []
+        blocks = []
+        for text in raw_documents:
+            batch.append(text)
+            if len(batch) == _BATCH_SIZE:
+                blocks.append(self._transform_batch(batch))
+                batch = []
+        if batch or not blocks:
+            blocks.append(self._transform_batch(batch))
+        if len(blocks) == 1:
+            return blocks[0]
+        return scipy.sparse.vstack(blocks, format="csr")
+
+    def _transform_batch(self, texts: list[str]) -> scipy.sparse.csr_matrix:
+        """Transform a batch of documents to a document-term matrix."""
+        indices, indptr = ngram_indices(
+            texts,
+            self.analyzer,
+            self.ngram_range,
+            self.n_features,
+            self.strip_accents,
+            self.token_pattern,
+            lowercase=self.lowercase,
+        )
+        result = scipy.sparse.csr_matrix(
+            (np.ones(indices.size, dtype=self.dtype), indices, indptr),
+            shape=(len(texts), self.n_features),
+        )
+        result.sum_duplicates()
+        if self.binary:
+            result.data.fill(1)
+        return result
+
+    def _more_tags(self) -> dict:
+        """Get the estimator tags."""
+        return {"X_types": ["string"], "stateless": True}
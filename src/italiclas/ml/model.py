@@ -1,25 +1,63 @@
 """ML Model."""
 
 import functools
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal, get_args
 
+import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.model_selection import GridSearchCV
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
 
+from italiclas.config import cfg
+from italiclas.etl import clean_data
 from italiclas.logger import logger
+from italiclas.ml import (
+    feature_store,
+    features,
+    parallel,
+    search,
+    vocabulary,
+)
 from italiclas.utils import core
 
+# : the target classes (values of `is_italian`)
+CLASSES = np.array([False, True])
+
+
+# ======================================================================
+VectorizerType = Literal["count", "compact", "hashing"]
+VECTORIZERS = get_args(VectorizerType)
+
 
 # ======================================================================
-def base_pipeline() -> Pipeline:
-    """Get the ML model pipeline."""
-    return Pipeline([("vect", CountVectorizer()), ("clf", MultinomialNB())])
+def base_pipeline(vectorizer: VectorizerType = "count") -> Pipeline:
+    """Get the ML model pipeline.
+
+    Args:
+        vectorizer: The text vectorizer to use.
+            If "count", use `CountVectorizer`.
+            If "compact", use `CompactCountVectorizer`.
+            If "hashing", use the (stateless) `NgramHashingVectorizer`.
+            Defaults to "count".
+
+    Returns:
+        The (untrained) ML model pipeline.
+
+    """
+    if vectorizer == "count":
+        vect = CountVectorizer()
+    elif vectorizer == "compact":
+        vect = vocabulary.CompactCountVectorizer()
+    elif vectorizer == "hashing":
+        vect = features.NgramHashingVectorizer()
+    else:
+        msg = f"Unknown vectorizer: {vectorizer}. Must be in: {VECTORIZERS}"
+        raise ValueError(msg)
+    return Pipeline([("vect", vect), ("clf", MultinomialNB())])
 
 
 # ======================================================================
@@ -60,12 +98,152 @@ def training_data(filepath: Path) -> TrainingData:
 
     """
     logger.info("[ML] Load clean data from '%s'", filepath)
-    df = pd.read_csv(filepath)  # noqa: PD901
+    df = clean_data.load(filepath)  # noqa: PD901
     features = df["text"]
     target = df["is_italian"]
     return TrainingData(features=features, target=target)
 
 
+# ======================================================================
+def length_subset(
+    data: TrainingData,
+    min_length: int = 0,
+    max_length: int | None = None,
+) -> TrainingData:
+    """Select the training data with text length in a given range.
+
+    Args:
+        data: The training data.
+        min_length: The minimum text length (included).
+            Defaults to 0.
+        max_length: The maximum text length (excluded).
+            If None, there is no maximum.
+            Defaults to None.
+
+    Returns:
+        The selected training data.
+
+    Examples:
+        >>> data = TrainingData(pd.Series(["a", "abc"]), pd.Series([1, 0]))
+        >>> length_subset(data, 2).features.tolist()
+        ['abc']
+
+    """
+    lengths = data.features.str.len()
+    mask = lengths >= min_length
+    if max_length is not None:
+        mask &= lengths < max_length
+    return TrainingData(
+        features=data.features[mask].reset_index(drop=True),
+        target=data.target[mask].reset_index(drop=True),
+    )
+
+
+# ======================================================================
+SamplingType = Literal["stratified", "balanced"]
+SAMPLINGS = get_args(SamplingType)
+
+
+# ======================================================================
+def sample_subset(
+    data: TrainingData,
+    size: float | None,
+    strategy: SamplingType = "stratified",
+    seed: int = 0,
+) -> TrainingData:
+    """Select a random subset of the training data, per class.
+
+    Args:
+        data: The training data.
+        size: The subset size.
+            If in (0, 1), the fraction of the training data.
+            If None or 0, all the training data is used.
+            Otherwise, the number of samples.
+        strategy: The sampling strategy.
+            If "stratified", keep the class proportions.
+            If "balanced", take the same number of samples per class
+            (fewer for the classes with not enough samples).
+            Defaults to "stratified".
+        seed: The seed for sampling.
+            Defaults to 0.
+
+    Returns:
+        The selected training data (in the original order).
+
+    Raises:
+        ValueError: if the strategy is unknown.
+
+    Examples:
+        >>> target = pd.Series([True, False, False, False] * 2)
+        >>> data = TrainingData(pd.Series(list("abcdefgh")), target)
+        >>> sample_subset(data, 0.5).target.tolist().count(True)
+        1
+        >>> sample_subset(data, 4, "balanced").target.tolist().count(True)
+        2
+
+    """
+    if strategy not in SAMPLINGS:
+        msg = f"Unknown sampling: {strategy}. Must be in: {SAMPLINGS}"
+        raise ValueError(msg)
+    num_total = len(data.target)
+    num_rows = round(size * num_total) if size and size < 1 else int(size or 0)
+    if not num_rows or (strategy == "stratified" and num_rows >= num_total):
+        return data
+    _, inverse, counts = np.unique(
+        data.target.to_numpy(),
+        return_inverse=True,
+        return_counts=True,
+    )
+    if strategy == "stratified":
+        # : proportional sizes, the remainder to the largest fractions
+        quotas = num_rows * counts / num_total
+        sizes = np.floor(quotas).astype(int)
+        remainder = num_rows - sizes.sum()
+        sizes[np.argsort(sizes - quotas, kind="stable")[:remainder]] += 1
+    else:
+        sizes = np.minimum(counts, num_rows // len(counts))
+    rng = np.random.default_rng(seed)
+    index = np.sort(
+        np.concatenate(
+            [
+                rng.choice(np.flatnonzero(inverse == i), n, replace=False)
+                for i, n in enumerate(sizes)
+            ],
+        ),
+    )
+    return TrainingData(
+        features=data.features.iloc[index].reset_index(drop=True),
+        target=data.target.iloc[index].reset_index(drop=True),
+    )
+
+
+# ======================================================================
+def iter_training_data(
+    filepath: Path,
+    chunk_size: int = 10_000,
+    max_rows: int | None = None,
+) -> Iterator[TrainingData]:
+    """Load training data in chunks.
+
+    Only one chunk at a time is kept in memory.
+
+    Args:
+        filepath: The input filepath.
+        chunk_size: The number of rows per chunk.
+            Defaults to 10_000.
+        max_rows: The maximum number of rows to load.
+            If None, all rows are loaded.
+            Defaults to None.
+
+    Yields:
+        The training data chunks.
+
+    """
+    logger.info("[ML] Stream clean data from '%s'", filepath)
+    for df in clean_data.iter_chunks(filepath, chunk_size, max_rows=max_rows):
+        yield TrainingData(features=df["text"], target=df["is_italian"])
+
+
 # ======================================================================
 ScoringType = Literal[
     "accuracy",
@@ -83,7 +261,7 @@ SCORINGS = get_args(ScoringType)
 
 
 # ======================================================================
-def compute_scores(
+def compute_scores(  # noqa: PLR0913
     pipeline: Pipeline,
     filepath: Path,
     scorings: Sequence[ScoringType] = (
@@ -94,9 +272,15 @@ def compute_scores(
         "roc_auc",
     ),
     cross_validation: int = 3,
-) -> None:
+    store_dirpath: Path | None = None,
+    n_jobs: int | None = cfg.ml_n_jobs,
+) -> search.CandidateResult:
     """Compute scores on cross-validation split.
 
+    A single cross-validation pass is performed: all the scoring metrics
+    are computed from the same fold predictions (and probabilities),
+    and the folds are processed in parallel.
+
     Args:
         pipeline: The ML model pipeline.
         filepath: The training data filepath.
@@ -104,6 +288,14 @@ def compute_scores(
             Defaults to ("accuracy", "precision", "recall", "f1", "roc_auc").
         cross_validation: The number of cross validation splits.
             Defaults to 3.
+        store_dirpath: The feature store directory.
+            If None, the feature store is not used.
+            Defaults to None.
+        n_jobs: The number of parallel workers (see `parallel_config()`).
+            Defaults to cfg.ml_n_jobs.
+
+    Returns:
+        The per-fold scores, featurization, fit and prediction times.
 
     """
     # : Get training data
@@ -115,17 +307,31 @@ def compute_scores(
         "[ML] ML model scores on %s cross-validation splits",
         cross_validation,
     )
-    for scoring in scorings:
-        grid_search = GridSearchCV(
+    with parallel.parallel_config(n_jobs):
+        (result,) = search.evaluate(
             pipeline,
-            param_grid={},
-            scoring=scoring,
-            cv=cross_validation,
+            [{}],
+            features,
+            target,
+            scorings=scorings,
+            cross_validation=cross_validation,
+            store=(
+                feature_store.FeatureStore(store_dirpath)
+                if store_dirpath is not None
+                else None
+            ),
         )
-        grid_search.fit(features, target)
-        result = grid_search.best_score_
+    for scoring in scorings:
         logger.info(
-            "[ML] %s = %s",
+            "[ML] %s = %s ± %s",
             core.labelify(core.namify(scoring)),
-            core.number2str(result),
+            core.number2str(result.mean_score(scoring)),
+            core.number2str(result.std_score(scoring)),
         )
+    logger.info(
+        "[ML] Fold times: featurize = %s s, fit = %s s, predict = %s s",
+        core.number2str(float(np.mean(result.featurize_times))),
+        core.number2str(float(np.mean(result.fit_times))),
+        core.number2str(float(np.mean(result.score_times))),
+    )
+    return result
@@ -0,0 +1,113 @@
+"""ML Naive Bayes count statistics."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse
+from sklearn.naive_bayes import MultinomialNB
+
+
+# ======================================================================
+@dataclass
+class NBCounts:
+    """Multinomial Naive Bayes count statistics.
+
+    These are additive: the counts of disjoint data can simply be summed.
+    """
+
+    classes: np.ndarray
+    class_count: np.ndarray
+    feature_count: np.ndarray
+
+    def __add__(self, other: "NBCounts") -> "NBCounts":
+        """Sum the counts of disjoint data."""
+        if not np.array_equal(self.classes, other.classes):
+            msg = "Cannot merge counts with different classes."
+            raise ValueError(msg)
+        return NBCounts(
+            classes=self.classes,
+            class_count=self.class_count + other.class_count,
+            feature_count=self.feature_count + other.feature_count,
+        )
+
+
+# ======================================================================
+def count(
+    features: scipy.sparse.spmatrix | np.ndarray,
+    target: Iterable,
+    classes: np.ndarray,
+) -> NBCounts:
+    """Compute the Multinomial Naive Bayes count statistics.
+
+    Args:
+        features: The document-term matrix.
+        target: The target classes.
+        classes: All the possible classes.
+
+    Returns:
+        The count statistics.
+
+    """
+    target = np.asarray(target)
+    features = scipy.sparse.csr_matrix(features)
+    feature_count = np.zeros((classes.size, features.shape[1]))
+    class_count = np.zeros(classes.size)
+    for i, class_ in enumerate(classes):
+        mask = target == class_
+        class_count[i] = mask.sum()
+        feature_count[i] = features[mask].sum(axis=0)
+    return NBCounts(
+        classes=classes,
+        class_count=class_count,
+        feature_count=feature_count,
+    )
+
+
+# ======================================================================
+def merge(counts: Iterable[NBCounts]) -> NBCounts:
+    """Merge the count statistics computed on disjoint data.
+
+    Args:
+        counts: The count statistics.
+
+    Returns:
+        The merged count statistics.
+
+    """
+    iter_counts = iter(counts)
+    result = next(iter_counts)
+    for item in iter_counts:
+        result = result + item
+    return result
+
+
+# ======================================================================
+def to_estimator(
+    counts: NBCounts,
+    clf: MultinomialNB | None = None,
+) -> MultinomialNB:
+    """Set the count statistics of an estimator and update its probabilities.
+
+    The result is identical to fitting the estimator on the data
+    from which the counts were computed.
+
+    Args:
+        counts: The count statistics.
+        clf: The estimator (with the desired parameters).
+            If None, a new `MultinomialNB` is used.
+            Defaults to None.
+
+    Returns:
+        The fitted estimator.
+
+    """
+    if clf is None:
+        clf = MultinomialNB()
+    clf.classes_ = counts.classes
+    clf.class_count_ = counts.class_count.astype(np.float64)
+    clf.feature_count_ = counts.feature_count.astype(np.float64)
+    clf.n_features_in_ = counts.feature_count.shape[1]
+    clf._update_feature_log_prob(clf._check_alpha())  # noqa: SLF001
+    clf._update_class_log_prior(class_prior=clf.class_prior)  # noqa: SLF001
+    return clf
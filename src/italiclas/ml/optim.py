@@ -2,85 +2,406 @@
 """ML Train Model."""
 
 import argparse
+import dataclasses
 import itertools
 import logging
+from collections.abc import Sequence
 from pathlib import Path
+from typing import Any
 
-# this is required for HalvingGridSearchCV to work
-from sklearn.experimental import enable_halving_search_cv  # noqa: F401
-from sklearn.model_selection import HalvingGridSearchCV
 from sklearn.pipeline import Pipeline
 
 from italiclas.config import cfg
 from italiclas.logger import logger
-from italiclas.ml import model
+from italiclas.ml import (
+    checkpoint,
+    feature_store,
+    model,
+    parallel,
+    pareto,
+    search,
+)
 from italiclas.utils import core, misc, stopwatch
 
+# : the hyper-parameters grid
+PARAM_GRID = {
+    "vect__strip_accents": ["ascii", "unicode", None],
+    "vect__ngram_range": [
+        (a, b) for a, b in itertools.combinations(range(1, 6), 2) if a <= b
+    ],
+    "vect__analyzer": ["word", "char", "char_wb"],
+    "clf__alpha": [0.1, 0.5, 1.0],
+    "clf__fit_prior": [True, False],
+}
+
+
+# ======================================================================
+def checkpoint_filepath(params_filepath: Path) -> Path:
+    """Get the search checkpoint filepath, next to the parameters.
+
+    Args:
+        params_filepath: The ML model parameters filepath.
+
+    Returns:
+        The checkpoint filepath.
+
+    Examples:
+        >>> print(checkpoint_filepath(Path("ml/optim_params.pkl.lzma")))
+        ml/optim_params.checkpoint.jsonl
+        >>> print(checkpoint_filepath(Path("ml/params.bucket1.pkl.lzma")))
+        ml/params.bucket1.checkpoint.jsonl
+
+    """
+    base = params_filepath.name.removesuffix(".lzma").removesuffix(".pkl")
+    return params_filepath.with_name(f"{base}.checkpoint.jsonl")
+
+
+# ======================================================================
+def _is_adjacent(item: tuple, value: tuple) -> bool:
+    """Check if all the elements of two tuples differ by at most one."""
+    return len(item) == len(value) and all(
+        abs(a - b) <= 1 for a, b in zip(item, value, strict=True)
+    )
+
+
+# ======================================================================
+def neighborhood(
+    params: dict[str, Any],
+    param_grid: dict[str, Sequence] = PARAM_GRID,
+) -> dict[str, list]:
+    """Get the parameters grid in the neighborhood of some parameters.
+
+    Ranges (tuples) can change each bound by one, numeric values can
+    move to the adjacent grid values, and the other (categorical) values
+    are kept fixed.
+
+    Args:
+        params: The central parameters.
+        param_grid: The full parameters grid.
+            Defaults to PARAM_GRID.
+
+    Returns:
+        The neighborhood parameters grid.
+
+    Examples:
+        >>> params = {
+        ...     "vect__ngram_range": (2, 3),
+        ...     "vect__analyzer": "char",
+        ...     "clf__alpha": 0.1,
+        ... }
+        >>> grid = neighborhood(params)
+        >>> grid["vect__ngram_range"]
+        [(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)]
+        >>> grid["vect__analyzer"], grid["clf__alpha"]
+        (['char'], [0.1, 0.5])
+        >>> grid["clf__fit_prior"]
+        [True, False]
+
+    """
+    grid = {}
+    for name, values in param_grid.items():
+        if name not in params:
+            grid[name] = list(values)
+            continue
+        value = params[name]
+        if isinstance(value, tuple):
+            grid[name] = [
+                item for item in values if _is_adjacent(item, value)
+            ] or [value]
+        elif (
+            isinstance(value, int | float)
+            and not isinstance(value, bool)
+            and value in values
+        ):
+            ordered = sorted(values)
+            i = ordered.index(value)
+            grid[name] = ordered[max(i - 1, 0) : i + 2]
+        else:
+            grid[name] = [value]
+    return grid
+
+
+# ======================================================================
+def _warm_search(  # noqa: PLR0913
+    pipeline: Pipeline,
+    previous: dict[str, Any],
+    features: Sequence[str],
+    target: Sequence[bool],
+    warm_tol: float,
+    param_grid: dict[str, Sequence] = PARAM_GRID,
+    **search_kws: Any,  # noqa: ANN401
+) -> search.SearchResult | None:
+    """Search the neighborhood of the previous parameters.
+
+    Returns:
+        The search result, or None if the score degraded.
+
+    """
+    grid = neighborhood(previous, param_grid)
+    logger.info("[ML] Warm start with param grid: %s", grid)
+    result = search.search(
+        pipeline,
+        grid,
+        features,
+        target,
+        strategy="grid",
+        **search_kws,
+    )
+    previous_score = (
+        previous.get("_score")
+        if previous.get("_scoring") == search_kws["scorings"][0]
+        else None
+    )
+    if (
+        previous_score is not None
+        and result.best.mean_score() < previous_score - warm_tol
+    ):
+        logger.info(
+            "[ML] Score degraded from %s: search the full grid",
+            core.number2str(previous_score),
+        )
+        return None
+    return result
+
 
 # ======================================================================
 @stopwatch.clockit_log(logger, logging.INFO)
-def hyperparams(
+def hyperparams(  # noqa: PLR0913
     data_filepath: Path = cfg.data_dir / cfg.clean_filename,
     params_filepath: Path = cfg.ml_dir / cfg.optim_params_filename,
     *,
+    vectorizer: model.VectorizerType = "count",
     scoring: model.ScoringType | None = "f1",
     cross_validation: int = 5,
+    n_jobs: int | None = cfg.ml_n_jobs,
+    backend: parallel.BackendType = cfg.ml_backend,
+    max_nbytes: str | None = cfg.ml_max_nbytes,
+    cache_bytes: int = cfg.ml_feature_cache_bytes,
+    store_dirpath: Path | None = cfg.ml_dir / cfg.feature_store_dirname,
+    strategy: search.StrategyType = cfg.optim_strategy,
+    max_time: float | None = cfg.optim_max_time,
+    max_candidates: int | None = cfg.optim_max_candidates,
+    patience: int | None = cfg.optim_patience,
+    warm_start: bool = cfg.optim_warm_start,
+    warm_tol: float = cfg.optim_warm_tol,
+    max_latency: float | None = cfg.optim_max_latency,
+    max_size: int | None = cfg.optim_max_size,
+    param_grid: dict[str, Sequence] = PARAM_GRID,
+    length_range: tuple[int, int | None] | None = None,
+    sample_size: float | None = cfg.optim_sample_size,
+    sample_strategy: model.SamplingType = cfg.optim_sample_strategy,
+    seed: int = cfg.optim_sample_seed,
     force: bool = False,
 ) -> Pipeline:
     """Perform ML parameters optimization.
 
+    The parameters grid is explored with the given strategy
+    (see `search.search()`), within the time and candidates budget,
+    stopping early when the score does not improve.
+    Each (candidate, fold) evaluation is checkpointed to an append-only
+    file next to the parameters (see `checkpoint_filepath()`), so that
+    an interrupted search resumes where it stopped; the checkpoint is
+    removed once the parameters are saved.
+
+    With `warm_start`, the neighborhood of the previous parameters is
+    searched first (see `neighborhood()`), and the full grid is searched
+    only if the best score degrades (by more than `warm_tol`) with
+    respect to the previous one.
+
+    The inference latency and size of the final candidates are measured,
+    and the best scoring candidate satisfying `max_latency` and
+    `max_size` is selected, among the candidates of earlier halving
+    iterations if no final one does (see `pareto.profile_rounds()`);
+    the Pareto front (score vs latency vs size) is saved with the
+    parameters (as "_pareto").
+    Since only the vectorizer parameters change the document-term matrix,
+    each (vectorizer parameters, fold) pair is featurized only once
+    and all the classifier parameters are evaluated on it
+    (see `search.evaluate()`).
+    The fold document-term matrices are also persisted in the feature
+    store, to be reused by later runs.
+    For faster iterations, the search can run on a (stratified or
+    class-balanced) random subset of the training data
+    (see `model.sample_subset()`), while the final model is still fitted
+    on all the training data (see `training.train()`).
+
     Args:
         data_filepath: The clean data filepath.
             Defaults to cfg.data_dir/cfg.clean_filename.
         params_filepath: The ML model parameters filepath.
             Defaults to cfg.data_dir/cfg.ml_params_filename.
+        vectorizer: The text vectorizer to use.
+            Defaults to "count".
         scoring: The scoring metrics used for optimization.
             Defaults to "f1".
         cross_validation: The number of cross validation splits.
             Defaults to 5.
+        n_jobs: The number of parallel workers.
+            If -1, use all CPUs.
+            Defaults to cfg.ml_n_jobs.
+        backend: The parallel backend (see `parallel.parallel_config()`).
+            Defaults to cfg.ml_backend.
+        max_nbytes: The size threshold of the arrays memory-mapped
+            (instead of copied) to the worker processes.
+            Defaults to cfg.ml_max_nbytes.
+        cache_bytes: The maximum memory for caching the fold
+            document-term matrices (in bytes).
+            Defaults to cfg.ml_feature_cache_bytes.
+        store_dirpath: The feature store directory.
+            If None, the feature store is not used.
+            Defaults to cfg.ml_dir/cfg.feature_store_dirname.
+        strategy: The search strategy ("grid", "halving" or "random").
+            Defaults to cfg.optim_strategy.
+        max_time: The maximum search time (in s), including both the
+            warm start and the full grid searches.
+            If None or 0, there is no time limit.
+            Defaults to cfg.optim_max_time.
+        max_candidates: The maximum number of candidates to evaluate.
+            If None or 0, there is no limit.
+            Defaults to cfg.optim_max_candidates.
+        patience: The number of candidates without improvement after
+            which the search is stopped (not supported by "halving").
+            If None or 0, there is no early stopping.
+            Defaults to cfg.optim_patience.
+        warm_start: Search around the previous parameters first.
+            Defaults to cfg.optim_warm_start.
+        warm_tol: The tolerated score decrease for warm starting.
+            Defaults to cfg.optim_warm_tol.
+        max_latency: The maximum inference latency (in s per text).
+            If None or 0, there is no constraint.
+            Defaults to cfg.optim_max_latency.
+        max_size: The maximum (pickled) model size (in bytes).
+            If None or 0, there is no constraint.
+            Defaults to cfg.optim_max_size.
+        param_grid: The hyper-parameters grid.
+            Defaults to PARAM_GRID.
+        length_range: The (min, max) text length of the training data
+            (see `model.length_subset()`).
+            If None, all the training data is used.
+            Defaults to None.
+        sample_size: The size (or fraction, if in (0, 1)) of the subset
+            of the training data to search on.
+            If None or 0, all the training data is used.
+            Defaults to cfg.optim_sample_size.
+        sample_strategy: The sampling strategy ("stratified" or
+            "balanced").
+            Defaults to cfg.optim_sample_strategy.
+        seed: The seed for sampling.
+            Defaults to cfg.optim_sample_seed.
         force: Force new computation.
             Defaults to False.
 
     Returns:
         The trained pipeline.
 
+    Raises:
+        ValueError: if the strategy does not support the budget
+            (see `search.check_search()`).
+
     Examples:
         >>> hyperparams()  # doctest: +SKIP
 
     """
     if force or not params_filepath.is_file():
+        budget = search.Budget(max_time, max_candidates, patience)
+        search.check_search(strategy, budget)
         # : Get training data
         data = model.training_data(data_filepath)
+        if length_range is not None:
+            data = model.length_subset(data, *length_range)
+        if sample_size:
+            num_total = len(data.target)
+            data = model.sample_subset(
+                data,
+                sample_size,
+                sample_strategy,
+                seed,
+            )
+            logger.info(
+                "[ML] Search on %s sampled data: %d of %d samples",
+                sample_strategy,
+                len(data.target),
+                num_total,
+            )
         features = data.features
         target = data.target
         # : Hyper-parameters optimization
-        param_grid = {
-            "vect__strip_accents": ["ascii", "unicode", None],
-            "vect__ngram_range": [
-                (a, b)
-                for a, b in itertools.combinations(range(1, 6), 2)
-                if a <= b
-            ],
-            "vect__analyzer": ["word", "char", "char_wb"],
-            "clf__alpha": [0.1, 0.5, 1.0],
-            "clf__fit_prior": [True, False],
-        }
         logger.info("[ML] Param grid: %s", param_grid)
-        pipeline = model.base_pipeline()
-        grid_search = HalvingGridSearchCV(
+        pipeline = model.base_pipeline(vectorizer)
+        search_checkpoint = checkpoint.Checkpoint(
+            checkpoint_filepath(params_filepath),
+        )
+        search_kws = {
+            "scorings": [scoring or "accuracy"],
+            "cross_validation": cross_validation,
+            "budget": budget,
+            "cache": search.FeatureCache(cache_bytes),
+            "store": (
+                feature_store.FeatureStore(store_dirpath)
+                if store_dirpath is not None
+                else None
+            ),
+            "checkpoint": search_checkpoint,
+        }
+        previous = (
+            core.load_obj(params_filepath)
+            if warm_start and params_filepath.is_file()
+            else None
+        )
+        with parallel.parallel_config(n_jobs, backend, max_nbytes):
+            result = None
+            if previous is not None:
+                result = _warm_search(
+                    pipeline,
+                    previous,
+                    features,
+                    target,
+                    warm_tol,
+                    param_grid,
+                    **search_kws,
+                )
+            if result is None:
+                result = search.search(
+                    pipeline,
+                    param_grid,
+                    features,
+                    target,
+                    strategy=strategy,
+                    **search_kws,
+                )
+        logger.info(
+            "[ML] Feature cache: %d hits, %d misses",
+            search_kws["cache"].hits,
+            search_kws["cache"].misses,
+        )
+        # : compare the candidates evaluated on the same (largest) data
+        points = pareto.profile_rounds(
             pipeline,
-            param_grid=dict(param_grid),
-            scoring=scoring,
-            cv=cross_validation,
-            verbose=getattr(logging, cfg.log_level),
+            result.results,
+            features,
+            target,
+            max_latency,
+            max_size,
+            store=search_kws["store"],
+        )
+        front = pareto.pareto_front(points)
+        for point in front:
+            logger.info("[ML] Pareto front: %s", point)
+        best = pareto.select(points, max_latency, max_size)
+        logger.info("[ML] Optimal score (%s): %s", scoring, best.score)
+        params = dict(best.params)
+        params.update(
+            {
+                "_scoring": scoring,
+                "_score": best.score,
+                "_latency": best.latency,
+                "_size": best.size,
+                "_pareto": [dataclasses.asdict(point) for point in front],
+            },
         )
-        grid_search.fit(features, target)
-        best_score = grid_search.best_score_
-        logger.info("[ML] Optimal score (%s): %s", scoring, best_score)
-        params = grid_search.best_params_
-        params.update({"_scoring": scoring})
         logger.info("[ML] Save parameters to: '%s'", params_filepath)
         core.save_obj(params, params_filepath)
+        search_checkpoint.remove()
     else:
         params = core.load_obj(params_filepath)
         logger.info("[ML] Load parameters from: '%s'", params_filepath)
@@ -95,7 +416,7 @@ def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         "-i",
         "--data_filepath",
         metavar="FILE",
-        type=str,
+        type=Path,
         help="input clean data filepath [%(default)s]",
         default=cfg.data_dir / cfg.clean_filename,
     )
@@ -107,6 +428,14 @@ def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         help="output ML model parameters filepath [%(default)s]",
         default=cfg.ml_dir / cfg.optim_params_filename,
     )
+    arg_parser.add_argument(
+        "-V",
+        "--vectorizer",
+        type=str,
+        choices=model.VECTORIZERS,
+        help="text vectorizer [%(default)s]",
+        default="count",
+    )
     arg_parser.add_argument(
         "-s",
         "--scoring",
@@ -121,6 +450,124 @@ def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         help="Cross Validation splits [%(default)s]",
         default=5,
     )
+    arg_parser.add_argument(
+        "-j",
+        "--n_jobs",
+        metavar="NUM",
+        type=int,
+        help="number of parallel workers (-1 for all CPUs) [%(default)s]",
+        default=cfg.ml_n_jobs,
+    )
+    arg_parser.add_argument(
+        "-b",
+        "--backend",
+        type=str,
+        choices=parallel.BACKENDS,
+        help="parallel backend [%(default)s]",
+        default=cfg.ml_backend,
+    )
+    arg_parser.add_argument(
+        "-m",
+        "--max_nbytes",
+        metavar="SIZE",
+        type=str,
+        help="threshold for memory-mapping arrays to workers [%(default)s]",
+        default=cfg.ml_max_nbytes,
+    )
+    arg_parser.add_argument(
+        "-C",
+        "--cache_bytes",
+        metavar="SIZE",
+        type=int,
+        help="maximum memory for cached features (in bytes) [%(default)s]",
+        default=cfg.ml_feature_cache_bytes,
+    )
+    arg_parser.add_argument(
+        "-F",
+        "--store_dirpath",
+        metavar="DIR",
+        type=Path,
+        help="feature store directory [%(default)s]",
+        default=cfg.ml_dir / cfg.feature_store_dirname,
+    )
+    arg_parser.add_argument(
+        "-S",
+        "--strategy",
+        type=str,
+        choices=search.STRATEGIES,
+        help="search strategy [%(default)s]",
+        default=cfg.optim_strategy,
+    )
+    arg_parser.add_argument(
+        "-t",
+        "--max_time",
+        metavar="SECONDS",
+        type=float,
+        help="maximum search time (0 for no limit) [%(default)s]",
+        default=cfg.optim_max_time,
+    )
+    arg_parser.add_argument(
+        "-n",
+        "--max_candidates",
+        metavar="NUM",
+        type=int,
+        help="maximum number of candidates (0 for no limit) [%(default)s]",
+        default=cfg.optim_max_candidates,
+    )
+    arg_parser.add_argument(
+        "-P",
+        "--patience",
+        metavar="NUM",
+        type=int,
+        help="candidates without improvement before stopping [%(default)s]",
+        default=cfg.optim_patience,
+    )
+    arg_parser.add_argument(
+        "-w",
+        "--warm_start",
+        action=argparse.BooleanOptionalAction,
+        help="search around the previous parameters first [%(default)s]",
+        default=cfg.optim_warm_start,
+    )
+    arg_parser.add_argument(
+        "-L",
+        "--max_latency",
+        metavar="SECONDS",
+        type=float,
+        help="maximum inference latency per text (0 for none) [%(default)s]",
+        default=cfg.optim_max_latency,
+    )
+    arg_parser.add_argument(
+        "-r",
+        "--sample_size",
+        metavar="SIZE",
+        type=float,
+        help="search subset size or fraction (0 for all data) [%(default)s]",
+        default=cfg.optim_sample_size,
+    )
+    arg_parser.add_argument(
+        "-R",
+        "--sample_strategy",
+        type=str,
+        choices=model.SAMPLINGS,
+        help="search subset sampling strategy [%(default)s]",
+        default=cfg.optim_sample_strategy,
+    )
+    arg_parser.add_argument(
+        "--seed",
+        metavar="NUM",
+        type=int,
+        help="search subset sampling seed [%(default)s]",
+        default=cfg.optim_sample_seed,
+    )
+    arg_parser.add_argument(
+        "-Z",
+        "--max_size",
+        metavar="BYTES",
+        type=int,
+        help="maximum model size (0 for none) [%(default)s]",
+        default=cfg.optim_max_size,
+    )
     return arg_parser
 
 
@@ -0,0 +1,67 @@
+"""ML Parallel Execution."""
+
+import contextlib
+from collections.abc import Iterator
+from typing import Literal, get_args
+
+import joblib
+import threadpoolctl
+
+from italiclas.config import cfg
+from italiclas.logger import logger
+
+# ======================================================================
+BackendType = Literal["loky", "threading", "multiprocessing"]
+BACKENDS = get_args(BackendType)
+
+
+# ======================================================================
+@contextlib.contextmanager
+def parallel_config(
+    n_jobs: int | None = cfg.ml_n_jobs,
+    backend: BackendType = cfg.ml_backend,
+    max_nbytes: str | None = cfg.ml_max_nbytes,
+) -> Iterator[None]:
+    """Configure the parallel execution of the ML computations.
+
+    This applies to all scikit-learn computations with `n_jobs=None`
+    executed within the context.
+    Nested BLAS / OpenMP threads are limited to 1 per worker to avoid
+    over-subscription.
+
+    Args:
+        n_jobs: The number of parallel workers.
+            If -1, use all CPUs.
+            Defaults to cfg.ml_n_jobs.
+        backend: The parallel backend.
+            Processes are used by "loky" and "multiprocessing",
+            threads by "threading".
+            Defaults to cfg.ml_backend.
+        max_nbytes: The size threshold of the arrays shared with the
+            worker processes through memory-mapping instead of copying.
+            If None, arrays are always copied.
+            Defaults to cfg.ml_max_nbytes.
+
+    Yields:
+        None.
+
+    Examples:
+        >>> with parallel_config(2, "threading"):  # doctest: +SKIP
+        ...     pass
+
+    """
+    if backend not in BACKENDS:
+        msg = f"Unknown backend: {backend}. Must be in: {BACKENDS}"
+        raise ValueError(msg)
+    logger.debug("[ML] Parallel %s backend with %s jobs", backend, n_jobs)
+    kws = {"inner_max_num_threads": 1} if backend == "loky" else {}
+    with (
+        joblib.parallel_config(
+            backend,
+            n_jobs=n_jobs,
+            max_nbytes=max_nbytes,
+            **kws,
+        ),
+        threadpoolctl.threadpool_limits(limits=1 if n_jobs != 1 else None),
+    ):
+        yield
@@ -0,0 +1,294 @@
+"""ML Pareto-optimal Model Selection."""
+
+import pickle
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+from italiclas.logger import logger
+from italiclas.ml import feature_store, search
+from italiclas.utils import core
+
+
+# ======================================================================
+@dataclass
+class Point:
+    """Candidate score, inference latency (s per text) and size (bytes)."""
+
+    params: dict[str, Any]
+    score: float
+    latency: float
+    size: int
+
+    def dominates(self, other: "Point") -> bool:
+        """Check if the point is at least as good in all objectives.
+
+        Examples:
+            >>> Point({}, 0.9, 1e-4, 100).dominates(Point({}, 0.8, 1e-4, 100))
+            True
+            >>> Point({}, 0.9, 1e-4, 100).dominates(Point({}, 0.8, 1e-5, 100))
+            False
+
+        """
+        return (
+            self.score >= other.score
+            and self.latency <= other.latency
+            and self.size <= other.size
+            and (
+                self.score > other.score
+                or self.latency < other.latency
+                or self.size < other.size
+            )
+        )
+
+
+# ======================================================================
+def measure(
+    pipeline: Pipeline,
+    features: Sequence[str],
+    n_texts: int = 200,
+    repeats: int = 3,
+) -> tuple[float, int]:
+    """Measure the inference latency and the size of a fitted pipeline.
+
+    Args:
+        pipeline: The fitted ML model pipeline.
+        features: The input texts (the first `n_texts` are used).
+        n_texts: The number of texts predicted (one at a time).
+            Defaults to 200.
+        repeats: The number of timing repetitions (the best is used).
+            Defaults to 3.
+
+    Returns:
+        The latency (in s per text) and the pickled size (in bytes).
+
+    """
+    texts = list(features[:n_texts])
+    timings = []
+    for _ in range(repeats):
+        begin_time = time.perf_counter()
+        for text in texts:
+            pipeline.predict([text])
+        timings.append((time.perf_counter() - begin_time) / len(texts))
+    return min(timings), len(pickle.dumps(pipeline))
+
+
+# ======================================================================
+def profile(  # noqa: PLR0913
+    pipeline: Pipeline,
+    results: Sequence[search.CandidateResult],
+    features: Sequence[str],
+    target: Sequence[bool],
+    *,
+    n_texts: int = 200,
+    store: feature_store.FeatureStore | None = None,
+    measures: dict[str, tuple[float, int]] | None = None,
+) -> list[Point]:
+    """Profile the latency and size of the search results.
+
+    Since they are determined by the vectorizer, the pipeline is fitted
+    on the full data and measured once per vectorizer parameters.
+
+    Args:
+        pipeline: The ML model pipeline.
+        results: The search results.
+        features: The input texts.
+        target: The target labels.
+        n_texts: The number of texts predicted for timing.
+            Defaults to 200.
+        store: The on-disk store for the document-term matrices.
+            Defaults to None.
+        measures: The latency and size by vectorizer parameters,
+            updated with the new measures (to share them across calls).
+            If None, a new dictionary is used.
+            Defaults to None.
+
+    Returns:
+        The profiled points, in the same order as the results.
+
+    """
+    features = np.asarray(features, dtype=object)
+    target = np.asarray(target)
+    measures = {} if measures is None else measures
+    points = []
+    for result in results:
+        vect_params, _ = search.split_params(result.params)
+        key = repr(sorted(vect_params.items()))
+        if key not in measures:
+            fitted = clone(pipeline).set_params(**result.params)
+            if store is not None:
+                vect, matrix = store.fit_transform(fitted["vect"], features)
+                fitted.set_params(vect=vect)
+                fitted["clf"].fit(matrix, target)
+            else:
+                fitted.fit(features, target)
+            measures[key] = measure(fitted, features, n_texts)
+        latency, size = measures[key]
+        points.append(Point(result.params, result.mean_score(), latency, size))
+    return points
+
+
+# ======================================================================
+def profile_rounds(  # noqa: PLR0913
+    pipeline: Pipeline,
+    results: Sequence[search.CandidateResult],
+    features: Sequence[str],
+    target: Sequence[bool],
+    max_latency: float | None = None,
+    max_size: int | None = None,
+    *,
+    n_texts: int = 200,
+    store: feature_store.FeatureStore | None = None,
+) -> list[Point]:
+    """Profile the search results of the largest round with feasible points.
+
+    The results are grouped by number of samples (i.e. successive
+    halving iteration), since only the scores on the same samples are
+    comparable.
+    The largest round is profiled first, and the smaller ones only if
+    none of its points satisfies the constraints, so that a (lower
+    scoring) feasible candidate pruned by halving can still be selected.
+
+    Args:
+        pipeline: The ML model pipeline.
+        results: The search results.
+        features: The input texts.
+        target: The target labels.
+        max_latency: The maximum latency (in s per text).
+            If None or 0, there is no constraint.
+            Defaults to None.
+        max_size: The maximum size (in bytes).
+            If None or 0, there is no constraint.
+            Defaults to None.
+        n_texts: The number of texts predicted for timing.
+            Defaults to 200.
+        store: The on-disk store for the document-term matrices.
+            Defaults to None.
+
+    Returns:
+        The profiled points of the round, or of the largest one if no
+        round has feasible points.
+
+    """
+    rounds: dict[int, list[search.CandidateResult]] = {}
+    for result in results:
+        rounds.setdefault(result.n_samples, []).append(result)
+    measures: dict[str, tuple[float, int]] = {}
+    result = []
+    for n_samples in sorted(rounds, reverse=True):
+        points = profile(
+            pipeline,
+            rounds[n_samples],
+            features,
+            target,
+            n_texts=n_texts,
+            store=store,
+            measures=measures,
+        )
+        if not result:
+            result = points
+        if any(is_feasible(point, max_latency, max_size) for point in points):
+            return points
+        logger.info(
+            "[ML] No candidate on %d samples satisfies the constraints",
+            n_samples,
+        )
+    return result
+
+
+# ======================================================================
+def is_feasible(
+    point: Point,
+    max_latency: float | None = None,
+    max_size: int | None = None,
+) -> bool:
+    """Check if a point satisfies the latency and size constraints.
+
+    Args:
+        point: The profiled point.
+        max_latency: The maximum latency (in s per text).
+            If None or 0, there is no constraint.
+            Defaults to None.
+        max_size: The maximum size (in bytes).
+            If None or 0, there is no constraint.
+            Defaults to None.
+
+    Returns:
+        True if the point satisfies the constraints.
+
+    Examples:
+        >>> is_feasible(Point({}, 0.9, 1e-4, 100), max_size=50)
+        False
+
+    """
+    return (not max_latency or point.latency <= max_latency) and (
+        not max_size or point.size <= max_size
+    )
+
+
+# ======================================================================
+def pareto_front(points: Sequence[Point]) -> list[Point]:
+    """Get the Pareto front: the points not dominated by any other.
+
+    Args:
+        points: The profiled points.
+
+    Returns:
+        The Pareto front, sorted by decreasing score.
+
+    """
+    front = [
+        point
+        for point in points
+        if not any(other.dominates(point) for other in points)
+    ]
+    return sorted(front, key=lambda point: (-point.score, point.latency))
+
+
+# ======================================================================
+def select(
+    points: Sequence[Point],
+    max_latency: float | None = None,
+    max_size: int | None = None,
+) -> Point:
+    """Select the best scoring point under latency and size constraints.
+
+    If no point satisfies the constraints, the best scoring is selected.
+
+    Args:
+        points: The profiled points.
+        max_latency: The maximum latency (in s per text).
+            If None or 0, there is no constraint.
+            Defaults to None.
+        max_size: The maximum size (in bytes).
+            If None or 0, there is no constraint.
+            Defaults to None.
+
+    Returns:
+        The selected point.
+
+    """
+    feasible = [
+        point for point in points if is_feasible(point, max_latency, max_size)
+    ]
+    if not feasible:
+        logger.warning(
+            "[ML] No candidate satisfies the constraints"
+            " (latency <= %s s, size <= %s B): select the best scoring",
+            max_latency or "inf",
+            max_size or "inf",
+        )
+        feasible = list(points)
+    best = pareto_front(feasible)[0]
+    logger.info(
+        "[ML] Selected: score = %s, latency = %s s, size = %d B",
+        core.number2str(best.score),
+        core.number2str(best.latency),
+        best.size,
+    )
+    return best
@@ -13,9 +13,14 @@ from italiclas.utils import misc, stopwatch
 
 # ======================================================================
 @stopwatch.clockit_log(logger, logging.INFO)
-def predict(
+def predict(  # noqa: PLR0913
     text: str,
     ml_pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
+    *,
+    with_cascade: bool = cfg.ml_cascade,
+    cascade_filepath: Path = cfg.ml_dir / cfg.ml_cascade_filename,
+    with_router: bool = cfg.ml_router,
+    router_filepath: Path = cfg.ml_dir / cfg.ml_router_filename,
 ) -> bool:
     """Perform ML training.
 
@@ -24,6 +29,18 @@ def predict(
             Defaults to cfg.data_dir/cfg.clean_filename.
         ml_pipeline_filepath: The ML model pipeline filepath.
             Defaults to cfg.pipeline_dir/cfg.ml_pipeline_filename.
+        with_cascade: Use the cascade fast stage, if available, falling
+            back to the ML model pipeline (or the length router) for
+            uncertain texts.
+            Defaults to cfg.ml_cascade.
+        cascade_filepath: The cascade fast stage filepath.
+            Defaults to cfg.ml_dir/cfg.ml_cascade_filename.
+        with_router: Use the length router, if available, instead of the
+            ML model pipeline (which is then not loaded), i.e. the pipeline
+            tuned for the text length.
+            Defaults to cfg.ml_router.
+        router_filepath: The length router filepath.
+            Defaults to cfg.ml_dir/cfg.ml_router_filename.
 
     Returns:
         The prediction outcome.
@@ -36,12 +53,18 @@ def predict(
         False
 
     """
-    if ml_pipeline_filepath.is_file():
-        logger.info(
-            "[ML] Predict from ML model pipeline '%s'",
-            ml_pipeline_filepath,
-        )
-    pipeline = ml.model.pre_trained_pipeline(ml_pipeline_filepath)
+    if with_router and router_filepath.is_file():
+        pipeline = ml.routing.pre_trained_router(router_filepath)
+    else:
+        if ml_pipeline_filepath.is_file():
+            logger.info(
+                "[ML] Predict from ML model pipeline '%s'",
+                ml_pipeline_filepath,
+            )
+        pipeline = ml.model.pre_trained_pipeline(ml_pipeline_filepath)
+    if with_cascade and cascade_filepath.is_file():
+        fast = ml.cascade.pre_trained_fast_stage(cascade_filepath)
+        pipeline = ml.cascade.CascadeClassifier(fast, pipeline)
     result = next(iter(pipeline.predict([text])))
     logger.debug("[ML] Input: '%s' -> Prediction: %s", text, result)
     return result
@@ -64,6 +87,36 @@ def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         help="input ML model pipeline filepath [%(default)s]",
         default=cfg.ml_dir / cfg.ml_model_pipeline_filename,
     )
+    arg_parser.add_argument(
+        "-c",
+        "--with_cascade",
+        action=argparse.BooleanOptionalAction,
+        help="use the cascade fast stage [%(default)s]",
+        default=cfg.ml_cascade,
+    )
+    arg_parser.add_argument(
+        "-C",
+        "--cascade_filepath",
+        metavar="FILE",
+        type=Path,
+        help="input cascade fast stage filepath [%(default)s]",
+        default=cfg.ml_dir / cfg.ml_cascade_filename,
+    )
+    arg_parser.add_argument(
+        "-r",
+        "--with_router",
+        action=argparse.BooleanOptionalAction,
+        help="use the length router [%(default)s]",
+        default=cfg.ml_router,
+    )
+    arg_parser.add_argument(
+        "-R",
+        "--router_filepath",
+        metavar="FILE",
+        type=Path,
+        help="input length router filepath [%(default)s]",
+        default=cfg.ml_dir / cfg.ml_router_filename,
+    )
     return arg_parser
 
 
@@ -0,0 +1,187 @@
+"""ML Progressive Prediction."""
+
+import re
+import time
+import weakref
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from italiclas.config import cfg
+from italiclas.logger import logger
+from italiclas.ml import model, routing
+
+# : the last whitespace (where chunks are split)
+_LAST_SPACE = re.compile(r"\s(?=\S*$)")
+
+# : the log-odds weights by classifier, with the arrays they derive from
+_WEIGHTS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+# ======================================================================
+@dataclass
+class ProgressiveResult:
+    """Progressive prediction result."""
+
+    is_italian: bool
+    # : the log-odds of being Italian
+    margin: float
+    # : the number of characters processed
+    num_chars: int
+    exited_early: bool
+
+
+# ======================================================================
+def iter_chunks(text: str, chunk_size: int) -> Iterator[str]:
+    """Split a text into chunks, at whitespace when possible.
+
+    Args:
+        text: The input text.
+        chunk_size: The maximum number of characters per chunk.
+
+    Yields:
+        The text chunks (covering the whole text).
+
+    Examples:
+        >>> list(iter_chunks("ciao mondo come va", 8))
+        ['ciao ', 'mondo ', 'come va']
+        >>> list(iter_chunks("ciaomondo", 4))
+        ['ciao', 'mond', 'o']
+
+    """
+    begin = 0
+    while begin < len(text):
+        end = begin + chunk_size
+        if end < len(text):
+            match = _LAST_SPACE.search(text, begin, end)
+            if match:
+                end = match.end()
+        yield text[begin:end]
+        begin = end
+
+
+# ======================================================================
+def _log_odds_weights(clf: MultinomialNB) -> tuple[float, np.ndarray]:
+    """Get the log-odds bias and per-feature weights of Naive Bayes.
+
+    The weights are cached per classifier (without keeping it alive),
+    and recomputed when (partial) fitting replaces its log probabilities.
+    """
+    entry = _WEIGHTS.get(clf)
+    if (
+        entry is not None
+        and entry[0] is clf.class_log_prior_
+        and entry[1] is clf.feature_log_prob_
+    ):
+        return entry[2], entry[3]
+    is_italian = np.flatnonzero(clf.classes_)[0]
+    other = 1 - is_italian
+    bias = clf.class_log_prior_[is_italian] - clf.class_log_prior_[other]
+    weights = clf.feature_log_prob_[is_italian] - clf.feature_log_prob_[other]
+    _WEIGHTS[clf] = (
+        clf.class_log_prior_,
+        clf.feature_log_prob_,
+        float(bias),
+        weights,
+    )
+    return float(bias), weights
+
+
+# ======================================================================
+def predict_progressive(  # noqa: PLR0913
+    pipeline: Pipeline,
+    text: str,
+    *,
+    chunk_size: int = cfg.progressive_chunk_size,
+    margin: float = cfg.progressive_margin,
+    max_chars: int | None = cfg.progressive_max_chars,
+    max_time: float | None = cfg.progressive_max_time,
+) -> ProgressiveResult:
+    """Predict if a (long) text is Italian, processing it in chunks.
+
+    The Naive Bayes log-odds are additive over the features, hence they
+    are accumulated chunk by chunk (n-grams across chunk boundaries are
+    neglected, which is exact for words when splitting at whitespace),
+    stopping as soon as the accumulated margin exceeds the confidence
+    threshold, or the characters / time budget is exhausted.
+
+    Args:
+        pipeline: The trained ML model pipeline (Multinomial Naive Bayes).
+        text: The input text.
+        chunk_size: The number of characters per chunk.
+            Defaults to cfg.progressive_chunk_size.
+        margin: The absolute log-odds for an early (confident) exit.
+            Defaults to cfg.progressive_margin.
+        max_chars: The maximum number of characters to process.
+            If None or 0, there is no limit.
+            Defaults to cfg.progressive_max_chars.
+        max_time: The maximum processing time (in s).
+            If None or 0, there is no limit.
+            Defaults to cfg.progressive_max_time.
+
+    Returns:
+        The prediction result.
+
+    """
+    begin_time = time.perf_counter()
+    vect = pipeline["vect"]
+    bias, weights = _log_odds_weights(pipeline["clf"])
+    log_odds = bias
+    num_chars = 0
+    for chunk in iter_chunks(text[: max_chars or None], chunk_size):
+        features = vect.transform([chunk])
+        log_odds += float(features.data @ weights[features.indices])
+        num_chars += len(chunk)
+        if abs(log_odds) >= margin or (
+            max_time and time.perf_counter() - begin_time >= max_time
+        ):
+            break
+    result = ProgressiveResult(
+        is_italian=log_odds > 0,
+        margin=log_odds,
+        num_chars=num_chars,
+        exited_early=num_chars < len(text),
+    )
+    logger.debug("[ML] Progressive prediction: %s", result)
+    return result
+
+
+# ======================================================================
+def predict(
+    text: str,
+    ml_pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
+    *,
+    with_router: bool = cfg.ml_router,
+    router_filepath: Path = cfg.ml_dir / cfg.ml_router_filename,
+) -> ProgressiveResult:
+    """Predict if a (long) text is Italian, with progressive early exit.
+
+    Args:
+        text: The input text to classify.
+        ml_pipeline_filepath: The ML model pipeline filepath.
+            Defaults to cfg.ml_dir/cfg.ml_model_pipeline_filename.
+        with_router: Use the pipeline of the text length bucket of the
+            length router, if available, instead of the ML model pipeline
+            (see `ml.prediction.predict()`).
+            Defaults to cfg.ml_router.
+        router_filepath: The length router filepath.
+            Defaults to cfg.ml_dir/cfg.ml_router_filename.
+
+    Returns:
+        The prediction result.
+
+    Examples:
+        >>> predict("ciao mondo " * 100_000).exited_early  # doctest: +SKIP
+        True
+
+    """
+    if with_router and router_filepath.is_file():
+        router = routing.pre_trained_router(router_filepath)
+        pipeline = router.pipelines[router.bucket([text])[0]]
+    else:
+        pipeline = model.pre_trained_pipeline(ml_pipeline_filepath)
+    return predict_progressive(pipeline, text)
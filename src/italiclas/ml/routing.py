@@ -0,0 +1,213 @@
+"""ML Length-aware Model Routing."""
+
+import functools
+import itertools
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from italiclas.config import cfg
+from italiclas.logger import logger
+from italiclas.ml import model, optim
+from italiclas.utils import core
+
+
+# ======================================================================
+class LengthRouter:
+    """Route each text to the ML model pipeline of its length bucket.
+
+    Args:
+        bounds: The (increasing) text lengths separating the buckets.
+        pipelines: The trained ML model pipelines, one per bucket
+            (i.e. one more than the bounds).
+
+    """
+
+    def __init__(
+        self,
+        bounds: Sequence[int],
+        pipelines: Sequence[Pipeline],
+    ) -> None:
+        """Initialize the router."""
+        if len(pipelines) != len(bounds) + 1:
+            msg = (
+                f"Expected {len(bounds) + 1} pipelines"
+                f" for {len(bounds)} bounds, got: {len(pipelines)}"
+            )
+            raise ValueError(msg)
+        self.bounds = list(bounds)
+        self.pipelines = list(pipelines)
+
+    def bucket(self, texts: Sequence[str]) -> np.ndarray:
+        """Get the length bucket of the texts.
+
+        Args:
+            texts: The input texts.
+
+        Returns:
+            The bucket indices.
+
+        Examples:
+            >>> LengthRouter([5, 10], [None] * 3).bucket(["ciao", "x" * 5])
+            array([0, 1])
+
+        """
+        lengths = np.fromiter(map(len, texts), dtype=int, count=len(texts))
+        return np.searchsorted(self.bounds, lengths, side="right")
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        """Predict if the texts are Italian, with their bucket pipeline.
+
+        Args:
+            texts: The input texts.
+
+        Returns:
+            The predictions (True if the text is Italian).
+
+        """
+        texts = np.asarray(texts, dtype=object)
+        buckets = self.bucket(texts)
+        result = np.zeros(len(texts), dtype=bool)
+        for i in np.unique(buckets):
+            mask = buckets == i
+            result[mask] = self.pipelines[i].predict(texts[mask])
+        return result
+
+
+# ======================================================================
+def bucket_param_grid(index: int, n_buckets: int) -> dict[str, Sequence]:
+    """Get the hyper-parameters grid of a length bucket.
+
+    Shorter texts need (more expensive) character n-grams, while for the
+    longest texts word n-grams are accurate enough and cheaper.
+
+    Args:
+        index: The bucket index (in increasing length order).
+        n_buckets: The number of buckets.
+
+    Returns:
+        The hyper-parameters grid.
+
+    Examples:
+        >>> bucket_param_grid(0, 2)["vect__analyzer"]
+        ['char', 'char_wb']
+        >>> bucket_param_grid(1, 2)["vect__ngram_range"]
+        [(1, 1), (1, 2), (2, 2)]
+
+    """
+    if index < n_buckets - 1:
+        return {**optim.PARAM_GRID, "vect__analyzer": ["char", "char_wb"]}
+    return {
+        **optim.PARAM_GRID,
+        "vect__analyzer": ["word"],
+        "vect__ngram_range": [(1, 1), (1, 2), (2, 2)],
+    }
+
+
+# ======================================================================
+def bucket_filepath(params_filepath: Path, index: int) -> Path:
+    """Get the ML model parameters filepath of a length bucket.
+
+    Args:
+        params_filepath: The ML model parameters filepath.
+        index: The bucket index.
+
+    Returns:
+        The bucket parameters filepath.
+
+    Examples:
+        >>> print(bucket_filepath(Path("ml/optim_params.pkl.lzma"), 1))
+        ml/optim_params.bucket1.pkl.lzma
+
+    """
+    base, _, exts = params_filepath.name.partition(".")
+    return params_filepath.with_name(f"{base}.bucket{index}.{exts}")
+
+
+# ======================================================================
+def fit_router(  # noqa: PLR0913
+    data_filepath: Path = cfg.data_dir / cfg.clean_filename,
+    params_filepath: Path = cfg.ml_dir / cfg.optim_params_filename,
+    bounds: Sequence[int] = tuple(cfg.ml_router_bounds),
+    *,
+    vectorizer: model.VectorizerType = "count",
+    cross_validation: int = 5,
+    force: bool = False,
+    **optim_kws: Any,  # noqa: ANN401
+) -> LengthRouter:
+    """Tune and train one ML model pipeline per length bucket.
+
+    Each bucket is optimized separately (see `optim.hyperparams()`),
+    on its own texts and with its own grid (see `bucket_param_grid()`),
+    hence the latency / size constraints apply to its own texts.
+    Buckets with too few samples per class for cross validation use all
+    the training data.
+
+    Args:
+        data_filepath: The clean data filepath.
+            Defaults to cfg.data_dir/cfg.clean_filename.
+        params_filepath: The ML model parameters filepath, from which the
+            buckets parameters filepaths are derived
+            (see `bucket_filepath()`).
+            Defaults to cfg.ml_dir/cfg.optim_params_filename.
+        bounds: The (increasing) text lengths separating the buckets.
+            Defaults to cfg.ml_router_bounds.
+        vectorizer: The text vectorizer to use.
+            Defaults to "count".
+        cross_validation: The number of cross validation splits.
+            Defaults to 5.
+        force: Force new optimization.
+            Defaults to False.
+        **optim_kws: Additional keyword arguments for the optimization.
+
+    Returns:
+        The trained router.
+
+    """
+    data = model.training_data(data_filepath)
+    limits = [0, *bounds, None]
+    pipelines = []
+    for i, length_range in enumerate(itertools.pairwise(limits)):
+        subset = model.length_subset(data, *length_range)
+        counts = subset.target.value_counts()
+        if len(counts) < len(model.CLASSES) or counts.min() < cross_validation:
+            logger.warning(
+                "[ML] Too few samples in length bucket %s: use all data",
+                length_range,
+            )
+            subset = data
+            length_range = None  # noqa: PLW2901
+        logger.info("[ML] Length bucket %s: %d samples", i, len(subset.target))
+        params = optim.hyperparams(
+            data_filepath,
+            bucket_filepath(params_filepath, i),
+            vectorizer=vectorizer,
+            cross_validation=cross_validation,
+            param_grid=bucket_param_grid(i, len(limits) - 1),
+            length_range=length_range,
+            force=force,
+            **optim_kws,
+        )
+        params = {k: v for k, v in params.items() if not k.startswith("_")}
+        pipeline = model.base_pipeline(vectorizer).set_params(**params)
+        pipelines.append(pipeline.fit(subset.features, subset.target))
+    return LengthRouter(bounds, pipelines)
+
+
+# ======================================================================
+@functools.lru_cache(None)
+def pre_trained_router(filepath: Path) -> LengthRouter:
+    """Load pre-trained length router.
+
+    Args:
+        filepath: The length router filepath.
+
+    Returns:
+        The pre-trained length router.
+
+    """
+    logger.info("[ML] Load length router '%s'", filepath)
+    return core.load_obj(filepath)
@@ -0,0 +1,961 @@
+"""ML Hyper-parameters Search."""
+
+import collections
+import math
+import threading
+import time
+from collections.abc import Hashable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Literal, get_args
+
+import joblib
+import numpy as np
+import scipy.sparse
+from joblib.parallel import get_active_backend
+from sklearn.base import clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.utils import resample
+
+from italiclas.config import cfg
+from italiclas.logger import logger
+from italiclas.ml import feature_store
+from italiclas.ml.checkpoint import Checkpoint
+from italiclas.utils import core
+
+# : the pipeline step whose parameters change the document-term matrix
+VECT_STEP = "vect"
+
+
+# ======================================================================
+@dataclass
+class CandidateResult:
+    """Cross-validation result of a candidate parameters set.
+
+    The scores and the times (featurization, fit and prediction with
+    scoring) are listed per fold; the featurization time of a fold is
+    split evenly among the candidates sharing its document-term matrices.
+    """
+
+    params: dict[str, Any]
+    n_samples: int
+    scores: dict[str, list[float]] = field(default_factory=dict)
+    featurize_times: list[float] = field(default_factory=list)
+    fit_times: list[float] = field(default_factory=list)
+    score_times: list[float] = field(default_factory=list)
+
+    def mean_score(self, scoring: str | None = None) -> float:
+        """Get the mean cross-validation score.
+
+        Args:
+            scoring: The scoring metric.
+                If None, the first scoring metric is used.
+                Defaults to None.
+
+        Returns:
+            The mean score over the cross-validation folds.
+
+        """
+        if scoring is None:
+            scoring = next(iter(self.scores))
+        return float(np.mean(self.scores[scoring]))
+
+    def std_score(self, scoring: str | None = None) -> float:
+        """Get the standard deviation of the cross-validation score.
+
+        Args:
+            scoring: The scoring metric.
+                If None, the first scoring metric is used.
+                Defaults to None.
+
+        Returns:
+            The standard deviation of the score over the folds.
+
+        """
+        if scoring is None:
+            scoring = next(iter(self.scores))
+        return float(np.std(self.scores[scoring]))
+
+
+# ======================================================================
+class FeatureCache:
+    """Memory-bounded LRU cache for document-term matrices.
+
+    The numbers of hits and misses are counted (as `hits` and `misses`).
+
+    Args:
+        max_bytes: The maximum size of the cached matrices (in bytes).
+            Defaults to cfg.ml_feature_cache_bytes.
+
+    """
+
+    def __init__(self, max_bytes: int = cfg.ml_feature_cache_bytes) -> None:
+        """Initialize the cache."""
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: collections.OrderedDict[Hashable, tuple] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of cached items."""
+        return len(self._items)
+
+    def get(self, key: Hashable) -> tuple | None:
+        """Get a cached item (or None if missing)."""
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: Hashable, matrices: tuple) -> None:
+        """Cache an item, evicting the least recently used if needed."""
+        size = sum(_nbytes(matrix) for matrix in matrices)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            while self._items and self.nbytes + size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= sum(_nbytes(matrix) for matrix in evicted)
+            self._items[key] = matrices
+            self.nbytes += size
+
+
+# ======================================================================
+def _nbytes(matrix: scipy.sparse.spmatrix | np.ndarray) -> int:
+    """Get the memory used by a (sparse) matrix (in bytes)."""
+    if scipy.sparse.issparse(matrix):
+        return (
+            matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        )
+    return np.asarray(matrix).nbytes
+
+
+# ======================================================================
+def split_params(
+    params: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Split pipeline parameters into vectorizer and classifier parameters.
+
+    Args:
+        params: The pipeline parameters.
+
+    Returns:
+        The vectorizer and the classifier parameters (without step prefix).
+
+    Examples:
+        >>> split_params({"vect__analyzer": "char", "clf__alpha": 0.5})
+        ({'analyzer': 'char'}, {'alpha': 0.5})
+
+    """
+    vect_params = {}
+    clf_params = {}
+    for key, value in params.items():
+        step, name = key.split("__", 1)
+        if step == VECT_STEP:
+            vect_params[name] = value
+        else:
+            clf_params[name] = value
+    return vect_params, clf_params
+
+
+# ======================================================================
+def _freeze(params: dict[str, Any]) -> tuple:
+    """Get a hashable key for a parameters set."""
+    return tuple(sorted(params.items(), key=lambda item: item[0]))
+
+
+# ======================================================================
+def _evaluate_task(  # noqa: PLR0913
+    pipeline: Pipeline,
+    vect_params: dict[str, Any],
+    clf_params_list: Sequence[dict[str, Any]],
+    features: np.ndarray,
+    target: np.ndarray,
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    scorings: Sequence[str],
+    cache: FeatureCache | None,
+    store: feature_store.FeatureStore | None,
+    cache_key: Hashable,
+    checkpoint: Checkpoint | None = None,
+    checkpoint_keys: Sequence[str | None] = (),
+) -> list[tuple[dict[str, float], float, float, float]]:
+    """Featurize a fold once and evaluate all the classifier parameters."""
+    begin_time = time.perf_counter()
+    matrices = cache.get(cache_key) if cache is not None else None
+    vect = clone(pipeline[VECT_STEP]).set_params(**vect_params)
+    store_key = store.key(vect, cache_key) if store is not None else None
+    if matrices is None and store is not None:
+        entry = store.get(store_key)
+        matrices = entry[0] if entry is not None else None
+    if matrices is None:
+        matrices = (
+            vect.fit_transform(features[train_index]),
+            vect.transform(features[test_index]),
+        )
+        if store is not None:
+            store.put(store_key, matrices)
+    if cache is not None:
+        cache.put(cache_key, matrices)
+    # : the featurization is shared by all the classifier parameters
+    featurize_time = (time.perf_counter() - begin_time) / len(
+        clf_params_list,
+    )
+    x_train, x_test = matrices
+    y_train, y_test = target[train_index], target[test_index]
+    results = []
+    for i, clf_params in enumerate(clf_params_list):
+        clf = clone(pipeline[-1]).set_params(**clf_params)
+        begin_time = time.perf_counter()
+        clf.fit(x_train, y_train)
+        fit_time = time.perf_counter() - begin_time
+        scorer = check_scoring(clf, scoring=list(scorings))
+        begin_time = time.perf_counter()
+        scores = scorer(clf, x_test, y_test)
+        score_time = time.perf_counter() - begin_time
+        scores = {name: float(score) for name, score in scores.items()}
+        results.append((scores, featurize_time, fit_time, score_time))
+        if checkpoint is not None:
+            checkpoint.append(
+                [
+                    {
+                        "key": checkpoint_keys[i],
+                        "scores": scores,
+                        "featurize_time": featurize_time,
+                        "fit_time": fit_time,
+                        "score_time": score_time,
+                    },
+                ],
+            )
+    return results
+
+
+# ======================================================================
+def _shares_memory() -> bool:
+    """Check if the active parallel backend shares the process memory."""
+    backend, n_jobs = get_active_backend()
+    # : no jobs means the default (sequential) run
+    return n_jobs in {None, 1} or getattr(backend, "uses_threads", False)
+
+
+# ======================================================================
+def _checkpointed(
+    checkpoint: Checkpoint | None,
+    candidates: Sequence[dict[str, Any]],
+    eval_key: tuple,
+    n_folds: int,
+) -> tuple[dict[tuple[int, int], str | None], dict[tuple[int, int], tuple]]:
+    """Get the checkpoint keys and results of (candidate, fold) pairs."""
+    checkpoint_keys = {}
+    fold_results = {}
+    done = checkpoint.load() if checkpoint is not None else {}
+    for i, params in enumerate(candidates):
+        for fold_index in range(n_folds):
+            key = (
+                Checkpoint.key(*eval_key, params, fold_index)
+                if checkpoint is not None
+                else None
+            )
+            checkpoint_keys[i, fold_index] = key
+            if key in done:
+                record = done[key]
+                fold_results[i, fold_index] = (
+                    record["scores"],
+                    record.get("featurize_time", 0.0),
+                    record["fit_time"],
+                    record["score_time"],
+                )
+    return checkpoint_keys, fold_results
+
+
+# ======================================================================
+def _collect(
+    params: dict[str, Any],
+    n_samples: int,
+    fold_results: Iterable[tuple[dict[str, float], float, float, float]],
+) -> CandidateResult:
+    """Collect the fold results of a candidate."""
+    result = CandidateResult(params=params, n_samples=n_samples)
+    for scores, featurize_time, fit_time, score_time in fold_results:
+        for scoring, score in scores.items():
+            result.scores.setdefault(scoring, []).append(score)
+        result.featurize_times.append(featurize_time)
+        result.fit_times.append(fit_time)
+        result.score_times.append(score_time)
+    return result
+
+
+# ======================================================================
+def evaluate(  # noqa: PLR0913
+    pipeline: Pipeline,
+    candidates: Iterable[dict[str, Any]],
+    features: Sequence[str],
+    target: Sequence[bool],
+    *,
+    scorings: Sequence[str] = ("f1",),
+    cross_validation: int = 5,
+    cache: FeatureCache | None = None,
+    store: feature_store.FeatureStore | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> list[CandidateResult]:
+    """Evaluate candidate parameters sets with cross-validation.
+
+    The candidates are grouped by vectorizer parameters, so that each
+    (vectorizer parameters, fold) pair is featurized only once, and all
+    the classifier parameters are evaluated on the same matrices.
+    These tasks run in parallel according to the active joblib
+    configuration (see `parallel.parallel_config()`).
+
+    Args:
+        pipeline: The ML model pipeline.
+        candidates: The parameters sets to evaluate.
+        features: The input texts.
+        target: The target labels.
+        scorings: The scoring metrics.
+            Defaults to ("f1",).
+        cross_validation: The number of (stratified) cross validation splits.
+            Defaults to 5.
+        cache: The cache for the fold document-term matrices.
+            It is only used if the workers share the process memory.
+            If None, the matrices are not cached.
+            Defaults to None.
+        store: The on-disk store for the fold document-term matrices,
+            shared across processes and runs.
+            If None, the matrices are not stored.
+            Defaults to None.
+        checkpoint: The checkpoint where each (candidate, fold)
+            evaluation is saved as soon as completed.
+            The evaluations already in the checkpoint are skipped.
+            If None, no checkpoint is used.
+            Defaults to None.
+
+    Returns:
+        The results, in the same order as the candidates.
+
+    """
+    candidates = list(candidates)
+    features = np.asarray(features, dtype=object)
+    target = np.asarray(target)
+    folds = list(
+        StratifiedKFold(n_splits=cross_validation).split(features, target),
+    )
+    if cache is not None and not _shares_memory():
+        cache = None
+    data_key = (
+        joblib.hash((features, target, joblib.hash(pipeline[VECT_STEP])))
+        if cache is not None or store is not None or checkpoint is not None
+        else None
+    )
+    # : get the (candidate, fold) evaluations already checkpointed
+    checkpoint_keys, fold_results = _checkpointed(
+        checkpoint,
+        candidates,
+        (data_key, list(scorings), cross_validation),
+        len(folds),
+    )
+    if fold_results:
+        logger.info(
+            "[ML] Resume %d evaluations from checkpoint",
+            len(fold_results),
+        )
+    # : group the candidates to evaluate by vectorizer parameters
+    groups: dict[tuple, list[int]] = {}
+    split_candidates = [split_params(params) for params in candidates]
+    for i, (vect_params, _) in enumerate(split_candidates):
+        groups.setdefault(_freeze(vect_params), []).append(i)
+    tasks = []
+    for vect_key, indices in groups.items():
+        for fold_index, (train_index, test_index) in enumerate(folds):
+            todo = [i for i in indices if (i, fold_index) not in fold_results]
+            if todo:
+                tasks.append(
+                    (vect_key, fold_index, train_index, test_index, todo),
+                )
+    task_results = joblib.Parallel()(
+        joblib.delayed(_evaluate_task)(
+            pipeline,
+            dict(vect_key),
+            [split_candidates[i][1] for i in todo],
+            features,
+            target,
+            train_index,
+            test_index,
+            scorings,
+            cache,
+            store,
+            (data_key, vect_key, cross_validation, fold_index),
+            checkpoint,
+            [checkpoint_keys[i, fold_index] for i in todo],
+        )
+        for vect_key, fold_index, train_index, test_index, todo in tasks
+    )
+    for (_, fold_index, _, _, todo), results in zip(
+        tasks,
+        task_results,
+        strict=True,
+    ):
+        for i, result in zip(todo, results, strict=True):
+            fold_results[i, fold_index] = result
+    return [
+        _collect(
+            params,
+            len(target),
+            [fold_results[i, j] for j in range(len(folds))],
+        )
+        for i, params in enumerate(candidates)
+    ]
+
+
+# ======================================================================
+def _check_candidates(candidates: Sequence[dict[str, Any]]) -> None:
+    """Check there are candidates to search."""
+    if not candidates:
+        msg = "No candidates to search"
+        raise ValueError(msg)
+
+
+# ======================================================================
+def halving_schedule(
+    n_candidates: int,
+    max_resources: int,
+    min_resources: int,
+    factor: int = 3,
+) -> list[int]:
+    """Compute the number of samples for each successive halving iteration.
+
+    The minimum number of samples is chosen (above `min_resources`)
+    so that the last iteration uses as many samples as possible,
+    like `HalvingGridSearchCV(min_resources="exhaust")`.
+
+    Args:
+        n_candidates: The number of candidates.
+        max_resources: The maximum number of samples.
+        min_resources: The minimum number of samples.
+        factor: The candidates reduction factor at each iteration.
+            Defaults to 3.
+
+    Returns:
+        The number of samples for each iteration.
+
+    Raises:
+        ValueError: if there are no samples (or no minimum samples).
+
+    Examples:
+        >>> halving_schedule(540, 10_000, 20)
+        [41, 123, 369, 1107, 3321, 9963]
+        >>> halving_schedule(10, 100, 20)
+        [20, 60]
+        >>> halving_schedule(10, 0, 20)
+        Traceback (most recent call last):
+        ...
+        ValueError: No samples to search on: 0 (minimum: 20)
+
+    """
+    if max_resources < 1 or min_resources < 1:
+        msg = (
+            f"No samples to search on: {max_resources}"
+            f" (minimum: {min_resources})"
+        )
+        raise ValueError(msg)
+    n_required = _ilog(n_candidates, factor) + 1
+    min_resources = max(
+        max_resources // factor ** (n_required - 1),
+        min_resources,
+    )
+    n_possible = _ilog(max_resources // min_resources, factor) + 1
+    n_iterations = min(n_required, n_possible)
+    return [min_resources * factor**i for i in range(n_iterations)]
+
+
+# ======================================================================
+def _ilog(value: int, base: int) -> int:
+    """Compute the integer logarithm (without rounding errors)."""
+    result = 0
+    while value >= base:
+        value //= base
+        result += 1
+    return result
+
+
+# ======================================================================
+StrategyType = Literal["grid", "halving", "random"]
+STRATEGIES = get_args(StrategyType)
+
+
+# ======================================================================
+@dataclass
+class Budget:
+    """Search budget and early stopping criteria.
+
+    The budget is checked between evaluation batches (or halving
+    iterations), hence it can be exceeded by (at most) one of them.
+
+    Args:
+        max_time: The maximum search time (in s).
+            If None or 0, there is no time limit.
+            Defaults to None.
+        max_candidates: The maximum number of candidates to evaluate.
+            If None or 0, there is no limit.
+            Defaults to None.
+        patience: The number of consecutive candidates without improvement
+            after which the search is stopped (not supported by halving,
+            see `check_search()`).
+            If None or 0, there is no early stopping.
+            Defaults to None.
+        tol: The minimum score increase to count as an improvement.
+            Defaults to 0.0.
+
+    """
+
+    max_time: float | None = None
+    max_candidates: int | None = None
+    patience: int | None = None
+    tol: float = 0.0
+    begin_time: float | None = field(default=None, init=False)
+
+    def start(self) -> None:
+        """Start the time budget (if not started yet)."""
+        if self.begin_time is None:
+            self.begin_time = time.perf_counter()
+
+    def is_time_over(self) -> bool:
+        """Check if the time budget is over."""
+        return (
+            bool(self.max_time)
+            and self.begin_time is not None
+            and time.perf_counter() - self.begin_time >= self.max_time
+        )
+
+
+# ======================================================================
+@dataclass
+class SearchResult:
+    """Hyper-parameters search result.
+
+    The stop reason is one of: "completed", "time", "patience".
+    """
+
+    best: CandidateResult
+    results: list[CandidateResult]
+    stop_reason: str = "completed"
+
+
+# ======================================================================
+def sample_candidates(
+    param_grid: dict[str, Sequence],
+    strategy: StrategyType = "grid",
+    max_candidates: int | None = None,
+    random_state: int = 0,
+) -> list[dict[str, Any]]:
+    """Get the candidate parameters sets of a grid to evaluate.
+
+    For "grid", the candidates are sorted by vectorizer parameters
+    (to share the featurization within the evaluation batches)
+    and truncated, otherwise they are sampled randomly.
+
+    Args:
+        param_grid: The parameters grid.
+        strategy: The search strategy.
+            Defaults to "grid".
+        max_candidates: The maximum number of candidates.
+            If None or 0, there is no limit.
+            Defaults to None.
+        random_state: The seed for sampling.
+            Defaults to 0.
+
+    Returns:
+        The candidates.
+
+    Examples:
+        >>> grid = {"vect__analyzer": ["char", "word"], "clf__alpha": [1, 2]}
+        >>> sample_candidates(grid)  # doctest: +NORMALIZE_WHITESPACE
+        [{'clf__alpha': 1, 'vect__analyzer': 'char'},
+         {'clf__alpha': 2, 'vect__analyzer': 'char'},
+         {'clf__alpha': 1, 'vect__analyzer': 'word'},
+         {'clf__alpha': 2, 'vect__analyzer': 'word'}]
+        >>> len(sample_candidates(grid, "random", 3))
+        3
+
+    """
+    candidates = list(ParameterGrid(param_grid))
+    if strategy == "grid":
+        candidates.sort(key=lambda params: repr(_vect_key(params)))
+    else:
+        rng = np.random.default_rng(random_state)
+        candidates = [candidates[i] for i in rng.permutation(len(candidates))]
+    return candidates[: max_candidates or None]
+
+
+# ======================================================================
+def _vect_key(params: dict[str, Any]) -> tuple:
+    """Get the key of the vectorizer parameters of a candidate."""
+    return _freeze(split_params(params)[0])
+
+
+# ======================================================================
+def sequential_search(  # noqa: PLR0913
+    pipeline: Pipeline,
+    candidates: Sequence[dict[str, Any]],
+    features: Sequence[str],
+    target: Sequence[bool],
+    *,
+    scorings: Sequence[str] = ("f1",),
+    cross_validation: int = 5,
+    budget: Budget | None = None,
+    batch_size: int = 16,
+    cache: FeatureCache | None = None,
+    store: feature_store.FeatureStore | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> SearchResult:
+    """Search the best parameters evaluating the candidates in batches.
+
+    The search stops early when the time budget is over, or when the
+    score has not improved for `budget.patience` candidates.
+
+    Args:
+        pipeline: The ML model pipeline.
+        candidates: The candidate parameters sets, in evaluation order.
+        features: The input texts.
+        target: The target labels.
+        scorings: The scoring metrics (the first is used for ranking).
+            Defaults to ("f1",).
+        cross_validation: The number of cross validation splits.
+            Defaults to 5.
+        budget: The search budget.
+            If None, there is no limit.
+            Defaults to None.
+        batch_size: The number of candidates evaluated together.
+            Defaults to 16.
+        cache: The cache for the fold document-term matrices.
+            Defaults to None.
+        store: The on-disk store for the fold document-term matrices.
+            Defaults to None.
+        checkpoint: The checkpoint of the evaluations, to resume from.
+            Defaults to None.
+
+    Returns:
+        The search result.
+
+    Raises:
+        ValueError: if there are no candidates.
+
+    """
+    _check_candidates(candidates)
+    budget = budget or Budget()
+    features = np.asarray(features, dtype=object)
+    target = np.asarray(target)
+    results: list[CandidateResult] = []
+    best = None
+    since_best = 0
+    stop_reason = "completed"
+    for begin in range(0, len(candidates), batch_size):
+        batch = evaluate(
+            pipeline,
+            candidates[begin : begin + batch_size],
+            features,
+            target,
+            scorings=scorings,
+            cross_validation=cross_validation,
+            cache=cache,
+            store=store,
+            checkpoint=checkpoint,
+        )
+        for result in batch:
+            results.append(result)
+            if (
+                best is None
+                or result.mean_score() > best.mean_score() + budget.tol
+            ):
+                best = result
+                since_best = 0
+            else:
+                since_best += 1
+        logger.info(
+            "[ML] Evaluated %d/%d candidates, best score: %s",
+            len(results),
+            len(candidates),
+            core.number2str(best.mean_score()),
+        )
+        if len(results) == len(candidates):
+            break
+        if budget.patience and since_best >= budget.patience:
+            stop_reason = "patience"
+            break
+        if budget.is_time_over():
+            stop_reason = "time"
+            break
+    return SearchResult(best=best, results=results, stop_reason=stop_reason)
+
+
+# ======================================================================
+def successive_halving(  # noqa: PLR0913
+    pipeline: Pipeline,
+    candidates: Sequence[dict[str, Any]],
+    features: Sequence[str],
+    target: Sequence[bool],
+    *,
+    scorings: Sequence[str] = ("f1",),
+    cross_validation: int = 5,
+    budget: Budget | None = None,
+    factor: int = 3,
+    random_state: int = 0,
+    cache: FeatureCache | None = None,
+    store: feature_store.FeatureStore | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> SearchResult:
+    """Search the best parameters with successive halving.
+
+    All candidates are first evaluated on a small (stratified) subsample,
+    then only the best `1 / factor` are evaluated on `factor` times more
+    samples, until a single iteration is left, similarly to
+    `HalvingGridSearchCV`.
+    If the time budget is over, the search stops after the current
+    iteration, and the best candidate of that iteration is returned,
+    after evaluating it on all the samples (so that it can be compared
+    to the other searches, and to the previous parameters).
+    The fold matrices of the subsampled iterations are never reused
+    (each iteration draws different samples), hence they are not cached
+    in memory.
+
+    Args:
+        pipeline: The ML model pipeline.
+        candidates: The candidate parameters sets.
+        features: The input texts.
+        target: The target labels.
+        scorings: The scoring metrics (the first is used for ranking).
+            Defaults to ("f1",).
+        cross_validation: The number of cross validation splits.
+            Defaults to 5.
+        budget: The search budget.
+            If None, there is no limit.
+            Defaults to None.
+        factor: The candidates reduction factor at each iteration.
+            Defaults to 3.
+        random_state: The seed for subsampling.
+            Defaults to 0.
+        cache: The cache for the fold document-term matrices.
+            Defaults to None.
+        store: The on-disk store for the fold document-term matrices.
+            Defaults to None.
+        checkpoint: The checkpoint of the evaluations, to resume from.
+            Defaults to None.
+
+    Returns:
+        The search result.
+
+    Raises:
+        ValueError: if there are no candidates, or no samples.
+
+    """
+    candidates = list(candidates)
+    _check_candidates(candidates)
+    budget = budget or Budget()
+    features = np.asarray(features, dtype=object)
+    target = np.asarray(target)
+    n_classes = np.unique(target).size
+    schedule = halving_schedule(
+        len(candidates),
+        len(target),
+        2 * cross_validation * n_classes,
+        factor,
+    )
+    all_results = []
+    stop_reason = "completed"
+    for i, n_samples in enumerate(schedule):
+        logger.info(
+            "[ML] Halving iteration %d/%d: %d candidates on %d samples",
+            i + 1,
+            len(schedule),
+            len(candidates),
+            n_samples,
+        )
+        if n_samples < len(target):
+            indices = resample(
+                np.arange(len(target)),
+                n_samples=n_samples,
+                replace=False,
+                stratify=target,
+                random_state=random_state,
+            )
+        else:
+            indices = np.arange(len(target))
+        results = evaluate(
+            pipeline,
+            candidates,
+            features[indices],
+            target[indices],
+            scorings=scorings,
+            cross_validation=cross_validation,
+            cache=cache if n_samples >= len(target) else None,
+            store=store,
+            checkpoint=checkpoint,
+        )
+        results.sort(key=lambda result: result.mean_score())
+        all_results.extend(results)
+        candidates = [
+            result.params
+            for result in results[-math.ceil(len(results) / factor) :]
+        ]
+        if i + 1 < len(schedule) and budget.is_time_over():
+            stop_reason = "time"
+            break
+    if stop_reason == "time" and all_results[-1].n_samples < len(target):
+        logger.info("[ML] Evaluate the best candidate on all the samples")
+        all_results.extend(
+            evaluate(
+                pipeline,
+                [all_results[-1].params],
+                features,
+                target,
+                scorings=scorings,
+                cross_validation=cross_validation,
+                cache=cache,
+                store=store,
+                checkpoint=checkpoint,
+            ),
+        )
+    return SearchResult(
+        best=all_results[-1],
+        results=all_results,
+        stop_reason=stop_reason,
+    )
+
+
+# ======================================================================
+def check_search(strategy: StrategyType, budget: Budget) -> None:
+    """Check a search strategy and budget.
+
+    The patience is not supported by successive halving, since the
+    scores of its iterations (on different numbers of samples) are not
+    comparable.
+
+    Args:
+        strategy: The search strategy.
+        budget: The search budget.
+
+    Raises:
+        ValueError: if the strategy is unknown, or if a patience is given
+            for halving.
+
+    Examples:
+        >>> check_search("halving", Budget(patience=10))
+        Traceback (most recent call last):
+        ...
+        ValueError: Patience is not supported by the halving strategy
+
+    """
+    if strategy not in STRATEGIES:
+        msg = f"Unknown strategy: {strategy}. Must be in: {STRATEGIES}"
+        raise ValueError(msg)
+    if strategy == "halving" and budget.patience:
+        msg = "Patience is not supported by the halving strategy"
+        raise ValueError(msg)
+
+
+# ======================================================================
+def search(  # noqa: PLR0913
+    pipeline: Pipeline,
+    param_grid: dict[str, Sequence],
+    features: Sequence[str],
+    target: Sequence[bool],
+    *,
+    strategy: StrategyType = "halving",
+    scorings: Sequence[str] = ("f1",),
+    cross_validation: int = 5,
+    budget: Budget | None = None,
+    random_state: int = 0,
+    cache: FeatureCache | None = None,
+    store: feature_store.FeatureStore | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> SearchResult:
+    """Search the best parameters of a grid.
+
+    Args:
+        pipeline: The ML model pipeline.
+        param_grid: The parameters grid.
+        features: The input texts.
+        target: The target labels.
+        strategy: The search strategy.
+            If "grid", evaluate the grid exhaustively (within budget).
+            If "halving", use successive halving on the data size.
+            If "random", evaluate the candidates in random order
+            (within budget).
+            Defaults to "halving".
+        scorings: The scoring metrics (the first is used for ranking).
+            Defaults to ("f1",).
+        cross_validation: The number of cross validation splits.
+            Defaults to 5.
+        budget: The search budget.
+            Its time budget is started by the first search using it,
+            hence it is shared by successive searches.
+            If None, there is no limit.
+            Defaults to None.
+        random_state: The seed for sampling.
+            Defaults to 0.
+        cache: The cache for the fold document-term matrices.
+            Defaults to None.
+        store: The on-disk store for the fold document-term matrices.
+            Defaults to None.
+        checkpoint: The checkpoint of the evaluations, to resume from.
+            Defaults to None.
+
+    Returns:
+        The search result (the best found so far, if stopped early).
+
+    Raises:
+        ValueError: if the strategy is unknown, or does not support
+            the budget (see `check_search()`).
+
+    """
+    budget = budget or Budget()
+    check_search(strategy, budget)
+    budget.start()
+    candidates = sample_candidates(
+        param_grid,
+        strategy,
+        budget.max_candidates,
+        random_state,
+    )
+    logger.info("[ML] Search %d candidates (%s)", len(candidates), strategy)
+    kws = {
+        "scorings": scorings,
+        "cross_validation": cross_validation,
+        "budget": budget,
+        "cache": cache,
+        "store": store,
+        "checkpoint": checkpoint,
+    }
+    if strategy == "halving":
+        result = successive_halving(
+            pipeline,
+            candidates,
+            features,
+            target,
+            random_state=random_state,
+            **kws,
+        )
+    else:
+        result = sequential_search(
+            pipeline,
+            candidates,
+            features,
+            target,
+            **kws,
+        )
+    logger.info(
+        "[ML] Best %s = %s (search %s)",
+        core.labelify(core.namify(scorings[0])),
+        core.number2str(result.best.mean_score()),
+        result.stop_reason,
+    )
+    return result
@@ -0,0 +1,235 @@
+"""ML Segment-level Prediction."""
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, get_args
+
+import joblib
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from italiclas.config import cfg
+from italiclas.logger import logger
+from italiclas.ml import features, model, parallel, progressive
+
+# : the sentence boundaries: whitespace after punctuation, or newlines
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\s*\n\s*")
+
+# ======================================================================
+SegmentationType = Literal["sentence", "window"]
+SEGMENTATIONS = get_args(SegmentationType)
+
+
+# ======================================================================
+@dataclass
+class Segment:
+    """A classified text segment (with character offsets)."""
+
+    start: int
+    end: int
+    is_italian: bool
+    probability: float
+
+
+# ======================================================================
+@dataclass
+class SegmentsResult:
+    """Segment-level prediction result.
+
+    The Italian fraction is weighted by the segment lengths.
+    """
+
+    segments: list[Segment]
+    italian_fraction: float
+
+
+# ======================================================================
+def split_segments(
+    text: str,
+    mode: SegmentationType = "sentence",
+    window_size: int = cfg.segment_window_size,
+    max_length: int = cfg.segment_max_length,
+) -> list[tuple[int, int]]:
+    r"""Split a text into segments.
+
+    Args:
+        text: The input text.
+        mode: The segmentation mode.
+            If "sentence", split at sentence ends and newlines
+            (sentences longer than `max_length` are split further).
+            If "window", split into windows of `window_size` characters
+            (at whitespace, when possible).
+            Defaults to "sentence".
+        window_size: The window size (in characters).
+            Defaults to cfg.segment_window_size.
+        max_length: The maximum sentence length (in characters).
+            Defaults to cfg.segment_max_length.
+
+    Returns:
+        The (start, end) offsets of the non-blank segments.
+
+    Raises:
+        ValueError: if the segmentation mode is unknown.
+
+    Examples:
+        >>> text = "Ciao a tutti! Hello world.\nCome va?"
+        >>> [text[a:b] for a, b in split_segments(text)]
+        ['Ciao a tutti!', 'Hello world.', 'Come va?']
+        >>> [text[a:b] for a, b in split_segments(text, "window", 14)]
+        ['Ciao a tutti! ', 'Hello world.\n', 'Come va?']
+
+    """
+    if mode == "sentence":
+        bounds = [0]
+        for match in _SENTENCE_END.finditer(text):
+            bounds.extend(match.span())
+        bounds.append(len(text))
+        spans = list(zip(bounds[::2], bounds[1::2], strict=True))
+        size = max_length
+    elif mode == "window":
+        spans = [(0, len(text))]
+        size = window_size
+    else:
+        msg = f"Unknown segmentation: {mode}. Must be in: {SEGMENTATIONS}"
+        raise ValueError(msg)
+    segments = []
+    for begin, end in spans:
+        offset = begin
+        for chunk in progressive.iter_chunks(text[begin:end], size):
+            if chunk.strip():
+                segments.append((offset, offset + len(chunk)))
+            offset += len(chunk)
+    return segments
+
+
+# ======================================================================
+def classify(
+    pipeline: Pipeline,
+    texts: Sequence[str],
+    n_jobs: int | None = cfg.ml_n_jobs,
+    min_parallel: int = cfg.segment_parallel_min,
+) -> np.ndarray:
+    """Compute the probabilities of being Italian of many texts.
+
+    All texts are classified in a single batched call, split across
+    parallel threads for many texts (sharing the pipeline, which is
+    neither pickled nor copied to worker processes on each request).
+    Only the hashing vectorizer (whose compiled kernels release the GIL)
+    runs concurrently in threads: with the other vectorizers, which hold
+    the GIL, the texts are classified sequentially (threads would only
+    add overhead).
+
+    Args:
+        pipeline: The trained ML model pipeline.
+        texts: The input texts.
+        n_jobs: The number of parallel threads.
+            Defaults to cfg.ml_n_jobs.
+        min_parallel: The minimum number of texts for parallel workers.
+            Defaults to cfg.segment_parallel_min.
+
+    Returns:
+        The probabilities of being Italian.
+
+    """
+    index = list(pipeline.classes_).index(True)
+    if not texts:
+        return np.empty(0)
+    if (
+        n_jobs == 1
+        or len(texts) < min_parallel
+        or not isinstance(pipeline["vect"], features.NgramHashingVectorizer)
+    ):
+        return pipeline.predict_proba(texts)[:, index]
+    batches = np.array_split(
+        np.asarray(texts, dtype=object),
+        joblib.effective_n_jobs(n_jobs),
+    )
+    with parallel.parallel_config(n_jobs, "threading"):
+        probas = joblib.Parallel()(
+            joblib.delayed(pipeline.predict_proba)(batch) for batch in batches
+        )
+    return np.concatenate(probas)[:, index]
+
+
+# ======================================================================
+def predict_segments(
+    pipeline: Pipeline,
+    text: str,
+    mode: SegmentationType = "sentence",
+    n_jobs: int | None = cfg.ml_n_jobs,
+) -> SegmentsResult:
+    """Predict which segments of a (mixed-language) text are Italian.
+
+    Args:
+        pipeline: The trained ML model pipeline.
+        text: The input text.
+        mode: The segmentation mode (see `split_segments()`).
+            Defaults to "sentence".
+        n_jobs: The number of parallel workers (see `classify()`).
+            Defaults to cfg.ml_n_jobs.
+
+    Returns:
+        The prediction result.
+
+    """
+    spans = split_segments(text, mode)
+    probabilities = classify(
+        pipeline,
+        [text[start:end] for start, end in spans],
+        n_jobs,
+    )
+    segments = [
+        Segment(
+            start=start,
+            end=end,
+            is_italian=bool(probability > 0.5),  # noqa: PLR2004
+            probability=float(probability),
+        )
+        for (start, end), probability in zip(spans, probabilities, strict=True)
+    ]
+    total = sum(segment.end - segment.start for segment in segments)
+    italian = sum(
+        segment.end - segment.start
+        for segment in segments
+        if segment.is_italian
+    )
+    result = SegmentsResult(
+        segments=segments,
+        italian_fraction=italian / total if total else 0.0,
+    )
+    logger.debug(
+        "[ML] Segments: %d, Italian fraction: %s",
+        len(segments),
+        result.italian_fraction,
+    )
+    return result
+
+
+# ======================================================================
+def predict(
+    text: str,
+    mode: SegmentationType = "sentence",
+    ml_pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
+) -> SegmentsResult:
+    """Predict which segments of a (mixed-language) text are Italian.
+
+    Args:
+        text: The input text.
+        mode: The segmentation mode (see `split_segments()`).
+            Defaults to "sentence".
+        ml_pipeline_filepath: The ML model pipeline filepath.
+            Defaults to cfg.ml_dir/cfg.ml_model_pipeline_filename.
+
+    Returns:
+        The prediction result.
+
+    Examples:
+        >>> predict("Ciao a tutti! Hello world.").italian_fraction
+        ... # doctest: +SKIP
+        0.52
+
+    """
+    pipeline = model.pre_trained_pipeline(ml_pipeline_filepath)
+    return predict_segments(pipeline, text, mode)
@@ -2,17 +2,308 @@
 """ML Train Model."""
 
 import argparse
+import collections
+import concurrent.futures
 import logging
+import os
+from collections.abc import Sequence
 from pathlib import Path
+from typing import Any
 
+import pandas as pd
+from sklearn.base import TransformerMixin
 from sklearn.pipeline import Pipeline
 
 from italiclas.config import cfg
+from italiclas.etl import clean_data, dedup
 from italiclas.logger import logger
-from italiclas.ml import model, optim
+from italiclas.ml import (
+    cascade,
+    feature_store,
+    model,
+    naive_bayes,
+    optim,
+    routing,
+)
 from italiclas.utils import core, misc, stopwatch
 
 
+# ======================================================================
+def _count_shard(
+    vect: TransformerMixin,
+    features: pd.Series,
+    target: pd.Series,
+) -> naive_bayes.NBCounts:
+    """Featurize a data shard and compute its Naive Bayes counts."""
+    return naive_bayes.count(vect.transform(features), target, model.CLASSES)
+
+
+# ======================================================================
+def _accumulate(
+    total: naive_bayes.NBCounts | None,
+    counts: naive_bayes.NBCounts,
+) -> naive_bayes.NBCounts:
+    """Fold the counts of a shard into the running total."""
+    return counts if total is None else naive_bayes.merge([total, counts])
+
+
+# ======================================================================
+def fit_streaming(
+    pipeline: Pipeline,
+    data_filepath: Path,
+    chunk_size: int = 10_000,
+    max_rows: int | None = None,
+    n_jobs: int | None = 1,
+) -> Pipeline:
+    """Fit a pipeline with a stateless vectorizer on streamed data chunks.
+
+    If `n_jobs` is not 1, each chunk (shard) is featurized and counted
+    in a separate process, and the Naive Bayes counts are merged into
+    a running total as the shards complete, hence the memory does not
+    grow with the number of chunks.
+    The result is identical to a single-process fit.
+
+    Args:
+        pipeline: The ML model pipeline.
+            The vectorizer must be stateless, e.g. `NgramHashingVectorizer`.
+        data_filepath: The clean data filepath.
+        chunk_size: The number of rows per chunk.
+            Defaults to 10_000.
+        max_rows: The maximum number of rows to use.
+            If None, all rows are used.
+            Defaults to None.
+        n_jobs: The number of parallel processes.
+            If None or -1, use the number of CPUs.
+            Defaults to 1.
+
+    Returns:
+        The fitted pipeline.
+
+    """
+    vect = pipeline["vect"]
+    clf = pipeline["clf"]
+    chunks = model.iter_training_data(data_filepath, chunk_size, max_rows)
+    if n_jobs == 1:
+        for chunk in chunks:
+            clf.partial_fit(
+                vect.transform(chunk.features),
+                chunk.target,
+                classes=model.CLASSES,
+            )
+        return pipeline
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    logger.info("[ML] Count data shards using %d processes", n_jobs)
+    counts = None
+    with concurrent.futures.ProcessPoolExecutor(n_jobs) as executor:
+        # : limit the pending shards to bound the memory
+        pending: collections.deque[concurrent.futures.Future] = (
+            collections.deque()
+        )
+        for chunk in chunks:
+            if len(pending) >= 2 * n_jobs:
+                counts = _accumulate(counts, pending.popleft().result())
+            pending.append(
+                executor.submit(
+                    _count_shard,
+                    vect,
+                    chunk.features,
+                    chunk.target,
+                ),
+            )
+        while pending:
+            counts = _accumulate(counts, pending.popleft().result())
+    if counts is None:
+        msg = f"No training data in: {data_filepath}"
+        raise ValueError(msg)
+    naive_bayes.to_estimator(counts, clf)
+    return pipeline
+
+
+# ======================================================================
+def profile_training(
+    data_filepath: Path = cfg.data_dir / cfg.clean_filename,
+    sizes: Sequence[int] = (1_000, 10_000, 100_000),
+    chunk_size: int = 10_000,
+) -> list[dict[str, Any]]:
+    """Report training time and peak memory for increasing dataset sizes.
+
+    Both the in-memory and the streaming training are measured,
+    using the (stateless) hashing vectorizer with default parameters.
+
+    Args:
+        data_filepath: The clean data filepath.
+            Defaults to cfg.data_dir/cfg.clean_filename.
+        sizes: The dataset sizes (number of rows) to measure.
+            Defaults to (1_000, 10_000, 100_000).
+        chunk_size: The number of rows per chunk when streaming.
+            Defaults to 10_000.
+
+    Returns:
+        The measurements, one per size and training mode.
+
+    """
+
+    def _fit_full(size: int) -> Pipeline:
+        data = clean_data.load(data_filepath, max_rows=size)
+        return model.base_pipeline("hashing").fit(
+            data["text"],
+            data["is_italian"],
+        )
+
+    def _fit_streaming(size: int) -> Pipeline:
+        return fit_streaming(
+            model.base_pipeline("hashing"),
+            data_filepath,
+            chunk_size,
+            size,
+        )
+
+    results = []
+    for size in sizes:
+        for mode, func in (("full", _fit_full), ("streaming", _fit_streaming)):
+            _, elapsed, peak = core.measure(func, size)
+            logger.info(
+                "[ML] Training rows=%d mode=%s: time=%ss, peak memory=%sB",
+                size,
+                mode,
+                core.number2str(elapsed),
+                core.number2str(peak),
+            )
+            results.append(
+                {"size": size, "mode": mode, "time": elapsed, "memory": peak},
+            )
+    return results
+
+
+# ======================================================================
+def profile_dedup(
+    data_filepath: Path = cfg.data_dir / cfg.clean_filename,
+    modes: Sequence[dedup.DedupType] = dedup.DEDUPS,
+    chunk_size: int = 10_000,
+) -> list[dict[str, Any]]:
+    """Report training set size and training time per deduplication mode.
+
+    The clean data is deduplicated in chunks (see
+    `dedup.DuplicateFilter`), then the ML model pipeline is fitted,
+    using the (stateless) hashing vectorizer with default parameters.
+    Hence, the clean data should keep its duplicates (ETL_DEDUP=none).
+
+    Args:
+        data_filepath: The clean data filepath.
+            Defaults to cfg.data_dir/cfg.clean_filename.
+        modes: The deduplication modes to measure.
+            Defaults to dedup.DEDUPS.
+        chunk_size: The number of rows per chunk when deduplicating.
+            Defaults to 10_000.
+
+    Returns:
+        The measurements, one per deduplication mode.
+
+    """
+    results = []
+    for mode in modes:
+        duplicates = dedup.DuplicateFilter(mode, cfg.etl_dedup_similarity)
+        data = pd.concat(
+            chunk[duplicates.filter(chunk["text"])]
+            for chunk in clean_data.iter_chunks(data_filepath, chunk_size)
+        )
+        _, elapsed, _ = core.measure(
+            model.base_pipeline("hashing").fit,
+            data["text"],
+            data["is_italian"],
+        )
+        fraction = len(data) / duplicates.counts["total"]
+        logger.info(
+            "[ML] Training dedup=%s: rows=%d (%.2f%%), time=%ss",
+            mode,
+            len(data),
+            100 * fraction,
+            core.number2str(elapsed),
+        )
+        results.append(
+            {
+                "mode": mode,
+                "size": len(data),
+                "fraction": fraction,
+                "time": elapsed,
+            },
+        )
+    return results
+
+
+# ======================================================================
+def train_cascade(
+    pipeline: Pipeline | routing.LengthRouter,
+    data_filepath: Path = cfg.data_dir / cfg.clean_filename,
+    cascade_filepath: Path = cfg.ml_dir / cfg.ml_cascade_filename,
+    max_rows: int | None = None,
+) -> cascade.FastStage:
+    """Train and calibrate the cascade fast stage for a trained pipeline.
+
+    Args:
+        pipeline: The trained (full) model the fast stage falls back to,
+            i.e. the ML model pipeline, or the length router if used.
+        data_filepath: The clean data filepath.
+            Defaults to cfg.data_dir/cfg.clean_filename.
+        cascade_filepath: The cascade fast stage filepath.
+            Defaults to cfg.ml_dir/cfg.ml_cascade_filename.
+        max_rows: The maximum number of rows to use.
+            If None, all rows are used.
+            Defaults to None.
+
+    Returns:
+        The calibrated fast stage.
+
+    """
+    if max_rows is None:
+        data = model.training_data(data_filepath)
+    else:
+        data = next(
+            model.iter_training_data(
+                data_filepath,
+                chunk_size=max_rows,
+                max_rows=max_rows,
+            ),
+        )
+    logger.info("[ML] Train cascade fast stage")
+    fast = cascade.fit_fast_stage(pipeline, data.features, data.target)
+    logger.info("[ML] Save cascade fast stage to '%s'", cascade_filepath)
+    core.save_obj(fast, cascade_filepath)
+    cascade.pre_trained_fast_stage.cache_clear()
+    return fast
+
+
+# ======================================================================
+def train_router(
+    data_filepath: Path = cfg.data_dir / cfg.clean_filename,
+    params_filepath: Path = cfg.ml_dir / cfg.optim_params_filename,
+    router_filepath: Path = cfg.ml_dir / cfg.ml_router_filename,
+    **router_kws: Any,  # noqa: ANN401
+) -> routing.LengthRouter:
+    """Tune and train the length router.
+
+    Args:
+        data_filepath: The clean data filepath.
+            Defaults to cfg.data_dir/cfg.clean_filename.
+        params_filepath: The ML model parameters filepath
+            (see `routing.fit_router()`).
+            Defaults to cfg.ml_dir/cfg.optim_params_filename.
+        router_filepath: The length router filepath.
+            Defaults to cfg.ml_dir/cfg.ml_router_filename.
+        **router_kws: Additional keyword arguments for the router.
+
+    Returns:
+        The trained length router.
+
+    """
+    router = routing.fit_router(data_filepath, params_filepath, **router_kws)
+    logger.info("[ML] Save length router to '%s'", router_filepath)
+    core.save_obj(router, router_filepath)
+    routing.pre_trained_router.cache_clear()
+    return router
+
+
 # ======================================================================
 @stopwatch.clockit_log(logger, logging.INFO)
 def train(  # noqa: PLR0913
@@ -20,12 +311,25 @@ def train(  # noqa: PLR0913
     pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
     params_filepath: Path = cfg.ml_dir / cfg.optim_params_filename,
     *,
+    vectorizer: model.VectorizerType = "count",
+    streaming: bool = False,
+    chunk_size: int = 10_000,
+    n_jobs: int | None = cfg.ml_n_jobs,
+    store_dirpath: Path | None = cfg.ml_dir / cfg.feature_store_dirname,
+    with_cascade: bool = cfg.ml_cascade,
+    cascade_filepath: Path = cfg.ml_dir / cfg.ml_cascade_filename,
+    with_router: bool = cfg.ml_router,
+    router_filepath: Path = cfg.ml_dir / cfg.ml_router_filename,
     calc_scores: bool = False,
     optimize: bool = False,
     force: bool = False,
 ) -> Pipeline:
     """Perform ML training.
 
+    The trained pipeline records the last clean data delta, which is
+    part of its training data, so that it is not applied again
+    (see `updating.update_delta()`).
+
     Args:
         data_filepath: The clean data filepath.
             Defaults to cfg.data_dir/cfg.clean_filename.
@@ -33,11 +337,40 @@ def train(  # noqa: PLR0913
             Defaults to cfg.data_dir/cfg.ml_pipeline_filename.
         params_filepath: The ML model parameters filepath.
             Defaults to cfg.data_dir/cfg.ml_params_filename.
+        vectorizer: The text vectorizer to use.
+            Ignored (always "hashing") if `streaming` is True.
+            Defaults to "count".
+        streaming: Train on data chunks (with bounded memory).
+            Defaults to False.
+        chunk_size: The number of rows per chunk when streaming.
+            Defaults to 10_000.
+        n_jobs: The number of parallel workers for the optimization and,
+            when streaming, for the data shards (processed in parallel
+            if not 1).
+            If None or -1, use the number of CPUs.
+            Defaults to cfg.ml_n_jobs.
+        store_dirpath: The feature store directory, from which the
+            document-term matrices are reused (when not streaming).
+            If None, the feature store is not used.
+            Defaults to cfg.ml_dir/cfg.feature_store_dirname.
+        with_cascade: Train the cascade fast stage (see `train_cascade()`),
+            calibrated against the length router if `with_router`,
+            and on the first chunk only when streaming.
+            Defaults to cfg.ml_cascade.
+        cascade_filepath: The cascade fast stage filepath.
+            Defaults to cfg.ml_dir/cfg.ml_cascade_filename.
+        with_router: Train the length router (see `routing.fit_router()`),
+            with one ML model pipeline tuned per length bucket.
+            Defaults to cfg.ml_router.
+        router_filepath: The length router filepath.
+            Defaults to cfg.ml_dir/cfg.ml_router_filename.
         calc_scores: Compute ML model scores on cross valdation data.
             Defaults to False.
         optimize: Force new optimization.
             Defaults to False.
         force: Force new computation.
+            Otherwise, the pipeline is trained only if missing or older
+            than the clean data.
             Defaults to False.
 
     Returns:
@@ -48,23 +381,53 @@ def train(  # noqa: PLR0913
         Pipeline(steps=[('vect', CountVectorizer()), ('clf', MultinomialNB())])
 
     """
-    if force or not pipeline_filepath.is_file():
-        pipeline = model.base_pipeline()
-        # : Get training data
-        data = model.training_data(data_filepath)
-        features = data.features
-        target = data.target
+    is_trained = force or core.is_outdated(pipeline_filepath, data_filepath)
+    if is_trained:
+        if streaming:
+            # : streaming requires a stateless vectorizer
+            vectorizer = "hashing"
+        pipeline = model.base_pipeline(vectorizer)
         # : Get params
-        params = optim.hyperparams(
-            data_filepath,
-            params_filepath,
-            force=optimize,
-        )
+        if streaming and not (optimize or params_filepath.is_file()):
+            # : avoid loading the full dataset for optimization
+            logger.info("[ML] No optimized parameters: using defaults")
+            params = {}
+        else:
+            params = optim.hyperparams(
+                data_filepath,
+                params_filepath,
+                vectorizer=vectorizer,
+                n_jobs=n_jobs,
+                store_dirpath=store_dirpath,
+                force=optimize,
+            )
         params = {k: v for k, v in params.items() if not k.startswith("_")}
         pipeline.set_params(**params)
-        # : Training on full dataset
-        logger.info("[ML] Train ML model pipeline on full dataset")
-        pipeline.fit(features, target)
+        if streaming:
+            logger.info("[ML] Train ML model pipeline on streamed dataset")
+            fit_streaming(
+                pipeline,
+                data_filepath,
+                chunk_size,
+                n_jobs=n_jobs,
+            )
+        else:
+            # : Get training data
+            data = model.training_data(data_filepath)
+            # : Training on full dataset
+            logger.info("[ML] Train ML model pipeline on full dataset")
+            if store_dirpath is not None:
+                store = feature_store.FeatureStore(store_dirpath)
+                vect, matrix = store.fit_transform(
+                    pipeline["vect"],
+                    data.features,
+                )
+                pipeline.set_params(vect=vect)
+                pipeline["clf"].fit(matrix, data.target)
+            else:
+                pipeline.fit(data.features, data.target)
+        # : the training data includes the last clean data delta
+        pipeline.delta_id_ = clean_data.delta_id(data_filepath)
         logger.info("[ML] Save ML model pipeline to '%s'", pipeline_filepath)
         core.save_obj(pipeline, pipeline_filepath)
     else:
@@ -72,8 +435,38 @@ def train(  # noqa: PLR0913
         # load can be avoided here: pipeline = core.load_obj(pipeline_filepath)
     # will trigger caching for prediction
     pipeline = model.pre_trained_pipeline(pipeline_filepath)
+    is_routed = with_router and (is_trained or not router_filepath.is_file())
+    if is_routed:
+        train_router(
+            data_filepath,
+            params_filepath,
+            router_filepath,
+            vectorizer=vectorizer,
+            n_jobs=n_jobs,
+            store_dirpath=store_dirpath,
+            force=optimize,
+        )
+    if with_cascade and (
+        is_trained or is_routed or not cascade_filepath.is_file()
+    ):
+        # : calibrate against the model the fast stage falls back to
+        train_cascade(
+            (
+                routing.pre_trained_router(router_filepath)
+                if with_router
+                else pipeline
+            ),
+            data_filepath,
+            cascade_filepath,
+            chunk_size if streaming else None,
+        )
     if calc_scores:
-        model.compute_scores(pipeline, data_filepath)
+        model.compute_scores(
+            pipeline,
+            data_filepath,
+            store_dirpath=store_dirpath,
+            n_jobs=n_jobs,
+        )
     return pipeline
 
 
@@ -84,7 +477,7 @@ def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         "-i",
         "--data_filepath",
         metavar="FILE",
-        type=str,
+        type=Path,
         help="input clean data filepath [%(default)s]",
         default=cfg.data_dir / cfg.clean_filename,
     )
@@ -104,6 +497,74 @@ def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         help="output ML model parameters filepath [%(default)s]",
         default=cfg.ml_dir / cfg.optim_params_filename,
     )
+    arg_parser.add_argument(
+        "-V",
+        "--vectorizer",
+        type=str,
+        choices=model.VECTORIZERS,
+        help="text vectorizer [%(default)s]",
+        default="count",
+    )
+    arg_parser.add_argument(
+        "-S",
+        "--streaming",
+        action="store_true",
+        help="train on data chunks with bounded memory [%(default)s]",
+    )
+    arg_parser.add_argument(
+        "-b",
+        "--chunk_size",
+        metavar="ROWS",
+        type=int,
+        help="number of rows per chunk when streaming [%(default)s]",
+        default=10_000,
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--n_jobs",
+        metavar="NUM",
+        type=int,
+        help="number of parallel workers (-1 for all CPUs) [%(default)s]",
+        default=cfg.ml_n_jobs,
+    )
+    arg_parser.add_argument(
+        "-F",
+        "--store_dirpath",
+        metavar="DIR",
+        type=Path,
+        help="feature store directory [%(default)s]",
+        default=cfg.ml_dir / cfg.feature_store_dirname,
+    )
+    arg_parser.add_argument(
+        "-c",
+        "--with_cascade",
+        action=argparse.BooleanOptionalAction,
+        help="train the cascade fast stage [%(default)s]",
+        default=cfg.ml_cascade,
+    )
+    arg_parser.add_argument(
+        "-C",
+        "--cascade_filepath",
+        metavar="FILE",
+        type=Path,
+        help="output cascade fast stage filepath [%(default)s]",
+        default=cfg.ml_dir / cfg.ml_cascade_filename,
+    )
+    arg_parser.add_argument(
+        "-r",
+        "--with_router",
+        action=argparse.BooleanOptionalAction,
+        help="train the length router [%(default)s]",
+        default=cfg.ml_router,
+    )
+    arg_parser.add_argument(
+        "-R",
+        "--router_filepath",
+        metavar="FILE",
+        type=Path,
+        help="output length router filepath [%(default)s]",
+        default=cfg.ml_dir / cfg.ml_router_filename,
+    )
     arg_parser.add_argument(
         "-s",
         "--calc_scores",
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""ML Update Model."""
+
+import argparse
+import contextlib
+import fcntl
+import logging
+import os
+import re
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+
+from italiclas.config import cfg
+from italiclas.etl import clean_data
+from italiclas.logger import logger
+from italiclas.ml import model
+from italiclas.utils import core, misc, stopwatch
+
+# : the (sortable) version format of the ML model pipeline artifacts
+VERSION_FORMAT = "%Y%m%dT%H%M%S%fZ"
+_VERSION_REGEX = r"\d{8}T\d{12}Z"
+
+
+# ======================================================================
+@contextlib.contextmanager
+def update_lock(pipeline_filepath: Path) -> Iterator[None]:
+    """Lock the updates of an ML model pipeline (across processes).
+
+    The (exclusive) lock is held on a lockfile next to the pipeline,
+    which is kept (removing it would race with the waiting updates).
+
+    Args:
+        pipeline_filepath: The ML model pipeline filepath.
+
+    """
+    lock_filepath = pipeline_filepath.with_name(
+        f"{pipeline_filepath.name}.lock",
+    )
+    fd = os.open(lock_filepath, os.O_WRONLY | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+# ======================================================================
+def _check_not_derived(
+    with_cascade: bool,  # noqa: FBT001
+    cascade_filepath: Path,
+    with_router: bool,  # noqa: FBT001
+    router_filepath: Path,
+) -> None:
+    """Check no artifacts derived from the ML model pipeline are used."""
+    for name, is_used, filepath in (
+        ("cascade fast stage", with_cascade, cascade_filepath),
+        ("length router", with_router, router_filepath),
+    ):
+        if is_used and filepath.is_file():
+            msg = (
+                f"Cannot update the ML model pipeline: the {name}"
+                f" '{filepath}' would not be updated. Retrain instead."
+            )
+            raise ValueError(msg)
+
+
+# ======================================================================
+def prune_versions(
+    pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
+    keep: int = cfg.ml_keep_versions,
+) -> list[Path]:
+    """Remove the older versioned ML model pipeline artifacts.
+
+    Args:
+        pipeline_filepath: The ML model pipeline filepath.
+            Defaults to cfg.ml_dir/cfg.ml_model_pipeline_filename.
+        keep: The number of latest versions to keep.
+            If 0, all versions are kept.
+            Defaults to cfg.ml_keep_versions.
+
+    Returns:
+        The removed filepaths.
+
+    """
+    if keep <= 0:
+        return []
+    pattern = re.compile(
+        re.escape(
+            core.versioned_filepath(pipeline_filepath, "@").name,
+        ).replace("@", _VERSION_REGEX),
+    )
+    filepaths = sorted(
+        filepath
+        for filepath in pipeline_filepath.parent.glob(
+            core.versioned_filepath(pipeline_filepath, "*").name,
+        )
+        if pattern.fullmatch(filepath.name)
+    )
+    removed = filepaths[:-keep]
+    for filepath in removed:
+        logger.info("[ML] Remove old ML model pipeline '%s'", filepath)
+        filepath.unlink(missing_ok=True)
+    return removed
+
+
+# ======================================================================
+@stopwatch.clockit_log(logger, logging.INFO)
+def update_with(  # noqa: PLR0913
+    features: Iterable[str],
+    target: Iterable[bool],
+    pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
+    keep_versions: int = cfg.ml_keep_versions,
+    delta_id: str | None = None,
+    *,
+    with_cascade: bool = cfg.ml_cascade,
+    cascade_filepath: Path = cfg.ml_dir / cfg.ml_cascade_filename,
+    with_router: bool = cfg.ml_router,
+    router_filepath: Path = cfg.ml_dir / cfg.ml_router_filename,
+) -> Path:
+    """Update a trained ML model pipeline with new labeled examples.
+
+    The new examples are folded into the Naive Bayes count statistics
+    (from which the log-probabilities are re-derived), while the
+    vectorizer (and its vocabulary, if any) is left unchanged.
+    Hence, the time required is proportional to the new data only.
+
+    The updated pipeline is saved to a new versioned artifact, which then
+    replaces the ML model pipeline (other running processes keep using
+    the previous version until they reload it), and only the latest
+    versions are kept (see `prune_versions()`).
+    Concurrent updates (e.g. from the API, or from other processes) are
+    serialized (see `update_lock()`), so that each one starts from the
+    result of the previous one.
+    The cascade fast stage and the length router are not updated, hence
+    the update is refused when they are used (retrain instead).
+
+    Args:
+        features: The new texts.
+        target: The new labels (True if the text is Italian).
+        pipeline_filepath: The ML model pipeline filepath.
+            Defaults to cfg.ml_dir/cfg.ml_model_pipeline_filename.
+        keep_versions: The number of latest versions to keep.
+            If 0, all versions are kept.
+            Defaults to cfg.ml_keep_versions.
+        delta_id: The identifier of the clean data delta of the new
+            examples (see `clean_data.delta_id()`), recorded in the
+            pipeline (as `delta_id_`) so that it is not applied twice.
+            If None, the new examples are not from a clean data delta.
+            Defaults to None.
+        with_cascade: The cascade fast stage is used (if available).
+            Defaults to cfg.ml_cascade.
+        cascade_filepath: The cascade fast stage filepath.
+            Defaults to cfg.ml_dir/cfg.ml_cascade_filename.
+        with_router: The length router is used (if available).
+            Defaults to cfg.ml_router.
+        router_filepath: The length router filepath.
+            Defaults to cfg.ml_dir/cfg.ml_router_filename.
+
+    Returns:
+        The versioned ML model pipeline filepath.
+
+    Raises:
+        ValueError: if the clean data delta was already applied, or if
+            the cascade fast stage or the length router are used.
+
+    """
+    _check_not_derived(
+        with_cascade,
+        cascade_filepath,
+        with_router,
+        router_filepath,
+    )
+    features = list(features)
+    target = list(target)
+    with update_lock(pipeline_filepath):
+        pipeline = core.load_obj(pipeline_filepath)
+        if delta_id is not None:
+            if getattr(pipeline, "delta_id_", None) == delta_id:
+                msg = (
+                    "Clean data delta already applied to the ML model"
+                    f" pipeline: {delta_id}"
+                )
+                raise ValueError(msg)
+            pipeline.delta_id_ = delta_id
+        logger.info(
+            "[ML] Update ML model pipeline with %d samples",
+            len(target),
+        )
+        pipeline["clf"].partial_fit(
+            pipeline["vect"].transform(features),
+            target,
+            classes=model.CLASSES,
+        )
+        version = datetime.now(tz=UTC).strftime(VERSION_FORMAT)
+        versioned_filepath = core.versioned_filepath(
+            pipeline_filepath,
+            version,
+        )
+        logger.info("[ML] Save ML model pipeline to '%s'", versioned_filepath)
+        core.save_obj(pipeline, versioned_filepath)
+        core.replace_file(versioned_filepath, pipeline_filepath)
+        model.pre_trained_pipeline.cache_clear()
+        prune_versions(pipeline_filepath, keep_versions)
+    return versioned_filepath
+
+
+# ======================================================================
+def update(
+    data_filepath: Path,
+    pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
+) -> Path:
+    """Update a trained ML model pipeline with new labeled data.
+
+    Args:
+        data_filepath: The new labeled data filepath.
+            Must have the same format as the clean data: a columnar store
+            directory, or a CSV file (see `clean_data.load()`).
+        pipeline_filepath: The ML model pipeline filepath.
+            Defaults to cfg.ml_dir/cfg.ml_model_pipeline_filename.
+
+    Returns:
+        The versioned ML model pipeline filepath.
+
+    Raises:
+        ValueError: if the content of the new data cannot be processed
+
+    Examples:
+        >>> update(Path("new_data.csv"))  # doctest: +SKIP
+        PosixPath('artifacts/ml/model_pipeline.20241111T101010000000Z.pkl.lzma')
+
+    """
+    logger.info("[ML] Load new data from '%s'", data_filepath)
+    msg = (
+        "Invalid new data input: expecting columns "
+        "['text', 'is_italian'] of string and boolean data type."
+    )
+    try:
+        data = clean_data.load(data_filepath, mmap=False)
+    except ValueError as error:
+        # : missing columns
+        raise ValueError(msg) from error
+    if not clean_data.is_valid(data):
+        raise ValueError(msg)
+    return update_with(data["text"], data["is_italian"], pipeline_filepath)
+
+
+# ======================================================================
+def update_delta(
+    data_filepath: Path = cfg.data_dir / cfg.clean_filename,
+    pipeline_filepath: Path = cfg.ml_dir / cfg.ml_model_pipeline_filename,
+) -> Path:
+    """Update a trained ML model pipeline with the clean data delta.
+
+    The delta are the clean data rows appended by the last (incremental)
+    processing (see `clean_data.load_delta()`), hence it is applied once
+    after each processing: the pipeline records the identifier of the
+    last delta applied (or included in its training data), and refuses
+    to apply it again.
+
+    Args:
+        data_filepath: The clean data filepath.
+            Defaults to cfg.data_dir/cfg.clean_filename.
+        pipeline_filepath: The ML model pipeline filepath.
+            Defaults to cfg.ml_dir/cfg.ml_model_pipeline_filename.
+
+    Returns:
+        The versioned ML model pipeline filepath.
+
+    Raises:
+        ValueError: if the last processing was not an append
+            (a full retraining is needed), or if the delta was already
+            applied.
+
+    """
+    logger.info("[ML] Load clean data delta from '%s'", data_filepath)
+    delta_id = clean_data.delta_id(data_filepath)
+    data = clean_data.load_delta(data_filepath)
+    if data is None:
+        msg = (
+            "Clean data delta unavailable: the last processing was not an"
+            " append of new rows. Retrain the ML model pipeline instead."
+        )
+        raise ValueError(msg)
+    return update_with(
+        data["text"],
+        data["is_italian"],
+        pipeline_filepath,
+        delta_id=delta_id,
+    )
+
+
+# ======================================================================
+def more_args(arg_parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Handle more command-line application arguments."""
+    arg_parser.add_argument(
+        "data_filepath",
+        metavar="FILE",
+        type=Path,
+        nargs="?",
+        help="input new labeled data filepath",
+    )
+    arg_parser.add_argument(
+        "-D",
+        "--delta",
+        action="store_true",
+        help="update with the clean data (FILE, if given) delta",
+    )
+    arg_parser.add_argument(
+        "-i",
+        "--pipeline_filepath",
+        metavar="FILE",
+        type=Path,
+        help="ML model pipeline filepath [%(default)s]",
+        default=cfg.ml_dir / cfg.ml_model_pipeline_filename,
+    )
+    return arg_parser
+
+
+# ======================================================================
+@stopwatch.clockit_log(logger, logging.DEBUG)
+def main() -> None:
+    """Execute main script."""
+    # : init args and add common parameters
+    arg_parser = misc.common_args(
+        description=__doc__,
+        arguments=["help", "version", "verbose", "quiet", "log"],
+    )
+    # : add script parameters
+    arg_parser = more_args(arg_parser)
+    args = arg_parser.parse_args()
+
+    misc.cli_logging(args, __doc__.strip())
+
+    to_skip = {"log", "verbose", "quiet"}
+    kws = {
+        k: v
+        for k, v in vars(args).items()
+        if k not in to_skip and v is not None
+    }
+    if kws.pop("delta"):
+        update_delta(**kws)
+    elif "data_filepath" in kws:
+        update(**kws)
+    else:
+        arg_parser.error("FILE is required, unless updating with the delta")
+
+
+# ======================================================================
+if __name__ == "__main__":
+    main()
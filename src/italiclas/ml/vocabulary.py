@@ -0,0 +1,355 @@
+"""ML Compact Vocabulary."""
+
+import pickle
+import sys
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+import numba
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.utils.validation import check_is_fitted
+
+from italiclas.logger import logger
+from italiclas.utils import core
+
+
+# ======================================================================
+@numba.njit(cache=True, nogil=True)
+def _compare(  # noqa: PLR0913
+    a: np.ndarray,
+    a_start: int,
+    a_stop: int,
+    b: np.ndarray,
+    b_start: int,
+    b_stop: int,
+) -> int:
+    """Compare `a[a_start:a_stop]` with `b[b_start:b_stop]` (like `cmp()`)."""
+    size = min(a_stop - a_start, b_stop - b_start)
+    for i in range(size):
+        if a[a_start + i] != b[b_start + i]:
+            return -1 if a[a_start + i] < b[b_start + i] else 1
+    if a_stop - a_start == b_stop - b_start:
+        return 0
+    return -1 if a_stop - a_start < b_stop - b_start else 1
+
+
+# ======================================================================
+@numba.njit(cache=True, nogil=True)
+def _search(
+    data: np.ndarray,
+    offsets: np.ndarray,
+    queries: np.ndarray,
+    query_offsets: np.ndarray,
+) -> np.ndarray:
+    """Find the positions of the queries with binary search (-1 if missing)."""
+    num_terms = offsets.size - 1
+    result = np.full(query_offsets.size - 1, -1, dtype=np.int64)
+    for k in range(result.size):
+        low = 0
+        high = num_terms - 1
+        while low <= high:
+            mid = (low + high) // 2
+            cmp = _compare(
+                data,
+                offsets[mid],
+                offsets[mid + 1],
+                queries,
+                query_offsets[k],
+                query_offsets[k + 1],
+            )
+            if cmp < 0:
+                low = mid + 1
+            elif cmp > 0:
+                high = mid - 1
+            else:
+                result[k] = mid
+                break
+    return result
+
+
+# ======================================================================
+def _encode(terms: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Encode terms as UTF-8 bytes in a contiguous buffer with offsets."""
+    text = "".join(terms)
+    # : compute the UTF-8 byte offsets from the code points
+    chars = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    char_sizes = (
+        1 + (chars >= 0x80) + (chars >= 0x800) + (chars >= 0x10000)  # noqa: PLR2004
+    )
+    byte_offsets = np.zeros(chars.size + 1, dtype=np.int64)
+    np.cumsum(char_sizes, out=byte_offsets[1:])
+    char_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(list(map(len, terms)), out=char_offsets[1:])
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    return data, byte_offsets[char_offsets]
+
+
+# ======================================================================
+class CompactVocabulary:
+    """Immutable vocabulary stored in contiguous buffers.
+
+    The terms are sorted (by code point, i.e. like `sorted()`) and stored
+    UTF-8 encoded in a single bytes buffer, together with their offsets.
+    The index of a term is its position in the sorted sequence
+    (like the `vocabulary_` of a fitted `CountVectorizer`).
+    Lookups use a compiled binary search.
+
+    Args:
+        data: The UTF-8 encoded sorted terms.
+        offsets: The start offset of each term in `data` (plus the end).
+
+    Examples:
+        >>> vocab = CompactVocabulary.from_terms(["ciao", "a", "mondo"])
+        >>> len(vocab)
+        3
+        >>> vocab["ciao"], "hello" in vocab
+        (1, False)
+        >>> vocab.lookup(["mondo", "hello", "a"]).tolist()
+        [2, -1, 0]
+        >>> list(vocab)
+        ['a', 'ciao', 'mondo']
+
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        """Initialize the vocabulary."""
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[str]) -> "CompactVocabulary":
+        """Build the vocabulary from its (unique) terms.
+
+        Args:
+            terms: The vocabulary terms.
+
+        Returns:
+            The compact vocabulary.
+
+        """
+        return cls(*_encode(sorted(set(terms))))
+
+    def __len__(self) -> int:
+        """Get the number of terms."""
+        return self.offsets.size - 1
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the (sorted) terms."""
+        data = self.data.tobytes()
+        for begin, end in zip(
+            self.offsets[:-1].tolist(),
+            self.offsets[1:].tolist(),
+            strict=True,
+        ):
+            yield data[begin:end].decode("utf-8")
+
+    def __contains__(self, term: object) -> bool:
+        """Check if a term is in the vocabulary."""
+        return isinstance(term, str) and self.get(term) is not None
+
+    def __getitem__(self, term: str) -> int:
+        """Get the index of a term."""
+        result = self.get(term)
+        if result is None:
+            raise KeyError(term)
+        return result
+
+    def get(self, term: str, default: int | None = None) -> int | None:
+        """Get the index of a term, or a default value if missing."""
+        result = int(self.lookup([term])[0])
+        return default if result < 0 else result
+
+    def lookup(self, terms: Sequence[str]) -> np.ndarray:
+        """Get the indices of multiple terms at once.
+
+        Args:
+            terms: The terms to look up.
+
+        Returns:
+            The indices of the terms (-1 for missing terms).
+
+        """
+        queries, query_offsets = _encode(terms)
+        return _search(self.data, self.offsets, queries, query_offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the memory used by the buffers (in bytes)."""
+        return self.data.nbytes + self.offsets.nbytes
+
+    def save(self, dirpath: Path) -> Path:
+        """Save the vocabulary buffers (to be memory-mapped later).
+
+        Args:
+            dirpath: The output directory.
+
+        Returns:
+            The output directory.
+
+        """
+        dirpath.mkdir(parents=True, exist_ok=True)
+        np.save(dirpath / "data.npy", self.data)
+        np.save(dirpath / "offsets.npy", self.offsets)
+        return dirpath
+
+    @classmethod
+    def load(
+        cls,
+        dirpath: Path,
+        mmap_mode: str | None = "r",
+    ) -> "CompactVocabulary":
+        """Load the vocabulary buffers.
+
+        Args:
+            dirpath: The input directory.
+            mmap_mode: The memory-map mode (see `numpy.load()`).
+                If None, the buffers are read to memory.
+                Defaults to "r".
+
+        Returns:
+            The compact vocabulary.
+
+        """
+        return cls(
+            np.load(dirpath / "data.npy", mmap_mode=mmap_mode),
+            np.load(dirpath / "offsets.npy", mmap_mode=mmap_mode),
+        )
+
+
+# ======================================================================
+class CompactCountVectorizer(CountVectorizer):
+    """Count vectorizer storing its vocabulary as a `CompactVocabulary`.
+
+    After fitting, the `vocabulary_` dictionary (and the `stop_words_` set)
+    are replaced by `vocabulary_index_`, which is much smaller in memory,
+    faster to (un)pickle and can be queried in batch.
+    """
+
+    def fit(
+        self,
+        raw_documents: Iterable[str],
+        y: Iterable | None = None,
+    ) -> "CompactCountVectorizer":
+        """Learn the vocabulary of the documents."""
+        self.fit_transform(raw_documents, y)
+        return self
+
+    def fit_transform(
+        self,
+        raw_documents: Iterable[str],
+        y: Iterable | None = None,
+    ) -> scipy.sparse.csr_matrix:
+        """Learn the vocabulary and get the document-term matrix."""
+        result = super().fit_transform(raw_documents, y)
+        # : CountVectorizer sorts the features, hence index == rank
+        self.vocabulary_index_ = CompactVocabulary.from_terms(
+            self.vocabulary_,
+        )
+        del self.vocabulary_
+        if hasattr(self, "stop_words_"):
+            del self.stop_words_
+        return result
+
+    def transform(
+        self,
+        raw_documents: Iterable[str],
+    ) -> scipy.sparse.csr_matrix:
+        """Transform documents to a document-term matrix.
+
+        Args:
+            raw_documents: The input texts.
+
+        Returns:
+            The document-term matrix.
+
+        Raises:
+            NotFittedError: if the vectorizer is not fitted.
+
+        """
+        if isinstance(raw_documents, str):
+            msg = "Iterable over raw text documents expected, string found."
+            raise ValueError(msg)  # noqa: TRY004
+        # : the `vocabulary_` is replaced by its compact index on fitting
+        check_is_fitted(self, "vocabulary_index_")
+        analyze = self.build_analyzer()
+        terms = []
+        indptr = [0]
+        for doc in raw_documents:
+            doc_terms = analyze(doc)
+            terms.extend(doc_terms)
+            indptr.append(len(terms))
+        indices = self.vocabulary_index_.lookup(terms)
+        # : count only the known terms
+        known = np.concatenate([[0], np.cumsum(indices >= 0)])
+        result = scipy.sparse.csr_matrix(
+            (
+                np.ones(known[-1], dtype=self.dtype),
+                indices[indices >= 0],
+                known[indptr],
+            ),
+            shape=(len(indptr) - 1, len(self.vocabulary_index_)),
+        )
+        result.sum_duplicates()
+        if self.binary:
+            result.data.fill(1)
+        return result
+
+    def get_feature_names_out(
+        self,
+        input_features: Iterable[str] | None = None,  # noqa: ARG002
+    ) -> np.ndarray:
+        """Get the output feature names."""
+        return np.asarray(list(self.vocabulary_index_), dtype=object)
+
+
+# ======================================================================
+def benchmark(
+    terms: Sequence[str],
+    queries: Sequence[str] | None = None,
+) -> dict[str, float]:
+    """Compare memory and lookup performance against a Python dictionary.
+
+    Args:
+        terms: The vocabulary terms.
+        queries: The terms to look up.
+            If None, all the vocabulary terms are used.
+            Defaults to None.
+
+    Returns:
+        The benchmark results, in bytes or seconds.
+
+    """
+    if queries is None:
+        queries = terms
+    vocab_dict = {term: i for i, term in enumerate(sorted(set(terms)))}
+    vocab = CompactVocabulary.from_terms(terms)
+    results = {
+        "dict_bytes": sys.getsizeof(vocab_dict)
+        + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in vocab_dict.items()
+        ),
+        "compact_bytes": vocab.nbytes,
+        "dict_pickle_bytes": len(pickle.dumps(vocab_dict)),
+        "compact_pickle_bytes": len(pickle.dumps(vocab)),
+    }
+    for name, obj in (("dict", vocab_dict), ("compact", vocab)):
+        serialized = pickle.dumps(obj)
+        begin_time = time.perf_counter()
+        pickle.loads(serialized)  # noqa: S301
+        results[f"{name}_unpickle_s"] = time.perf_counter() - begin_time
+    begin_time = time.perf_counter()
+    [vocab_dict.get(query, -1) for query in queries]
+    results["dict_lookup_s"] = time.perf_counter() - begin_time
+    begin_time = time.perf_counter()
+    vocab.lookup(queries)
+    results["compact_lookup_s"] = time.perf_counter() - begin_time
+    for name, value in results.items():
+        logger.info(
+            "[ML] Vocabulary %s = %s",
+            core.labelify(name),
+            core.number2str(value),
+        )
+    return results
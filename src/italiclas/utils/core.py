@@ -5,6 +5,10 @@ import lzma
 import os
 import pickle
 import re
+import shutil
+import tempfile
+import time
+import tracemalloc
 from collections.abc import Callable
 from pathlib import Path
 from typing import Any, TypeVar
@@ -73,6 +77,79 @@ def load_obj(
         return obj
 
 
+# =====================================================================
+def versioned_filepath(filepath: Path, version: str) -> Path:
+    """Get a versioned filepath, by adding the version before the extensions.
+
+    Args:
+        filepath: The input filepath.
+        version: The version tag.
+
+    Returns:
+        The versioned filepath.
+
+    Examples:
+        >>> print(versioned_filepath(Path("dir/model.pkl.lzma"), "v1"))
+        dir/model.v1.pkl.lzma
+        >>> print(versioned_filepath(Path("model"), "v1"))
+        model.v1
+
+    """
+    base, *exts = filepath.name.split(".")
+    return filepath.with_name(".".join([base, version, *exts]))
+
+
+# =====================================================================
+def replace_file(source: Path, target: Path) -> None:
+    """Atomically replace a file with a copy of another file.
+
+    The copy is written to a uniquely named temporary file (next to the
+    target), hence concurrent replacements do not interleave.
+
+    Args:
+        source: The source filepath.
+        target: The target filepath.
+
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=target.parent,
+        prefix=f".{target.name}.",
+        suffix=".tmp",
+        delete=False,
+    ) as file_obj:
+        temp_filepath = Path(file_obj.name)
+    try:
+        shutil.copyfile(source, temp_filepath)
+        temp_filepath.replace(target)
+    finally:
+        temp_filepath.unlink(missing_ok=True)
+
+
+# =====================================================================
+def is_outdated(target: Path, *sources: Path) -> bool:
+    """Check if a file is missing or older than any of its sources.
+
+    Missing sources are ignored.
+    Directories are compared by their own modification time, i.e. when
+    an entry is added, removed or renamed.
+
+    Args:
+        target: The target filepath.
+        *sources: The source filepaths.
+
+    Returns:
+        True if the target must be (re)computed, False otherwise.
+
+    """
+    if not target.exists():
+        return True
+    mtime = target.stat().st_mtime
+    return any(
+        source.exists() and source.stat().st_mtime > mtime
+        for source in sources
+    )
+
+
 # =====================================================================
 def transform(
     obj: Typ,
@@ -376,3 +453,43 @@ def is_running_in_docker(
             and any("docker" in line for line in cgroup_path.open())
         )
     )
+
+
+# =====================================================================
+def measure(
+    func: Callable,
+    *args: Any,  # noqa: ANN401
+    **kws: Any,  # noqa: ANN401
+) -> tuple[Any, float, int]:
+    """Measure the elapsed time and the peak memory allocated by a call.
+
+    The memory is traced with `tracemalloc`, hence only allocations
+    reported to it (Python objects, NumPy arrays, etc.) are accounted for.
+
+    Args:
+        func: The callable to measure.
+        args: The positional arguments for the callable.
+        kws: The keyword arguments for the callable.
+
+    Returns:
+        The result of the call, the elapsed time in seconds and
+        the peak memory allocated during the call in bytes.
+
+    Examples:
+        >>> result, elapsed, peak = measure(bytearray, 2**20)
+        >>> len(result), elapsed >= 0, peak >= 2**20
+        (1048576, True, True)
+
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base_size, _ = tracemalloc.get_traced_memory()
+    begin_time = time.perf_counter()
+    result = func(*args, **kws)
+    elapsed = time.perf_counter() - begin_time
+    _, peak_size = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    return result, elapsed, peak_size - base_size
@@ -0,0 +1,323 @@
+"""Dependency-tracking Pipeline Runner."""
+
+import concurrent.futures
+import graphlib
+import hashlib
+import json
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from italiclas.logger import logger
+from italiclas.utils import core
+
+
+# ======================================================================
+@dataclass
+class Stage:
+    """A pipeline stage.
+
+    The dependencies between stages are derived from their files: a stage
+    depends on the stages producing (some of) its inputs.
+
+    Args:
+        name: The stage name (unique within the pipeline).
+        func: The stage callable (without arguments).
+        inputs: The files (or directories) read by the stage.
+            Defaults to ().
+        outputs: The files (or directories) written by the stage.
+            Defaults to ().
+        always: Run the stage even if up to date, e.g. when the stage
+            checks an external source by itself (the downstream stages
+            still run only if its outputs change).
+            Defaults to False.
+
+    """
+
+    name: str
+    func: Callable[[], Any]
+    inputs: Sequence[Path] = ()
+    outputs: Sequence[Path] = ()
+    always: bool = False
+
+
+# ======================================================================
+@dataclass
+class StageResult:
+    """The result of a pipeline stage."""
+
+    name: str
+    # : True if the stage was run, False if it was up to date
+    is_run: bool
+    # : the run time (in s)
+    elapsed: float = 0.0
+
+
+# ======================================================================
+def file_digest(
+    path: Path,
+    cache: dict[str, dict[str, Any]] | None = None,
+) -> str | None:
+    """Compute the SHA-256 hex digest of a file or of a directory.
+
+    A directory digest covers the relative paths and the contents of all
+    its files (hidden files, e.g. temporary ones, are ignored).
+
+    Args:
+        path: The file or directory path.
+        cache: The digests of the files by path, with their size and
+            modification time: a digest is reused (and otherwise updated)
+            if the size and the modification time did not change.
+            If None, the files are always hashed.
+            Defaults to None.
+
+    Returns:
+        The hex digest, or None if the path does not exist.
+
+    """
+    if path.is_dir():
+        digest = hashlib.sha256()
+        for filepath in sorted(path.rglob("*")):
+            relative = filepath.relative_to(path)
+            if filepath.is_file() and not any(
+                part.startswith(".") for part in relative.parts
+            ):
+                digest.update(relative.as_posix().encode())
+                digest.update(bytes.fromhex(file_digest(filepath, cache)))
+        return digest.hexdigest()
+    if not path.is_file():
+        return None
+    stat = path.stat()
+    key = str(path)
+    entry = (cache or {}).get(key)
+    if (
+        entry is not None
+        and entry["size"] == stat.st_size
+        and entry["mtime_ns"] == stat.st_mtime_ns
+    ):
+        return entry["sha256"]
+    with path.open("rb") as file_obj:
+        sha256 = hashlib.file_digest(file_obj, "sha256").hexdigest()
+    if cache is not None:
+        cache[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+        }
+    return sha256
+
+
+# ======================================================================
+def _digests(
+    paths: Iterable[Path],
+    state: dict[str, Any],
+) -> dict[str, str | None]:
+    """Compute the digests of files, cached in the pipeline state."""
+    return {str(path): file_digest(path, state["files"]) for path in paths}
+
+
+# ======================================================================
+def _timed(func: Callable[[], Any]) -> float:
+    """Call a function and get its run time (in s)."""
+    begin_time = time.perf_counter()
+    func()
+    return time.perf_counter() - begin_time
+
+
+# ======================================================================
+class Pipeline:
+    """Make-like runner of a pipeline (DAG) of stages.
+
+    A stage is run only if it is stale, i.e. if any of its outputs is
+    missing, or if the contents (SHA-256 digests) of its inputs or of its
+    outputs changed since its last run, which are recorded in the state
+    file.
+    Stages never run before (e.g. with a new state file) are instead
+    stale only if their outputs are older than their inputs.
+    The stages are run as soon as their dependencies are done, hence
+    independent stages run in parallel (in threads).
+
+    Args:
+        stages: The pipeline stages.
+        state_filepath: The state filepath (JSON).
+
+    Raises:
+        ValueError: if the stage names or outputs are not unique,
+            or if the stages have cyclic dependencies.
+
+    """
+
+    def __init__(self, stages: Iterable[Stage], state_filepath: Path) -> None:
+        """Initialize the pipeline."""
+        self.stages: dict[str, Stage] = {}
+        producers: dict[Path, str] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                msg = f"Duplicate stage: {stage.name}"
+                raise ValueError(msg)
+            self.stages[stage.name] = stage
+            for output in stage.outputs:
+                if output in producers:
+                    msg = (
+                        f"Duplicate output: {output}"
+                        f" (stages: {producers[output]}, {stage.name})"
+                    )
+                    raise ValueError(msg)
+                producers[output] = stage.name
+        self.dependencies = {
+            stage.name: {
+                producers[path] for path in stage.inputs if path in producers
+            }
+            for stage in self.stages.values()
+        }
+        try:
+            graphlib.TopologicalSorter(self.dependencies).prepare()
+        except graphlib.CycleError as error:
+            msg = f"Cyclic stages: {error.args[1]}"
+            raise ValueError(msg) from error
+        self.state_filepath = state_filepath
+
+    def upstream(self, names: Iterable[str]) -> set[str]:
+        """Get the stages and all the stages they depend on.
+
+        Args:
+            names: The stage names.
+
+        Returns:
+            The stage names, including the dependencies.
+
+        Raises:
+            ValueError: if a stage is unknown.
+
+        """
+        result: set[str] = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                msg = f"Unknown stage: {name}. Must be in: {list(self.stages)}"
+                raise ValueError(msg)
+            if name not in result:
+                result.add(name)
+                pending.extend(self.dependencies[name])
+        return result
+
+    def _load_state(self) -> dict[str, Any]:
+        """Load the state (empty if missing)."""
+        if not self.state_filepath.is_file():
+            return {"stages": {}, "files": {}}
+        return json.loads(self.state_filepath.read_text())
+
+    def _save_state(self, state: dict[str, Any]) -> None:
+        """Save the state atomically."""
+        self.state_filepath.parent.mkdir(parents=True, exist_ok=True)
+        temp_filepath = self.state_filepath.with_name(
+            f".{self.state_filepath.name}.tmp",
+        )
+        temp_filepath.write_text(json.dumps(state, indent=2))
+        temp_filepath.replace(self.state_filepath)
+
+    def _is_stale(
+        self,
+        stage: Stage,
+        inputs: dict[str, str | None],
+        state: dict[str, Any],
+    ) -> bool:
+        """Check if a stage must be run (and record it if up to date)."""
+        if not all(path.exists() for path in stage.outputs):
+            return True
+        record = state["stages"].get(stage.name)
+        outputs = _digests(stage.outputs, state)
+        if record is None:
+            if any(
+                core.is_outdated(path, *stage.inputs) for path in stage.outputs
+            ):
+                return True
+            # : adopt the outputs computed before tracking
+            state["stages"][stage.name] = {
+                "inputs": inputs,
+                "outputs": outputs,
+            }
+            return False
+        return record["inputs"] != inputs or record["outputs"] != outputs
+
+    def run(
+        self,
+        targets: Iterable[str] | None = None,
+        *,
+        n_jobs: int | None = None,
+        force: bool = False,
+    ) -> list[StageResult]:
+        """Run the stale stages.
+
+        Args:
+            targets: The stages to bring up to date (with the stages they
+                depend on).
+                If None, all the stages.
+                Defaults to None.
+            n_jobs: The maximum number of stages run in parallel.
+                If None, all the independent stages.
+                Defaults to None.
+            force: Run all the (target) stages, even if up to date.
+                Defaults to False.
+
+        Returns:
+            The stage results, in completion order.
+
+        """
+        names = self.upstream(self.stages if targets is None else targets)
+        sorter = graphlib.TopologicalSorter(
+            {name: self.dependencies[name] & names for name in names},
+        )
+        sorter.prepare()
+        state = self._load_state()
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(
+            n_jobs or len(names),
+        ) as executor:
+            running: dict[concurrent.futures.Future, tuple] = {}
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    stage = self.stages[name]
+                    # : the inputs are complete, since their producers are done
+                    inputs = _digests(stage.inputs, state)
+                    if (
+                        force
+                        or stage.always
+                        or self._is_stale(stage, inputs, state)
+                    ):
+                        logger.info("[DAG] Run stage '%s'", name)
+                        future = executor.submit(_timed, stage.func)
+                        running[future] = (stage, inputs)
+                    else:
+                        logger.info("[DAG] Stage '%s' is up to date", name)
+                        results.append(StageResult(name, is_run=False))
+                        sorter.done(name)
+                if not running:
+                    continue
+                done, _ = concurrent.futures.wait(
+                    running,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    stage, inputs = running.pop(future)
+                    # : re-raise the stage errors (once the running stages end)
+                    elapsed = future.result()
+                    state["stages"][stage.name] = {
+                        "inputs": inputs,
+                        "outputs": _digests(stage.outputs, state),
+                    }
+                    self._save_state(state)
+                    logger.info(
+                        "[DAG] Stage '%s' done in %ss",
+                        stage.name,
+                        core.number2str(elapsed),
+                    )
+                    results.append(
+                        StageResult(stage.name, is_run=True, elapsed=elapsed),
+                    )
+                    sorter.done(stage.name)
+        self._save_state(state)
+        return results
@@ -1,5 +1,7 @@
 """PyTest ConfTest file."""
 
+from pathlib import Path
+
 import pandas as pd
 import pytest
 
@@ -24,3 +26,36 @@ def clean_df() -> pd.DataFrame:
         "is_italian": [False, True, False],
     }
     return pd.DataFrame(data)
+
+
+# ======================================================================
+@pytest.fixture
+def clean_filepath(tmp_path: Path) -> Path:
+    """Fixture to create a sample clean data file."""
+    italian = [
+        "ciao mondo",
+        "questa è una frase in italiano",
+        "oggi piove e fa freddo",
+        "il gatto dorme sul divano",
+        "mi piace la pizza con le acciughe",
+        "domani andiamo al mare",
+    ]
+    other = [
+        "hello world",
+        "this is an english sentence",
+        "hallo welt wie geht es dir",
+        "bonjour le monde",
+        "el gato duerme en el sofá",
+        "the weather is nice today",
+    ]
+    data = {
+        "text": [f"{text} {i}" for i in range(5) for text in italian + other],
+        "is_italian": [
+            is_italian
+            for _ in range(5)
+            for is_italian in [True] * len(italian) + [False] * len(other)
+        ],
+    }
+    filepath = tmp_path / "clean_data.csv"
+    pd.DataFrame(data).to_csv(filepath, index=False)
+    return filepath
@@ -3,8 +3,20 @@
 import pytest
 from pydantic import ValidationError
 
-from italiclas.api.models.payloads import PredictPayload
-from italiclas.api.models.responses import PingResponse, PredictResponse
+from italiclas.api.models.payloads import (
+    PredictPayload,
+    SegmentsPayload,
+    UpdatePayload,
+)
+from italiclas.api.models.responses import (
+    CascadeStatsResponse,
+    PingResponse,
+    PredictResponse,
+    SegmentResponse,
+    SegmentsResponse,
+    UpdateResponse,
+)
+from italiclas.config import cfg
 
 
 # ======================================================================
@@ -65,3 +77,81 @@ def test_predictresponse(is_italian, expectation) -> None:  # noqa: ANN001
     else:
         result = PredictResponse(is_italian=is_italian)
         assert (result.is_italian == is_italian) is expectation
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    ("samples", "expectation"),
+    [
+        ([{"text": "ciao mondo", "is_italian": True}], True),
+        ([{"text": "ciao", "is_italian": True}, {"text": "hello"}], False),
+        ([], False),
+        (None, False),
+    ],
+)
+def test_updatepayload(samples, expectation) -> None:  # noqa: ANN001
+    """Test for UpdatePayload model."""
+    if expectation:
+        result = UpdatePayload(samples=samples)
+        assert len(result.samples) == len(samples)
+    else:
+        with pytest.raises(ValidationError):
+            UpdatePayload(samples=samples)
+
+
+# ======================================================================
+def test_updateresponse() -> None:
+    """Test for UpdateResponse model."""
+    result = UpdateResponse(num_samples=1, version="model.v1.pkl")
+    assert result.num_samples == 1
+    with pytest.raises(ValidationError):
+        UpdateResponse(num_samples="many", version="model.v1.pkl")
+
+
+# ======================================================================
+def test_predictpayload_max_length() -> None:
+    """Test for PredictPayload text length cap."""
+    with pytest.raises(ValidationError):
+        PredictPayload(text="a" * (cfg.max_text_length + 1))
+
+
+# ======================================================================
+def test_predictresponse_exclude_none() -> None:
+    """Test for PredictResponse optional early exit field."""
+    result = PredictResponse(is_italian=True)
+    assert result.model_dump(exclude_none=True) == {"is_italian": True}
+    result = PredictResponse(is_italian=True, exited_early=False)
+    assert result.model_dump(exclude_none=True) == {
+        "is_italian": True,
+        "exited_early": False,
+    }
+
+
+# ======================================================================
+def test_segmentspayload() -> None:
+    """Test for SegmentsPayload model."""
+    assert SegmentsPayload(text="ciao mondo").mode == "sentence"
+    assert SegmentsPayload(text="ciao mondo", mode="window").mode == "window"
+    with pytest.raises(ValidationError):
+        SegmentsPayload(text="ciao mondo", mode="paragraph")
+    with pytest.raises(ValidationError):
+        SegmentsPayload(text="a" * (cfg.max_text_length + 1))
+
+
+# ======================================================================
+def test_segmentsresponse() -> None:
+    """Test for SegmentsResponse model."""
+    segment = SegmentResponse(start=0, end=4, is_italian=True, probability=1)
+    result = SegmentsResponse(segments=[segment], italian_fraction=1.0)
+    assert result.segments[0].end == 4  # noqa: PLR2004
+    with pytest.raises(ValidationError):
+        SegmentsResponse(segments=[segment], italian_fraction="all")
+
+
+# ======================================================================
+def test_cascadestatsresponse() -> None:
+    """Test for CascadeStatsResponse model."""
+    result = CascadeStatsResponse(fast=3, full=1, fast_fraction=0.75)
+    assert result.fast_fraction == 0.75  # noqa: PLR2004
+    with pytest.raises(ValidationError):
+        CascadeStatsResponse(fast="many", full=1, fast_fraction=0.75)
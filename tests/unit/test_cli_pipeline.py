@@ -0,0 +1,34 @@
+"""Test CLI Pipeline Application."""
+
+from pathlib import Path
+
+from italiclas.cli import pipeline
+from italiclas.utils import dag
+
+
+# ======================================================================
+def test_stages(tmp_path: Path) -> None:
+    """Test `stages()` dependencies."""
+    stages = pipeline.stages(
+        tmp_path / "data",
+        tmp_path / "ml",
+        with_cascade=True,
+        with_router=True,
+    )
+    dependencies = dag.Pipeline(stages, tmp_path / "state.json").dependencies
+    assert dependencies == {
+        "raw_data": set(),
+        "clean_data": {"raw_data"},
+        "training": {"clean_data"},
+        "router": {"clean_data"},
+        "cascade": {"clean_data", "router"},
+    }
+    stages = pipeline.stages(with_cascade=True, with_router=False)
+    dependencies = dag.Pipeline(stages, tmp_path / "state.json").dependencies
+    assert dependencies["cascade"] == {"clean_data", "training"}
+    stages = pipeline.stages(with_cascade=False, with_router=False)
+    assert [stage.name for stage in stages] == [
+        "raw_data",
+        "clean_data",
+        "training",
+    ]
@@ -1,66 +1,314 @@
 """Test ETL Clean Data."""
 
+import os
 from pathlib import Path
 
 import pandas as pd
 import pytest
 
 from italiclas.etl import clean_data
+from italiclas.utils import core
 
 
 # ======================================================================
+@pytest.mark.parametrize("clean_filename", ["some_clean.csv", "some_clean"])
 @pytest.mark.parametrize(
     ("file_exists", "force"),
     [(True, True), (True, False), (False, True), (False, False)],
 )
-def test_clean_data_processor(
+def test_clean_data_processor(  # noqa: PLR0913
     force,  # noqa: ANN001
     file_exists,  # noqa: ANN001
+    clean_filename,  # noqa: ANN001
     raw_df,  # noqa: ANN001
     clean_df,  # noqa: ANN001
+    tmp_path: Path,
     mocker,  # noqa: ANN001
 ) -> None:
     """Tests `clean_data.processor()` on file_exists/force combinations."""
-    raw_filename = "some_raw"
-    clean_filename = "some_clean"
-    dirpath = Path("some_dir/")
-    mocker.patch.object(Path, "is_file", return_value=file_exists)
-    if force or not file_exists:
-        mocker.patch("pandas.read_csv", return_value=raw_df.copy())
-    else:
-        mocker.patch("pandas.read_csv", return_value=clean_df.copy())
-    mocker.patch.object(pd.DataFrame, "to_csv")
+    raw_filename = "some_raw.csv"
+    raw_df.to_csv(tmp_path / raw_filename, index=False)
+    if file_exists:
+        clean_data.save(clean_df, tmp_path / clean_filename)
+    mocker.patch(
+        "italiclas.utils.core.is_outdated",
+        return_value=not file_exists,
+    )
     result = clean_data.processor(
         raw_filename,
         clean_filename,
-        dirpath,
+        tmp_path,
         force=force,
     )
-    assert result == dirpath / clean_filename
+    assert result == tmp_path / clean_filename
+    data = clean_data.load(result)
+    assert clean_data.is_valid(data)
+    assert data["is_italian"].sum() == clean_df["is_italian"].sum()
 
 
 # ======================================================================
-def test_clean_data_processor_raw_data_no_language(raw_df, mocker) -> None:  # noqa: ANN001
-    """Tests `clean_data_processor()` on invalid data: no 'language' column."""
-    invalid_raw_df = raw_df.copy()
-    invalid_raw_df["Lang"] = invalid_raw_df["Language"]
-    invalid_raw_df = invalid_raw_df.drop(["Language"], axis=1)
-    mocker.patch("pandas.read_csv", return_value=invalid_raw_df.copy())
-    mocker.patch.object(pd.DataFrame, "to_csv")
-    with pytest.raises(ValueError, match="Invalid raw data input"):
-        clean_data.processor(force=True)
+@pytest.mark.parametrize("clean_filename", ["clean.csv", "clean"])
+@pytest.mark.parametrize("max_rows", [None, 2])
+def test_load_iter_chunks(
+    clean_filename: str,
+    max_rows: int | None,
+    clean_df,  # noqa: ANN001
+    tmp_path: Path,
+) -> None:
+    """Tests `clean_data.load()` and `clean_data.iter_chunks()`."""
+    filepath = clean_data.save(clean_df, tmp_path / clean_filename)
+    expected = clean_df.iloc[:max_rows].reset_index(drop=True)
+    data = clean_data.load(filepath, max_rows=max_rows)
+    pd.testing.assert_frame_equal(data, expected)
+    data = clean_data.load(str(filepath), max_rows=max_rows)
+    pd.testing.assert_frame_equal(data, expected)
+    labels = clean_data.load(filepath, ["is_italian"], max_rows=max_rows)
+    assert list(labels.columns) == ["is_italian"]
+    chunks = list(clean_data.iter_chunks(str(filepath), 2, max_rows=max_rows))
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True),
+        expected,
+    )
+
+
+# ======================================================================
+@pytest.mark.parametrize("clean_filename", ["clean.csv", "clean"])
+def test_load_missing(clean_filename: str, tmp_path: Path) -> None:
+    """Tests `clean_data.load()` raises on missing clean data."""
+    with pytest.raises(FileNotFoundError):
+        clean_data.load(tmp_path / clean_filename)
 
 
 # ======================================================================
-def test_clean_data_processor_raw_data_no_text(raw_df, mocker) -> None:  # noqa: ANN001
-    """Tests `clean_data_processor()` on invalid data: no 'text' column."""
-    invalid_raw_df = raw_df.copy()
-    invalid_raw_df["String"] = invalid_raw_df["Text"]
-    invalid_raw_df = invalid_raw_df.drop(["Text"], axis=1)
-    mocker.patch("pandas.read_csv", return_value=invalid_raw_df.copy())
-    mocker.patch.object(pd.DataFrame, "to_csv")
+def test_export_csv_profile_formats(clean_df, tmp_path: Path) -> None:  # noqa: ANN001
+    """Tests `clean_data.export_csv()` and `clean_data.profile_formats()`."""
+    filepath = clean_data.save(clean_df, tmp_path / "clean")
+    csv_filepath = clean_data.export_csv(filepath, tmp_path / "clean.csv")
+    pd.testing.assert_frame_equal(pd.read_csv(csv_filepath), clean_df)
+    results = clean_data.profile_formats(filepath, 1)
+    assert len(results) == 6  # noqa: PLR2004
+    assert {result["format"] for result in results} == {
+        "csv",
+        "store",
+        "store (no mmap)",
+    }
+    assert all(result["size"] > 0 for result in results)
+
+
+# ======================================================================
+def test_clean_data_processor_outdated(raw_df, tmp_path: Path) -> None:  # noqa: ANN001
+    """Tests `clean_data.processor()` recomputes only outdated data."""
+    raw_filepath = tmp_path / "raw.csv"
+    clean_filepath = tmp_path / "clean.csv"
+    raw_df.to_csv(raw_filepath, index=False)
+    clean_data.processor("raw.csv", "clean.csv", tmp_path)
+    mtime = clean_filepath.stat().st_mtime_ns
+    clean_data.processor("raw.csv", "clean.csv", tmp_path)
+    assert clean_filepath.stat().st_mtime_ns == mtime
+    # : newer raw data
+    os.utime(raw_filepath, ns=(mtime + 10**9, mtime + 10**9))
+    clean_data.processor("raw.csv", "clean.csv", tmp_path)
+    assert clean_filepath.stat().st_mtime_ns != mtime
+
+
+# ======================================================================
+@pytest.mark.parametrize("column", ["Language", "Text"])
+def test_clean_data_processor_raw_data_invalid(
+    column: str,
+    raw_df,  # noqa: ANN001
+    tmp_path: Path,
+) -> None:
+    """Tests `clean_data_processor()` on invalid data: missing columns."""
+    raw_df.rename(columns={column: "Other"}).to_csv(
+        tmp_path / "raw.csv",
+        index=False,
+    )
     with pytest.raises(ValueError, match="Invalid raw data input"):
-        clean_data.processor(force=True)
+        clean_data.processor("raw.csv", "clean", tmp_path, force=True)
+    # : no partial output
+    assert [path.name for path in tmp_path.iterdir()] == ["raw.csv"]
+
+
+# ======================================================================
+@pytest.mark.parametrize("clean_filename", ["clean.csv", "clean"])
+def test_clean_data_processor_chunks(
+    clean_filename: str,
+    raw_df,  # noqa: ANN001
+    clean_df,  # noqa: ANN001
+    tmp_path: Path,
+) -> None:
+    """Tests `clean_data_processor()` in chunks gives the same result."""
+    pd.concat([raw_df] * 3).to_csv(tmp_path / "raw.csv", index=False)
+    clean_data.processor(
+        "raw.csv",
+        clean_filename,
+        tmp_path,
+        force=True,
+        chunk_size=2,
+        dedup_mode="none",
+    )
+    data = clean_data.load(tmp_path / clean_filename)
+    pd.testing.assert_frame_equal(
+        data,
+        pd.concat([clean_df] * 3, ignore_index=True),
+    )
+    assert clean_data.count_labels(tmp_path / clean_filename) == (9, 3)
+    # : with duplicates removal
+    clean_data.processor(
+        "raw.csv",
+        clean_filename,
+        tmp_path,
+        force=True,
+        chunk_size=2,
+        dedup_mode="exact",
+    )
+    data = clean_data.load(tmp_path / clean_filename)
+    pd.testing.assert_frame_equal(data, clean_df)
+
+
+# ======================================================================
+@pytest.mark.parametrize("incremental", [False, True])
+@pytest.mark.parametrize("clean_filename", ["clean.csv", "clean"])
+def test_clean_data_processor_numeric_texts(
+    clean_filename: str,
+    incremental: bool,  # noqa: FBT001
+    tmp_path: Path,
+) -> None:
+    """Tests `clean_data_processor()` with numeric-looking text chunks."""
+    raw_df = pd.DataFrame(
+        {
+            "Text": ["Ciao Mondo", "Hello World", "123", "456"],
+            "Language": ["Italian", "English", "Italian", "English"],
+        },
+    )
+    raw_df.to_csv(tmp_path / "raw.csv", index=False)
+    clean_data.processor(
+        "raw.csv",
+        clean_filename,
+        tmp_path,
+        force=True,
+        chunk_size=2,
+        incremental=incremental,
+        dedup_mode="none",
+    )
+    data = clean_data.load(tmp_path / clean_filename)
+    assert data["text"].tolist()[2:] == ["123", "456"]
+    assert data["is_italian"].tolist() == [True, False, True, False]
+
+
+# ======================================================================
+def test_clean_data_processor_bounded_memory(tmp_path: Path) -> None:
+    """Tests `clean_data_processor()` memory does not grow with the input."""
+    raw_df = pd.DataFrame(
+        {"Text": ["Ciao Mondo! " * 10] * 1000, "Language": ["Italian"] * 1000},
+    )
+    peaks = []
+    # : larger than the CSV parser buffers
+    for repeats in (8, 32):
+        pd.concat([raw_df] * repeats).to_csv(tmp_path / "raw.csv", index=False)
+        _, _, peak = core.measure(
+            clean_data.processor,
+            "raw.csv",
+            "clean",
+            tmp_path,
+            force=True,
+            chunk_size=500,
+            dedup_mode="none",
+        )
+        peaks.append(peak)
+    assert peaks[1] < 1.5 * peaks[0]
+
+
+# ======================================================================
+@pytest.fixture
+def many_raw_df() -> pd.DataFrame:
+    """Fixture to create a sample DataFrame with more rows."""
+    texts = [f"Ciao {i}" if i % 3 else f"Hello {i}" for i in range(10)]
+    languages = ["Italian" if i % 3 else "English" for i in range(10)]
+    return pd.DataFrame({"Text": texts, "Language": languages})
+
+
+# ======================================================================
+def _process(
+    raw_df: pd.DataFrame,
+    tmp_path: Path,
+    **kws,  # noqa: ANN003
+) -> pd.DataFrame | None:
+    """Process the raw data, and get the clean data delta."""
+    raw_df.to_csv(tmp_path / "raw.csv", index=False)
+    kws = {"force": True, "chunk_size": 4, **kws}
+    clean_data.processor("raw.csv", "clean", tmp_path, **kws)
+    data = clean_data.load(tmp_path / "clean")
+    expected = pd.DataFrame(
+        {
+            "text": raw_df["Text"].tolist(),
+            "is_italian": (raw_df["Language"] == "Italian").tolist(),
+        },
+    )
+    pd.testing.assert_frame_equal(data, expected)
+    return clean_data.load_delta(tmp_path / "clean")
+
+
+# ======================================================================
+def test_clean_data_processor_incremental(
+    many_raw_df,  # noqa: ANN001
+    tmp_path: Path,
+    mocker,  # noqa: ANN001
+) -> None:
+    """Tests `clean_data_processor()` cleans only new or changed rows."""
+    assert _process(many_raw_df.iloc[:6], tmp_path) is None
+    spy = mocker.spy(clean_data, "clean_chunk")
+    # : unchanged raw data
+    delta = _process(many_raw_df.iloc[:6], tmp_path)
+    assert delta.empty
+    assert spy.call_count == 0
+    # : appended raw data (growing the last chunk)
+    spy.reset_mock()
+    delta = _process(many_raw_df, tmp_path)
+    assert delta["text"].tolist() == many_raw_df["Text"][6:].tolist()
+    assert [len(call.args[0]) for call in spy.call_args_list] == [2, 2]
+    # : changed raw data
+    changed_raw_df = many_raw_df.copy()
+    changed_raw_df.loc[5, "Text"] = "Hallo"
+    assert _process(changed_raw_df, tmp_path) is None
+    manifest = clean_data.load_manifest(tmp_path / "clean")
+    assert manifest["delta"] == {"start": 4, "stop": 10, "append": False}
+    # : removed raw data
+    assert _process(changed_raw_df.iloc[:5], tmp_path) is None
+    # : different chunk size
+    assert _process(changed_raw_df, tmp_path, chunk_size=3) is None
+    manifest = clean_data.load_manifest(tmp_path / "clean")
+    assert manifest["delta"]["start"] == 0
+    # : not incremental
+    assert _process(changed_raw_df, tmp_path, incremental=False) is None
+
+
+# ======================================================================
+def test_clean_data_processor_incremental_dedup(
+    many_raw_df,  # noqa: ANN001
+    tmp_path: Path,
+) -> None:
+    """Tests `clean_data_processor()` removes new duplicates of kept rows."""
+    raw_df = pd.concat([many_raw_df.iloc[:6], many_raw_df.iloc[:2]])
+    raw_df.to_csv(tmp_path / "raw.csv", index=False)
+    kws = {"force": True, "chunk_size": 4}
+    clean_data.processor("raw.csv", "clean", tmp_path, **kws)
+    assert len(clean_data.load(tmp_path / "clean")) == 6  # noqa: PLR2004
+    raw_df = pd.concat([raw_df, many_raw_df.iloc[1:8]])
+    raw_df.to_csv(tmp_path / "raw.csv", index=False)
+    clean_data.processor("raw.csv", "clean", tmp_path, **kws)
+    delta = clean_data.load_delta(tmp_path / "clean")
+    assert delta["text"].tolist() == many_raw_df["Text"][6:8].tolist()
+    manifest = clean_data.load_manifest(tmp_path / "clean")
+    assert manifest["dedup"]["mode"] == "exact"
+    assert [chunk["num_clean"] for chunk in manifest["chunks"]] == [4, 2, 0, 2]
+
+
+# ======================================================================
+def test_save_chunks_empty(tmp_path: Path) -> None:
+    """Tests `clean_data.save_chunks()` with no chunks."""
+    assert clean_data.save_chunks([], tmp_path / "clean") == (0, 0)
+    assert clean_data.load(tmp_path / "clean").empty
 
 
 # ======================================================================
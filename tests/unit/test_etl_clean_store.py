@@ -0,0 +1,135 @@
+"""Test ETL Columnar Clean Data Store."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from italiclas.etl import clean_store
+
+
+# ======================================================================
+@pytest.fixture
+def store_df() -> pd.DataFrame:
+    """Fixture to create a sample DataFrame (with non-ASCII and empty)."""
+    data = {
+        "text": ["Hello World", "Perché no?", "", "Ciao, è così", "Hallo"],
+        "is_italian": [False, True, False, True, False],
+    }
+    return pd.DataFrame(data)
+
+
+# ======================================================================
+@pytest.mark.parametrize("mmap", [True, False])
+def test_append_read(store_df, mmap: bool, tmp_path: Path) -> None:  # noqa: ANN001, FBT001
+    """Test `CleanStore.append()` and `CleanStore.read()`."""
+    store = clean_store.CleanStore(tmp_path / "store", mmap=mmap)
+    assert not store.exists
+    store.append(store_df["text"][:2], store_df["is_italian"][:2])
+    store.append(store_df["text"][2:], store_df["is_italian"][2:])
+    assert len(store) == len(store_df)
+    assert store.meta["num_italian"] == store_df["is_italian"].sum()
+    pd.testing.assert_frame_equal(store.read(), store_df)
+    pd.testing.assert_frame_equal(
+        store.read(["is_italian"], 1, 3),
+        store_df[["is_italian"]].iloc[1:3],
+    )
+    assert store.texts(3, 4) == ["Ciao, è così"]
+    with pytest.raises(ValueError, match="Unknown column"):
+        store.read(["language"])
+
+
+# ======================================================================
+def test_missing_store(tmp_path: Path) -> None:
+    """Test a missing store raises (not read as empty)."""
+    store = clean_store.CleanStore(tmp_path / "store")
+    with pytest.raises(FileNotFoundError, match="not found"):
+        len(store)
+    with pytest.raises(FileNotFoundError, match="not found"):
+        store.read()
+    store.append([], [])
+    assert store.exists
+    assert len(store) == 0
+    assert store.read().empty
+
+
+# ======================================================================
+def test_append_size_mismatch(tmp_path: Path) -> None:
+    """Test `CleanStore.append()` with mismatching texts and labels."""
+    store = clean_store.CleanStore(tmp_path / "store")
+    with pytest.raises(ValueError, match="Size mismatch"):
+        store.append(["ciao", "hello"], [True])
+
+
+# ======================================================================
+def test_append_interrupted(store_df, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test data past the metadata (interrupted append) is ignored."""
+    store = clean_store.CleanStore(tmp_path / "store")
+    store.append(store_df["text"][:2], store_df["is_italian"][:2])
+    for filename in (
+        clean_store.TEXT_FILENAME,
+        clean_store.OFFSETS_FILENAME,
+        clean_store.LABELS_FILENAME,
+    ):
+        with (store.dirpath / filename).open("ab") as file_obj:
+            file_obj.write(b"\x01" * 11)
+    pd.testing.assert_frame_equal(store.read(), store_df.iloc[:2])
+    store.append(store_df["text"][2:], store_df["is_italian"][2:])
+    pd.testing.assert_frame_equal(store.read(), store_df)
+
+
+# ======================================================================
+@pytest.mark.parametrize("max_rows", [None, 3])
+def test_iter_chunks(store_df, max_rows: int | None, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `CleanStore.iter_chunks()`."""
+    store = clean_store.CleanStore(tmp_path / "store")
+    store.append(store_df["text"], store_df["is_italian"])
+    chunks = list(store.iter_chunks(2, max_rows=max_rows))
+    assert all(len(chunk) <= 2 for chunk in chunks)  # noqa: PLR2004
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks),
+        store_df.iloc[:max_rows],
+    )
+
+
+# ======================================================================
+def test_to_csv(store_df, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `CleanStore.to_csv()`."""
+    store = clean_store.CleanStore(tmp_path / "store")
+    store.append(store_df["text"], store_df["is_italian"])
+    csv_filepath = store.to_csv(tmp_path / "clean.csv", 2)
+    data = pd.read_csv(csv_filepath, keep_default_na=False)
+    pd.testing.assert_frame_equal(data, store_df)
+
+
+# ======================================================================
+def test_replace_store(store_df, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `replace_store()`."""
+    target = clean_store.CleanStore(tmp_path / "store")
+    target.append(store_df["text"], store_df["is_italian"])
+    source = clean_store.CleanStore(tmp_path / "new_store")
+    source.append(["ciao"], [True])
+    clean_store.replace_store(source.dirpath, target.dirpath)
+    assert not source.dirpath.exists()
+    assert target.texts() == ["ciao"]
+    assert [path.name for path in tmp_path.iterdir()] == ["store"]
+
+
+# ======================================================================
+def test_truncate(store_df, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `CleanStore.truncate()`."""
+    store = clean_store.CleanStore(tmp_path / "store")
+    store.append(store_df["text"], store_df["is_italian"])
+    store.truncate(10)
+    assert len(store) == len(store_df)
+    store.truncate(2)
+    assert len(store) == 2  # noqa: PLR2004
+    assert store.meta["num_italian"] == 1
+    pd.testing.assert_frame_equal(store.read(), store_df.iloc[:2])
+    store.append(store_df["text"][3:], store_df["is_italian"][3:])
+    pd.testing.assert_frame_equal(
+        store.read(),
+        store_df.drop(index=2).reset_index(drop=True),
+    )
+    store.truncate(0)
+    assert store.read().empty
@@ -0,0 +1,73 @@
+"""Test ETL Duplicate Removal."""
+
+import numpy as np
+import pytest
+
+from italiclas.etl import dedup
+
+
+# ======================================================================
+def test_minhashes() -> None:
+    """Test `minhashes()` of similar, different, short and empty texts."""
+    texts = [
+        "questa è una frase in italiano",
+        "Questa è una frase in italiano!",
+        "this is an english sentence",
+        "io",
+        "",
+    ]
+    result = dedup.minhashes(texts, 64)
+    assert result.shape == (len(texts), 64)
+    assert result.dtype == np.uint64
+    similarities = np.mean(result == result[0], axis=1)
+    assert similarities[1] > 0.8  # noqa: PLR2004
+    assert similarities[2] < 0.2  # noqa: PLR2004
+    assert np.array_equal(result, dedup.minhashes(texts, 64))
+    assert dedup.minhashes([], 64).shape == (0, 64)
+    bands = dedup.band_hashes(result, 8)
+    assert bands.shape == (len(texts), 8)
+    assert np.any(bands[0] == bands[1])
+    assert not np.any(bands[0] == bands[2])
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    ("mode", "expected"),
+    [
+        ("none", [True] * 6),
+        ("exact", [True, True, False, True, True, True]),
+        ("near", [True, True, False, False, True, False]),
+    ],
+)
+def test_duplicate_filter(mode: dedup.DedupType, expected: list) -> None:
+    """Test `DuplicateFilter.filter()` within and across chunks."""
+    texts = [
+        "questa è una frase in italiano",
+        "this is an english sentence",
+        "Questa è una   frase in italiano",
+        "questa è una frase in italiano!",
+        "hallo welt wie geht es dir",
+        "This is an English sentence.",
+    ]
+    duplicates = dedup.DuplicateFilter(mode)
+    assert duplicates.filter(texts).tolist() == expected
+    assert duplicates.counts["kept"] == sum(expected)
+    # : across chunks
+    duplicates = dedup.DuplicateFilter(mode)
+    keep = np.concatenate(
+        [duplicates.filter(texts[:2]), duplicates.filter(texts[2:])],
+    )
+    assert keep.tolist() == expected
+    # : after added texts
+    duplicates = dedup.DuplicateFilter(mode)
+    duplicates.add(texts[:2])
+    assert duplicates.filter(texts[2:]).tolist() == expected[2:]
+
+
+# ======================================================================
+def test_duplicate_filter_invalid() -> None:
+    """Test `DuplicateFilter` with invalid arguments."""
+    with pytest.raises(ValueError, match="Unknown deduplication"):
+        dedup.DuplicateFilter("fuzzy")
+    with pytest.raises(ValueError, match="Invalid similarity"):
+        dedup.DuplicateFilter("near", similarity=1.0)
@@ -1,52 +1,263 @@
 """Test ETL Raw Data."""
 
-from http import HTTPStatus
+import hashlib
+import http.server
+import io
+import json
+import threading
+import zipfile
+from collections.abc import Iterator
 from pathlib import Path
-from unittest.mock import MagicMock
 
 import pandas as pd
 import pytest
+import requests
 
 from italiclas.etl import raw_data
 
+# : the content served by the local HTTP server
+CONTENT = bytes(range(256)) * 1000
+
+
+# ======================================================================
+class _RangeHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP request handler serving in-memory files, with range support."""
+
+    # : the served files, by path
+    files: dict[str, bytes] = {}  # noqa: RUF012
+    # : the received "Range" headers (None if missing), by path
+    ranges: dict[str, list] = {}  # noqa: RUF012
+
+    def log_message(self, *args: object) -> None:
+        """Do not log the requests."""
+
+    @staticmethod
+    def _etag(data: bytes) -> str:
+        """Get the ETag of some data."""
+        return f'"{hashlib.sha256(data).hexdigest()}"'
+
+    def _send_headers(self) -> bytes | None:
+        """Send the response headers, and get the body to send."""
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return None
+        header = self.headers.get("Range")
+        if self.command == "GET":
+            self.ranges.setdefault(self.path, []).append(header)
+        if self.headers.get("If-Range") not in (None, self._etag(data)):
+            # : the remote file changed, send it all
+            header = None
+        if header is not None:
+            begin, _, end = header.removeprefix("bytes=").partition("-")
+            begin = int(begin)
+            end = int(end) if end else len(data) - 1
+            if begin >= len(data):
+                self.send_error(416)
+                return None
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                f"bytes {begin}-{end}/{len(data)}",
+            )
+            data = data[begin : end + 1]
+        elif self.headers.get("If-None-Match") == self._etag(data):
+            self.send_response(304)
+            self.end_headers()
+            return None
+        else:
+            self.send_response(200)
+        self.send_header("ETag", self._etag(self.files[self.path]))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        return data
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        """Handle HEAD requests."""
+        self._send_headers()
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Handle GET requests."""
+        data = self._send_headers()
+        if data is not None:
+            self.wfile.write(data)
+
+
+# ======================================================================
+def _zip_data(text: str, language: str) -> bytes:
+    """Get a ZIP file with the raw data of a single text."""
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w") as zip_ref:
+        zip_ref.writestr("source.csv", f"text,language\n{text},{language}\n")
+    return zip_buffer.getvalue()
+
+
+# ======================================================================
+@pytest.fixture
+def server() -> Iterator[str]:
+    """Serve in-memory files from a local HTTP server."""
+    _RangeHandler.files = {
+        "/data.bin": CONTENT,
+        "/data.zip": _zip_data("ciao", "Italian"),
+    }
+    _RangeHandler.ranges = {}
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    thread = threading.Thread(
+        target=httpd.serve_forever,
+        kwargs={"poll_interval": 0.01},
+        daemon=True,
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+# ======================================================================
+def test_download(server: str, tmp_path: Path) -> None:
+    """Test `download()` in a single request."""
+    filepath = tmp_path / "data.bin"
+    result = raw_data.download(f"{server}/data.bin", filepath, n_parts=1)
+    assert result == filepath
+    assert filepath.read_bytes() == CONTENT
+    assert list(tmp_path.iterdir()) == [filepath]
+    assert _RangeHandler.ranges["/data.bin"] == [None]
+
+
+# ======================================================================
+def test_download_resume(server: str, tmp_path: Path) -> None:
+    """Test `download()` resumes a partial download."""
+    filepath = tmp_path / "data.bin"
+    offset = 1000
+    (tmp_path / "data.bin.part").write_bytes(CONTENT[:offset])
+    raw_data.download(f"{server}/data.bin", filepath, n_parts=1)
+    assert filepath.read_bytes() == CONTENT
+    assert _RangeHandler.ranges["/data.bin"] == [f"bytes={offset}-"]
+
+
+# ======================================================================
+def test_download_parallel(server: str, tmp_path: Path) -> None:
+    """Test `download()` with parallel range requests."""
+    filepath = tmp_path / "data.bin"
+    raw_data.download(
+        f"{server}/data.bin",
+        filepath,
+        n_parts=4,
+        min_part_size=1000,
+    )
+    assert filepath.read_bytes() == CONTENT
+    assert list(tmp_path.iterdir()) == [filepath]
+    assert sorted(_RangeHandler.ranges["/data.bin"]) == [
+        "bytes=0-63999",
+        "bytes=128000-191999",
+        "bytes=192000-255999",
+        "bytes=64000-127999",
+    ]
+
+
+# ======================================================================
+def test_download_parallel_stale(server: str, tmp_path: Path) -> None:
+    """Test `download()` discards parts fetched from another file."""
+    filepath = tmp_path / "data.bin"
+    kws = {"n_parts": 4, "min_part_size": 1000}
+    remote = {
+        "etag": '"old"',
+        "size": len(CONTENT),
+        "accepts_ranges": True,
+    }
+    # : the remote file changes while fetching the parts
+    with pytest.raises(requests.HTTPError):
+        raw_data.download(f"{server}/data.bin", filepath, remote=remote, **kws)
+    assert list(tmp_path.iterdir()) == []
+    # : parts left by an interrupted fetch of another file
+    for i in range(4):
+        (tmp_path / f"data.bin.part{i}").write_bytes(b"old")
+    (tmp_path / "data.bin.parts.json").write_text(json.dumps(remote))
+    raw_data.download(f"{server}/data.bin", filepath, **kws)
+    assert filepath.read_bytes() == CONTENT
+    assert list(tmp_path.iterdir()) == [filepath]
+
+
+# ======================================================================
+def test_download_checksum(server: str, tmp_path: Path) -> None:
+    """Test `download()` verifies the checksum."""
+    filepath = tmp_path / "data.bin"
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    raw_data.download(f"{server}/data.bin", filepath, sha256=sha256)
+    assert filepath.read_bytes() == CONTENT
+    filepath.unlink()
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        raw_data.download(f"{server}/data.bin", filepath, sha256="0" * 64)
+    assert not list(tmp_path.iterdir())
+
 
 # ======================================================================
 @pytest.mark.parametrize(
     ("file_exists", "force"),
     [(True, True), (True, False), (False, True), (False, False)],
 )
-def test_raw_data_fetcher(force, file_exists, mocker) -> None:  # noqa: ANN001
+def test_raw_data_fetcher(
+    file_exists: bool,  # noqa: FBT001
+    force: bool,  # noqa: FBT001
+    server: str,
+    tmp_path: Path,
+) -> None:
     """Tests `raw_data.fetcher()` on file_exists/force combinations."""
-    raw_filename = "some_filename"
-    dirpath = Path("some_dir/")
-    mock_zip = MagicMock()
-    mock_response = MagicMock()
-    mock_response.status_code = HTTPStatus.OK
-    mocker.patch.object(Path, "is_file", return_value=file_exists)
-    mock_zipfile = mocker.patch("zipfile.ZipFile", return_value=mock_zip)
-    mock_move = mocker.patch("shutil.move")
-    mock_get = mocker.patch("requests.get", return_value=mock_response)
-    result = raw_data.fetcher(raw_filename, dirpath, force=force)
-    assert mock_get.called is (force or not file_exists)
-    if mock_get.called:
-        assert mock_zipfile.called is True
-        assert mock_move.called is True
-    assert result == dirpath / raw_filename
+    raw_filepath = tmp_path / "raw.csv"
+    if file_exists:
+        raw_filepath.write_text("old")
+    result = raw_data.fetcher(
+        "raw.csv",
+        tmp_path,
+        source=f"{server}/data.zip",
+        source_filename="source.csv",
+        force=force,
+    )
+    assert result == raw_filepath
+    is_fetched = force or not file_exists
+    assert ("/data.zip" in _RangeHandler.ranges) is is_fetched
+    if is_fetched:
+        assert pd.read_csv(raw_filepath)["language"].tolist() == ["Italian"]
+        assert set(tmp_path.iterdir()) == {
+            raw_filepath,
+            raw_data.meta_filepath(raw_filepath),
+        }
 
 
 # ======================================================================
-@pytest.mark.parametrize(
-    "status_code",
-    [HTTPStatus.NOT_FOUND, HTTPStatus.INTERNAL_SERVER_ERROR],
-)
-def test_raw_data_fetcher_error(status_code, mocker) -> None:  # noqa: ANN001
+def test_raw_data_fetcher_revalidate(server: str, tmp_path: Path) -> None:
+    """Tests `raw_data.fetcher()` conditional revalidation."""
+    kws = {
+        "source": f"{server}/data.zip",
+        "source_filename": "source.csv",
+        "revalidate": True,
+    }
+    raw_filepath = raw_data.fetcher("raw.csv", tmp_path, **kws)
+    meta = json.loads(raw_data.meta_filepath(raw_filepath).read_text())
+    assert meta["etag"] is not None
+    mtime = raw_filepath.stat().st_mtime_ns
+    # : not modified
+    raw_data.fetcher("raw.csv", tmp_path, **kws)
+    assert len(_RangeHandler.ranges["/data.zip"]) == 1
+    assert raw_filepath.stat().st_mtime_ns == mtime
+    # : modified
+    _RangeHandler.files["/data.zip"] = _zip_data("hello", "English")
+    raw_data.fetcher("raw.csv", tmp_path, **kws)
+    assert len(_RangeHandler.ranges["/data.zip"]) == 2  # noqa: PLR2004
+    assert pd.read_csv(raw_filepath)["language"].tolist() == ["English"]
+
+
+# ======================================================================
+def test_raw_data_fetcher_error(server: str, tmp_path: Path) -> None:
     """Tests `raw_data.fetcher()` with error scenarios."""
-    mock_response = MagicMock()
-    mock_response.status_code = status_code
-    mocker.patch("requests.get", return_value=mock_response)
-    mocker.patch.object(Path, "is_file", return_value=False)
-    result = raw_data.fetcher()
+    result = raw_data.fetcher(
+        "raw.csv",
+        tmp_path,
+        source=f"{server}/missing.zip",
+    )
     assert result is None
+    assert not list(tmp_path.iterdir())
 
 
 # ======================================================================
@@ -0,0 +1,164 @@
+"""Test ML Cascade Classifier."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+
+from italiclas.ml import cascade, model, prediction, routing, training
+from italiclas.utils import core
+
+
+# ======================================================================
+@pytest.fixture
+def data(clean_filepath: Path) -> pd.DataFrame:
+    """Get the clean data."""
+    return pd.read_csv(clean_filepath)
+
+
+# ======================================================================
+@pytest.fixture
+def full(data: pd.DataFrame) -> Pipeline:
+    """Get a (full) pipeline trained on the clean data."""
+    return model.base_pipeline().fit(data["text"], data["is_italian"])
+
+
+# ======================================================================
+def test_log_odds(data: pd.DataFrame, full: Pipeline) -> None:
+    """Test `log_odds()` against the predictions."""
+    margins = cascade.log_odds(full, data["text"])
+    assert np.array_equal(margins > 0, full.predict(data["text"]))
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    ("threshold", "expected_fast"),
+    [(np.inf, 0), (-np.inf, 1)],
+)
+def test_cascade_classifier(
+    threshold: float,
+    expected_fast: float,
+    data: pd.DataFrame,
+    full: Pipeline,
+) -> None:
+    """Test `CascadeClassifier` stages routing and statistics."""
+    fast = cascade.fast_pipeline().fit(data["text"], data["is_italian"])
+    classifier = cascade.CascadeClassifier(
+        cascade.FastStage(fast, threshold, expected_fast),
+        full,
+    )
+    cascade.reset_stats()
+    result = classifier.predict(data["text"])
+    expected = (fast if expected_fast else full).predict(data["text"])
+    assert np.array_equal(result, expected)
+    stats = cascade.stats()
+    assert stats["fast"] + stats["full"] == len(data)
+    assert stats["fast_fraction"] == expected_fast
+
+
+# ======================================================================
+@pytest.mark.parametrize("agreement", [1.0, 0.9])
+def test_fit_fast_stage(
+    agreement: float,
+    data: pd.DataFrame,
+    full: Pipeline,
+) -> None:
+    """Test `fit_fast_stage()` calibration."""
+    result = cascade.fit_fast_stage(
+        full,
+        data["text"],
+        data["is_italian"],
+        agreement,
+    )
+    assert result.threshold >= 0
+    assert 0 <= result.coverage <= 1
+    assert result.pipeline.predict(["ciao mondo"]).tolist() == [True]
+
+
+# ======================================================================
+def test_train_cascade_max_rows(
+    full: Pipeline,
+    clean_filepath: Path,
+    tmp_path: Path,
+    mocker,  # noqa: ANN001
+) -> None:
+    """Test `train_cascade()` calibrates on at most `max_rows` rows."""
+    spy = mocker.spy(cascade, "fit_fast_stage")
+    training.train_cascade(full, clean_filepath, tmp_path / "fast.pkl", 10)
+    assert len(spy.call_args.args[1]) == 10  # noqa: PLR2004
+
+
+# ======================================================================
+def test_train_predict_cascade(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `train()` and `predict()` with the cascade."""
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    cascade_filepath = tmp_path / "cascade.pkl.lzma"
+    params_filepath = tmp_path / "params.pkl.lzma"
+    # : skip the optimization
+    core.save_obj({}, params_filepath)
+    training.train(
+        clean_filepath,
+        pipeline_filepath,
+        params_filepath,
+        store_dirpath=None,
+        with_cascade=True,
+        cascade_filepath=cascade_filepath,
+    )
+    assert cascade_filepath.is_file()
+    cascade.reset_stats()
+    for text, expected in (("ciao mondo", True), ("hello world", False)):
+        assert (
+            prediction.predict(
+                text,
+                pipeline_filepath,
+                with_cascade=True,
+                cascade_filepath=cascade_filepath,
+            )
+            == expected
+        )
+    stats = cascade.stats()
+    assert stats["fast"] + stats["full"] == 2  # noqa: PLR2004
+
+
+# ======================================================================
+def test_train_predict_cascade_router(
+    clean_filepath: Path,
+    tmp_path: Path,
+    mocker,  # noqa: ANN001
+) -> None:
+    """Test `train()` and `predict()` with the cascade and the router."""
+    filepaths = {
+        name: tmp_path / f"{name}.pkl.lzma"
+        for name in ("pipeline", "cascade", "router", "params")
+    }
+    # : skip the optimizations
+    for filepath in (
+        filepaths["params"],
+        *(routing.bucket_filepath(filepaths["params"], i) for i in range(2)),
+    ):
+        core.save_obj({}, filepath)
+    spy = mocker.spy(cascade, "fit_fast_stage")
+    training.train(
+        clean_filepath,
+        filepaths["pipeline"],
+        filepaths["params"],
+        store_dirpath=None,
+        with_cascade=True,
+        cascade_filepath=filepaths["cascade"],
+        with_router=True,
+        router_filepath=filepaths["router"],
+    )
+    # : calibrated against the router
+    assert isinstance(spy.call_args.args[0], routing.LengthRouter)
+    spy = mocker.spy(model, "pre_trained_pipeline")
+    assert prediction.predict(
+        "ciao mondo",
+        filepaths["pipeline"],
+        with_cascade=True,
+        cascade_filepath=filepaths["cascade"],
+        with_router=True,
+        router_filepath=filepaths["router"],
+    )
+    spy.assert_not_called()
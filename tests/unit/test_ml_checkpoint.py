@@ -0,0 +1,65 @@
+"""Test ML Search Checkpoint."""
+
+import concurrent.futures
+from pathlib import Path
+
+from italiclas.ml import checkpoint
+
+N_RECORDS = 50
+
+
+# ======================================================================
+def _append_records(filepath: Path, worker: int) -> None:
+    """Append records from a worker process."""
+    search_checkpoint = checkpoint.Checkpoint(filepath)
+    for i in range(N_RECORDS):
+        search_checkpoint.append([{"key": f"{worker}-{i}", "value": i}])
+
+
+# ======================================================================
+def test_checkpoint(tmp_path: Path) -> None:
+    """Test `Checkpoint` append and load (ignoring truncated lines)."""
+    search_checkpoint = checkpoint.Checkpoint(tmp_path / "checkpoint.jsonl")
+    assert search_checkpoint.load() == {}
+    search_checkpoint.append([{"key": "a", "value": 1}])
+    search_checkpoint.append([{"key": "b", "value": 2}])
+    with search_checkpoint.filepath.open("a") as file_obj:
+        file_obj.write('{"key": "c", "val')
+    assert search_checkpoint.load() == {
+        "a": {"key": "a", "value": 1},
+        "b": {"key": "b", "value": 2},
+    }
+    assert search_checkpoint.key("x", 1) != search_checkpoint.key("x", 2)
+    search_checkpoint.remove()
+    assert not search_checkpoint.filepath.exists()
+
+
+# ======================================================================
+def test_checkpoint_append_truncated(tmp_path: Path) -> None:
+    """Test `Checkpoint` appends after a truncated last line."""
+    search_checkpoint = checkpoint.Checkpoint(tmp_path / "checkpoint.jsonl")
+    search_checkpoint.append([{"key": "a", "value": 1}])
+    search_checkpoint.append([{"key": "b", "value": 2}])
+    with search_checkpoint.filepath.open("r+b") as file_obj:
+        file_obj.truncate(search_checkpoint.filepath.stat().st_size - 5)
+    search_checkpoint.append([{"key": "c", "value": 3}])
+    assert search_checkpoint.load() == {
+        "a": {"key": "a", "value": 1},
+        "c": {"key": "c", "value": 3},
+    }
+
+
+# ======================================================================
+def test_checkpoint_concurrent(tmp_path: Path) -> None:
+    """Test `Checkpoint` appends from concurrent processes."""
+    filepath = tmp_path / "checkpoint.jsonl"
+    n_workers = 4
+    with concurrent.futures.ProcessPoolExecutor(n_workers) as executor:
+        list(
+            executor.map(
+                _append_records,
+                [filepath] * n_workers,
+                range(n_workers),
+            ),
+        )
+    assert len(checkpoint.Checkpoint(filepath).load()) == n_workers * N_RECORDS
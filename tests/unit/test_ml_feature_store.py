@@ -0,0 +1,61 @@
+"""Test ML Feature Store."""
+
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from italiclas.ml import feature_store
+
+TEXTS = ["ciao mondo", "hello world", "ciao a tutti"]
+
+
+# ======================================================================
+def test_feature_store_put_get(tmp_path: Path) -> None:
+    """Test `FeatureStore.put()` and `FeatureStore.get()`."""
+    store = feature_store.FeatureStore(tmp_path)
+    vect = CountVectorizer()
+    key = store.key(vect, "data", 0)
+    assert key != store.key(vect.set_params(analyzer="char"), "data", 0)
+    assert store.get(key) is None
+    matrices = (
+        scipy.sparse.csr_matrix(np.eye(3)),
+        scipy.sparse.csr_matrix([[1, 2]]),
+    )
+    store.put(key, matrices)
+    loaded, loaded_vect = store.get(key)
+    assert loaded_vect is None
+    for matrix, expected in zip(loaded, matrices, strict=True):
+        assert (matrix != expected).nnz == 0
+        # : memory-mapped
+        assert not matrix.data.flags.owndata
+
+
+# ======================================================================
+def test_feature_store_evict(tmp_path: Path) -> None:
+    """Test `FeatureStore` least recently used eviction."""
+    store = feature_store.FeatureStore(tmp_path)
+    matrices = [scipy.sparse.csr_matrix(np.eye(10))]
+    store.put("a", matrices)
+    store.max_bytes = 2 * store.nbytes
+    store.put("b", matrices)
+    store.get("a")
+    store.put("c", matrices)
+    assert [entry.name for entry in store.entries()] == ["a", "c"]
+
+
+# ======================================================================
+def test_feature_store_fit_transform(tmp_path: Path) -> None:
+    """Test `FeatureStore.fit_transform()` reuse."""
+    store = feature_store.FeatureStore(tmp_path)
+    vect = CountVectorizer()
+    fitted, matrix = store.fit_transform(vect, TEXTS)
+    assert len(store.entries()) == 1
+    loaded, loaded_matrix = store.fit_transform(vect, TEXTS)
+    assert len(store.entries()) == 1
+    assert loaded is not fitted
+    assert loaded.vocabulary_ == fitted.vocabulary_
+    assert (loaded_matrix != matrix).nnz == 0
+    store.fit_transform(vect, TEXTS[:2])
+    assert len(store.entries()) == 2  # noqa: PLR2004
@@ -0,0 +1,85 @@
+"""Test ML Features."""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+from italiclas.ml import features
+
+TEXTS = [
+    "Ciao   Mondo!\nCome va?  Perché no",
+    "a",
+    "",
+    "Hello  world  x y zz",
+]
+
+
+# ======================================================================
+@pytest.mark.parametrize("analyzer", ["char", "char_wb", "word"])
+@pytest.mark.parametrize("ngram_range", [(1, 1), (1, 3), (2, 5)])
+@pytest.mark.parametrize("strip_accents", [None, "ascii", "unicode"])
+def test_ngram_indices(analyzer, ngram_range, strip_accents) -> None:  # noqa: ANN001
+    """Test `ngram_indices()` against `CountVectorizer` n-grams."""
+    n_features = 2**16
+    analyze = CountVectorizer(
+        analyzer=analyzer,
+        ngram_range=ngram_range,
+        strip_accents=strip_accents,
+    ).build_analyzer()
+    indices, indptr = features.ngram_indices(
+        TEXTS,
+        analyzer,
+        ngram_range,
+        n_features,
+        strip_accents,
+    )
+    assert indptr.size == len(TEXTS) + 1
+    for i, text in enumerate(TEXTS):
+        expected = sorted(
+            features.ngram_hash(ngram) % n_features for ngram in analyze(text)
+        )
+        assert sorted(indices[indptr[i] : indptr[i + 1]]) == expected
+
+
+# ======================================================================
+def test_ngram_indices_invalid() -> None:
+    """Test `ngram_indices()` with invalid parameters."""
+    with pytest.raises(ValueError, match="analyzer"):
+        features.ngram_indices(TEXTS, "foo")  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="ngram_range"):
+        features.ngram_indices(TEXTS, "char", (2, 1))
+    with pytest.raises(ValueError, match="strip_accents"):
+        features.ngram_indices(TEXTS, "char", strip_accents="foo")  # type: ignore[arg-type]
+
+
+# ======================================================================
+@pytest.mark.parametrize("binary", [True, False])
+def test_ngram_hashing_vectorizer(binary, mocker) -> None:  # noqa: ANN001
+    """Test `NgramHashingVectorizer` counts and batching."""
+    mocker.patch.object(features, "_BATCH_SIZE", 3)
+    n_features = 2**20
+    vect = features.NgramHashingVectorizer(
+        "char_wb",
+        (1, 3),
+        n_features=n_features,
+        binary=binary,
+    )
+    result = vect.fit_transform(TEXTS)
+    assert result.shape == (len(TEXTS), n_features)
+    counts = CountVectorizer(analyzer="char_wb", ngram_range=(1, 3))
+    expected = counts.fit_transform(TEXTS)
+    if binary:
+        assert np.all(result.data == 1)
+    else:
+        assert result.sum() == expected.sum()
+    assert np.array_equal(
+        np.asarray((result > 0).sum(axis=1)).ravel(),
+        np.asarray((expected > 0).sum(axis=1)).ravel(),
+    )
+
+
+# ======================================================================
+def test_ngram_hashing_vectorizer_string_input() -> None:
+    """Test `NgramHashingVectorizer` on a single string input."""
+    with pytest.raises(TypeError):
+        features.NgramHashingVectorizer().transform("ciao")
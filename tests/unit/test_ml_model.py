@@ -1 +1,100 @@
 """Test ML Model."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import cross_validate
+
+from italiclas.ml import model
+
+
+# ======================================================================
+@pytest.mark.parametrize("vectorizer", model.VECTORIZERS)
+def test_base_pipeline(vectorizer) -> None:  # noqa: ANN001
+    """Test `base_pipeline()`."""
+    pipeline = model.base_pipeline(vectorizer)
+    assert list(pipeline.named_steps) == ["vect", "clf"]
+
+
+# ======================================================================
+def test_base_pipeline_invalid() -> None:
+    """Test `base_pipeline()` with an unknown vectorizer."""
+    with pytest.raises(ValueError, match="Unknown vectorizer"):
+        model.base_pipeline("foo")  # type: ignore[arg-type]
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    ("size", "strategy", "expected"),
+    [
+        (None, "stratified", (20, 5)),
+        (10, "stratified", (8, 2)),
+        (0.2, "stratified", (4, 1)),
+        (100, "stratified", (20, 5)),
+        (8, "balanced", (4, 4)),
+        (20, "balanced", (10, 5)),
+    ],
+)
+def test_sample_subset(size, strategy, expected) -> None:  # noqa: ANN001
+    """Test `sample_subset()`."""
+    target = pd.Series([False] * 20 + [True] * 5)
+    data = model.TrainingData(target.index.astype(str).to_series(), target)
+    subset = model.sample_subset(data, size, strategy, seed=42)
+    counts = subset.target.value_counts()
+    assert (counts[False], counts[True]) == expected
+    # : the texts match their labels, in the original order
+    assert subset.features.astype(int).is_monotonic_increasing
+    assert (
+        target[subset.features.astype(int)].to_numpy() == subset.target
+    ).all()
+    # : the same seed gives the same subset
+    again = model.sample_subset(data, size, strategy, seed=42)
+    assert again.features.tolist() == subset.features.tolist()
+
+
+# ======================================================================
+def test_sample_subset_invalid() -> None:
+    """Test `sample_subset()` with an unknown strategy."""
+    data = model.TrainingData(pd.Series(["a"]), pd.Series([True]))
+    with pytest.raises(ValueError, match="Unknown sampling"):
+        model.sample_subset(data, 1, "foo")  # type: ignore[arg-type]
+
+
+# ======================================================================
+@pytest.mark.parametrize(("chunk_size", "max_rows"), [(7, None), (7, 10)])
+def test_iter_training_data(
+    chunk_size,  # noqa: ANN001
+    max_rows,  # noqa: ANN001
+    clean_filepath: Path,
+) -> None:
+    """Test `iter_training_data()`."""
+    data = pd.read_csv(clean_filepath, nrows=max_rows)
+    chunks = list(
+        model.iter_training_data(clean_filepath, chunk_size, max_rows),
+    )
+    assert all(len(chunk.features) <= chunk_size for chunk in chunks)
+    assert pd.concat([chunk.features for chunk in chunks]).tolist() == (
+        data["text"].tolist()
+    )
+
+
+# ======================================================================
+def test_compute_scores(clean_filepath: Path) -> None:
+    """Test `compute_scores()` against `cross_validate()`."""
+    scorings = ("accuracy", "f1", "roc_auc")
+    data = pd.read_csv(clean_filepath)
+    pipeline = model.base_pipeline().fit(data["text"], data["is_italian"])
+    result = model.compute_scores(pipeline, clean_filepath, scorings, 3)
+    expected = cross_validate(
+        model.base_pipeline(),
+        data["text"],
+        data["is_italian"],
+        scoring=scorings,
+        cv=3,
+    )
+    for scoring in scorings:
+        assert np.allclose(result.scores[scoring], expected[f"test_{scoring}"])
+    assert len(result.fit_times) == len(result.score_times) == 3  # noqa: PLR2004
+    assert len(result.featurize_times) == 3  # noqa: PLR2004
@@ -0,0 +1,62 @@
+"""Test ML Naive Bayes."""
+
+import numpy as np
+import pytest
+import scipy.sparse
+from sklearn.naive_bayes import MultinomialNB
+
+from italiclas.ml import naive_bayes
+
+CLASSES = np.array([False, True])
+
+
+# ======================================================================
+@pytest.fixture
+def data() -> tuple[scipy.sparse.csr_matrix, np.ndarray]:
+    """Fixture to create a sample document-term matrix and target."""
+    rng = np.random.default_rng(seed=42)
+    features = scipy.sparse.random(
+        40,
+        25,
+        density=0.2,
+        format="csr",
+        random_state=rng,
+        data_rvs=lambda size: rng.integers(1, 5, size),
+    )
+    target = rng.random(40) > 0.5  # noqa: PLR2004
+    return features, target
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    "params",
+    [{}, {"alpha": 0.1, "fit_prior": False}, {"class_prior": [0.3, 0.7]}],
+)
+def test_merged_counts_to_estimator(params, data) -> None:  # noqa: ANN001
+    """Test merging shard counts against a single fit."""
+    features, target = data
+    expected = MultinomialNB(**params).fit(features, target)
+    counts = naive_bayes.merge(
+        naive_bayes.count(features[i : i + 7], target[i : i + 7], CLASSES)
+        for i in range(0, features.shape[0], 7)
+    )
+    result = naive_bayes.to_estimator(counts, MultinomialNB(**params))
+    for name in (
+        "classes_",
+        "class_count_",
+        "feature_count_",
+        "class_log_prior_",
+        "feature_log_prob_",
+    ):
+        assert np.array_equal(getattr(result, name), getattr(expected, name))
+    assert np.array_equal(result.predict(features), expected.predict(features))
+
+
+# ======================================================================
+def test_counts_add_invalid(data) -> None:  # noqa: ANN001
+    """Test merging counts with different classes."""
+    features, target = data
+    counts = naive_bayes.count(features, target, CLASSES)
+    other = naive_bayes.count(features, target.astype(int), np.array([0, 2]))
+    with pytest.raises(ValueError, match="different classes"):
+        counts + other
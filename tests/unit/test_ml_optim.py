@@ -1 +1,137 @@
 """Test ML Optimization."""
+
+from pathlib import Path
+
+import pytest
+
+from italiclas.ml import optim, routing, search
+from italiclas.utils import core
+
+
+# ======================================================================
+def test_hyperparams(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `hyperparams()`."""
+    params_filepath = tmp_path / "params.pkl.lzma"
+    params = optim.hyperparams(
+        clean_filepath,
+        params_filepath,
+        cross_validation=2,
+        store_dirpath=tmp_path / "features",
+    )
+    assert params_filepath.is_file()
+    assert core.load_obj(params_filepath) == params
+    assert params["_scoring"] == "f1"
+    assert {"vect__analyzer", "clf__alpha"} <= set(params)
+    assert any((tmp_path / "features").iterdir())
+    assert not optim.checkpoint_filepath(params_filepath).exists()
+
+
+# ======================================================================
+def test_checkpoint_filepath_buckets() -> None:
+    """Test the buckets do not share the main search checkpoint."""
+    params_filepath = Path("ml/optim_params.pkl.lzma")
+    filepaths = {
+        optim.checkpoint_filepath(params_filepath),
+        optim.checkpoint_filepath(
+            routing.bucket_filepath(params_filepath, 0),
+        ),
+        optim.checkpoint_filepath(
+            routing.bucket_filepath(params_filepath, 1),
+        ),
+    }
+    assert len(filepaths) == 3  # noqa: PLR2004
+
+
+# ======================================================================
+def test_hyperparams_sample(
+    clean_filepath: Path,
+    tmp_path: Path,
+    mocker,  # noqa: ANN001
+) -> None:
+    """Test `hyperparams()` searching on a class-balanced subset."""
+    spy = mocker.spy(search, "search")
+    optim.hyperparams(
+        clean_filepath,
+        tmp_path / "params.pkl.lzma",
+        cross_validation=2,
+        store_dirpath=None,
+        max_candidates=2,
+        sample_size=20,
+        sample_strategy="balanced",
+    )
+    target = spy.call_args.args[3]
+    assert target.value_counts().to_dict() == {False: 10, True: 10}
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    ("previous_score", "strategies"),
+    [(0.0, ["grid"]), (2.0, ["grid", "random"])],
+)
+def test_hyperparams_warm_start(
+    previous_score: float,
+    strategies: list[str],
+    clean_filepath: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test `hyperparams()` warm start, widening if the score degrades."""
+    params_filepath = tmp_path / "params.pkl.lzma"
+    previous = {
+        "vect__analyzer": "char_wb",
+        "vect__ngram_range": (1, 3),
+        "vect__strip_accents": None,
+        "clf__alpha": 0.5,
+        "clf__fit_prior": True,
+        "_scoring": "f1",
+        "_score": previous_score,
+    }
+    core.save_obj(previous, params_filepath)
+    called = []
+    search_func = search.search
+
+    def _search(*args, strategy: str, **kws) -> search.SearchResult:  # noqa: ANN002, ANN003
+        called.append(strategy)
+        return search_func(*args, strategy=strategy, **kws)
+
+    monkeypatch.setattr(search, "search", _search)
+    params = optim.hyperparams(
+        clean_filepath,
+        params_filepath,
+        cross_validation=2,
+        store_dirpath=None,
+        strategy="random",
+        max_candidates=4,
+        warm_start=True,
+        force=True,
+    )
+    assert called == strategies
+    if strategies == ["grid"]:
+        assert params["vect__analyzer"] == "char_wb"
+    assert params["_score"] == core.load_obj(params_filepath)["_score"]
+
+
+# ======================================================================
+def test_hyperparams_pareto(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `hyperparams()` Pareto front and constrained selection."""
+    kws = {
+        "cross_validation": 2,
+        "store_dirpath": None,
+        "strategy": "grid",
+        "max_candidates": 12,
+        "force": True,
+    }
+    params = optim.hyperparams(clean_filepath, tmp_path / "a.pkl", **kws)
+    assert params["_pareto"]
+    assert (
+        max(point["score"] for point in params["_pareto"])
+        == (params["_score"])
+    )
+    max_size = min(point["size"] for point in params["_pareto"])
+    params = optim.hyperparams(
+        clean_filepath,
+        tmp_path / "b.pkl",
+        max_size=max_size,
+        **kws,
+    )
+    assert params["_size"] == max_size
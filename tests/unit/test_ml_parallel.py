@@ -0,0 +1,31 @@
+"""Test ML Parallel."""
+
+import pytest
+import threadpoolctl
+from joblib.parallel import get_active_backend
+
+from italiclas.ml import parallel
+
+
+# ======================================================================
+@pytest.mark.parametrize("backend", parallel.BACKENDS)
+def test_parallel_config(backend) -> None:  # noqa: ANN001
+    """Test `parallel_config()`."""
+    with parallel.parallel_config(2, backend):
+        active_backend, n_jobs = get_active_backend()
+        assert n_jobs == 2  # noqa: PLR2004
+        assert type(active_backend).__name__.lower() == f"{backend}backend"
+        assert all(
+            info["num_threads"] == 1
+            for info in threadpoolctl.threadpool_info()
+        )
+
+
+# ======================================================================
+def test_parallel_config_invalid() -> None:
+    """Test `parallel_config()` with an unknown backend."""
+    with (
+        pytest.raises(ValueError, match="Unknown backend"),
+        parallel.parallel_config(2, "foo"),  # type: ignore[arg-type]
+    ):
+        pass
@@ -0,0 +1,84 @@
+"""Test ML Pareto-optimal Model Selection."""
+
+from pathlib import Path
+
+import pandas as pd
+from sklearn.model_selection import ParameterGrid
+
+from italiclas.ml import model, pareto, search
+
+POINTS = [
+    pareto.Point({"name": "best"}, 0.99, 1e-3, 1000),
+    pareto.Point({"name": "fast"}, 0.95, 1e-4, 800),
+    pareto.Point({"name": "small"}, 0.90, 2e-4, 100),
+    pareto.Point({"name": "dominated"}, 0.90, 2e-4, 900),
+]
+
+
+# ======================================================================
+def test_pareto_front() -> None:
+    """Test `pareto_front()`."""
+    front = pareto.pareto_front(POINTS)
+    assert [point.params["name"] for point in front] == [
+        "best",
+        "fast",
+        "small",
+    ]
+
+
+# ======================================================================
+def test_select() -> None:
+    """Test `select()` under constraints."""
+    assert pareto.select(POINTS).params["name"] == "best"
+    assert pareto.select(POINTS, max_latency=5e-4).params["name"] == "fast"
+    assert pareto.select(POINTS, max_size=500).params["name"] == "small"
+    # : unfeasible constraints
+    assert pareto.select(POINTS, max_size=10).params["name"] == "best"
+
+
+# ======================================================================
+def test_profile(clean_filepath: Path) -> None:
+    """Test `profile()`."""
+    data = pd.read_csv(clean_filepath)
+    grid = {"vect__ngram_range": [(1, 1), (1, 3)], "clf__alpha": [0.1, 1.0]}
+    results = search.evaluate(
+        model.base_pipeline(),
+        ParameterGrid(grid),
+        data["text"],
+        data["is_italian"],
+        cross_validation=2,
+    )
+    points = pareto.profile(
+        model.base_pipeline(),
+        results,
+        data["text"],
+        data["is_italian"],
+        n_texts=10,
+    )
+    assert [point.params for point in points] == list(ParameterGrid(grid))
+    assert all(point.latency > 0 for point in points)
+    sizes = {point.params["vect__ngram_range"]: point.size for point in points}
+    assert sizes[1, 3] > sizes[1, 1]
+
+
+# ======================================================================
+def test_profile_rounds(clean_filepath: Path) -> None:
+    """Test `profile_rounds()` falls back to smaller rounds."""
+    data = pd.read_csv(clean_filepath)
+    small, large = ({"vect__ngram_range": (1, n)} for n in (1, 3))
+    results = [
+        search.CandidateResult(small, 10, {"f1": [0.8]}),
+        search.CandidateResult(large, 10, {"f1": [0.9]}),
+        search.CandidateResult(large, 30, {"f1": [0.7]}),
+    ]
+    args = (model.base_pipeline(), results, data["text"], data["is_italian"])
+    points = pareto.profile_rounds(*args, n_texts=10)
+    assert [point.params for point in points] == [large]
+    # : the final candidate is too large
+    max_size = points[0].size - 1
+    points = pareto.profile_rounds(*args, max_size=max_size, n_texts=10)
+    assert [point.params for point in points] == [small, large]
+    assert pareto.select(points, max_size=max_size).params == small
+    # : no feasible candidate
+    points = pareto.profile_rounds(*args, max_size=1, n_texts=10)
+    assert [point.params for point in points] == [large]
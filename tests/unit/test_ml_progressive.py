@@ -0,0 +1,105 @@
+"""Test ML Progressive Prediction."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+from italiclas.ml import model, progressive, routing
+
+
+# ======================================================================
+@pytest.fixture
+def pipeline(clean_filepath: Path) -> Pipeline:
+    """Get a pipeline trained on the clean data."""
+    data = pd.read_csv(clean_filepath)
+    return (
+        model.base_pipeline()
+        .set_params(vect__analyzer="word")
+        .fit(data["text"], data["is_italian"])
+    )
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    "text",
+    ["questa è una frase in italiano", "this is an English sentence"],
+)
+def test_predict_progressive(text: str, pipeline: Pipeline) -> None:
+    """Test `predict_progressive()` against the full prediction."""
+    result = progressive.predict_progressive(
+        pipeline,
+        text,
+        chunk_size=8,
+        margin=np.inf,
+        max_chars=None,
+        max_time=None,
+    )
+    jll = pipeline["clf"].predict_joint_log_proba(
+        pipeline["vect"].transform([text]),
+    )[0]
+    assert not result.exited_early
+    assert result.num_chars == len(text)
+    assert result.margin == pytest.approx(jll[1] - jll[0])
+    assert result.is_italian == pipeline.predict([text])[0]
+
+
+# ======================================================================
+def test_predict_progressive_early_exit(pipeline: Pipeline) -> None:
+    """Test `predict_progressive()` early exits."""
+    text = "questa è una frase in italiano " * 1000
+    result = progressive.predict_progressive(pipeline, text, chunk_size=100)
+    assert result.exited_early
+    assert result.is_italian
+    assert abs(result.margin) >= progressive.cfg.progressive_margin
+    result = progressive.predict_progressive(
+        pipeline,
+        text,
+        chunk_size=100,
+        margin=np.inf,
+        max_chars=1000,
+    )
+    assert result.exited_early
+    assert result.num_chars <= 1000  # noqa: PLR2004
+
+
+# ======================================================================
+def test_predict_router(
+    pipeline: Pipeline,
+    tmp_path: Path,
+    mocker,  # noqa: ANN001
+) -> None:
+    """Test `predict()` uses the length router long-texts pipeline."""
+    router = routing.LengthRouter([20], [clone(pipeline), pipeline])
+    router_filepath = tmp_path / "router.pkl.lzma"
+    router_filepath.touch()
+    mocker.patch.object(routing, "pre_trained_router", return_value=router)
+    mock = mocker.patch.object(progressive, "predict_progressive")
+    progressive.predict(
+        "questa è una frase in italiano",
+        tmp_path / "missing.pkl.lzma",
+        with_router=True,
+        router_filepath=router_filepath,
+    )
+    assert mock.call_args.args[0] is pipeline
+
+
+# ======================================================================
+def test_log_odds_weights(pipeline: Pipeline) -> None:
+    """Test `_log_odds_weights()` cache invalidation and lifetime."""
+    clf = clone(pipeline["clf"])
+    features = pipeline["vect"].transform(["questa è una frase", "a text"])
+    clf.fit(features, [True, False])
+    bias, weights = progressive._log_odds_weights(clf)  # noqa: SLF001
+    assert progressive._log_odds_weights(clf)[1] is weights  # noqa: SLF001
+    # : updated by partial fitting
+    clf.partial_fit(features[:1], [True])
+    new_bias, new_weights = progressive._log_odds_weights(clf)  # noqa: SLF001
+    assert new_bias > bias
+    assert not np.allclose(new_weights, weights)
+    # : the cache does not keep the classifier alive
+    del clf
+    assert not progressive._WEIGHTS  # noqa: SLF001
@@ -0,0 +1,93 @@
+"""Test ML Length-aware Model Routing."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from italiclas.ml import model, prediction, routing, training
+from italiclas.utils import core
+
+
+# ======================================================================
+def test_length_router_invalid() -> None:
+    """Test `LengthRouter` with mismatching bounds and pipelines."""
+    with pytest.raises(ValueError, match="Expected 2 pipelines"):
+        routing.LengthRouter([10], [model.base_pipeline()])
+
+
+# ======================================================================
+def test_length_router_predict(clean_filepath: Path) -> None:
+    """Test `LengthRouter.predict()` against the bucket pipelines."""
+    data = pd.read_csv(clean_filepath)
+    pipelines = [
+        model.base_pipeline()
+        .set_params(vect__analyzer=analyzer)
+        .fit(data["text"], data["is_italian"])
+        for analyzer in ("char", "word")
+    ]
+    router = routing.LengthRouter([20], pipelines)
+    texts = data["text"].to_numpy()
+    buckets = router.bucket(texts)
+    assert set(buckets) == {0, 1}
+    expected = np.where(
+        buckets == 0,
+        pipelines[0].predict(texts),
+        pipelines[1].predict(texts),
+    )
+    assert np.array_equal(router.predict(texts), expected)
+
+
+# ======================================================================
+def test_fit_router(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `fit_router()` tunes each bucket on its own grid."""
+    params_filepath = tmp_path / "params.pkl.lzma"
+    router = routing.fit_router(
+        clean_filepath,
+        params_filepath,
+        [20],
+        cross_validation=2,
+        store_dirpath=None,
+        strategy="random",
+        max_candidates=4,
+    )
+    assert router.bounds == [20]
+    analyzers = [pipeline["vect"].analyzer for pipeline in router.pipelines]
+    assert analyzers[0] in {"char", "char_wb"}
+    assert analyzers[1] == "word"
+    for i in range(2):
+        assert routing.bucket_filepath(params_filepath, i).is_file()
+
+
+# ======================================================================
+def test_train_predict_router(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `train()` and `predict()` with the length router."""
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    router_filepath = tmp_path / "router.pkl.lzma"
+    params_filepath = tmp_path / "params.pkl.lzma"
+    # : skip the optimizations
+    for filepath in (
+        params_filepath,
+        *(routing.bucket_filepath(params_filepath, i) for i in range(2)),
+    ):
+        core.save_obj({}, filepath)
+    training.train(
+        clean_filepath,
+        pipeline_filepath,
+        params_filepath,
+        store_dirpath=None,
+        with_router=True,
+        router_filepath=router_filepath,
+    )
+    assert router_filepath.is_file()
+    for text, expected in (("ciao mondo", True), ("hello world", False)):
+        assert (
+            prediction.predict(
+                text,
+                pipeline_filepath,
+                with_router=True,
+                router_filepath=router_filepath,
+            )
+            == expected
+        )
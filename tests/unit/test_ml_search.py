@@ -0,0 +1,289 @@
+"""Test ML Search."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+from sklearn.model_selection import ParameterGrid, cross_validate
+
+from italiclas.ml import checkpoint, model, parallel, search
+
+PARAM_GRID = {
+    "vect__analyzer": ["char", "word"],
+    "clf__alpha": [0.1, 1.0],
+    "clf__fit_prior": [True, False],
+}
+N_SPLITS = 3
+
+
+# ======================================================================
+@pytest.mark.parametrize("backend", ["loky", "threading"])
+def test_evaluate(backend, clean_filepath: Path) -> None:  # noqa: ANN001
+    """Test `evaluate()` against `cross_validate()`."""
+    data = pd.read_csv(clean_filepath)
+    pipeline = model.base_pipeline()
+    candidates = list(ParameterGrid(PARAM_GRID))
+    cache = search.FeatureCache()
+    with parallel.parallel_config(2, backend):
+        results = search.evaluate(
+            pipeline,
+            candidates,
+            data["text"],
+            data["is_italian"],
+            scorings=["f1", "accuracy"],
+            cross_validation=N_SPLITS,
+            cache=cache,
+        )
+    assert len(cache) == (2 * N_SPLITS if backend == "threading" else 0)
+    for params, result in zip(candidates, results, strict=True):
+        assert result.params == params
+        assert len(result.fit_times) == len(result.score_times) == N_SPLITS
+        assert len(result.featurize_times) == N_SPLITS
+        assert all(time > 0 for time in result.featurize_times)
+        expected = cross_validate(
+            pipeline.set_params(**params),
+            data["text"],
+            data["is_italian"],
+            scoring=["f1", "accuracy"],
+            cv=N_SPLITS,
+        )
+        for scoring in ("f1", "accuracy"):
+            assert np.allclose(
+                result.scores[scoring],
+                expected[f"test_{scoring}"],
+            )
+
+
+# ======================================================================
+def test_feature_cache() -> None:
+    """Test `FeatureCache` LRU eviction."""
+    matrix = scipy.sparse.csr_matrix(np.eye(10))
+    size = search._nbytes(matrix)  # noqa: SLF001
+    cache = search.FeatureCache(max_bytes=2 * size)
+    cache.put("a", (matrix,))
+    cache.put("b", (matrix,))
+    assert cache.get("a") is not None
+    cache.put("c", (matrix,))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.nbytes == 2 * size
+
+
+# ======================================================================
+def test_feature_cache_reuse(clean_filepath: Path) -> None:
+    """Test `FeatureCache` hits across batches, not on subsamples."""
+    data = pd.read_csv(clean_filepath)
+    cache = search.FeatureCache()
+    search.sequential_search(
+        model.base_pipeline(),
+        search.sample_candidates(PARAM_GRID),
+        data["text"],
+        data["is_italian"],
+        cross_validation=2,
+        batch_size=1,
+        cache=cache,
+    )
+    # : 2 vectorizers x 2 folds, reused by the 3 other classifiers each
+    assert (cache.misses, cache.hits, len(cache)) == (4, 12, 4)
+    cache = search.FeatureCache()
+    result = search.successive_halving(
+        model.base_pipeline(),
+        list(ParameterGrid(PARAM_GRID)),
+        data["text"],
+        data["is_italian"],
+        cross_validation=2,
+        factor=2,
+        cache=cache,
+    )
+    assert result.best.n_samples < len(data)
+    assert cache.misses == cache.hits == len(cache) == 0
+
+
+# ======================================================================
+def test_successive_halving(clean_filepath: Path) -> None:
+    """Test `successive_halving()`."""
+    data = pd.read_csv(clean_filepath)
+    result = search.successive_halving(
+        model.base_pipeline(),
+        list(ParameterGrid(PARAM_GRID)),
+        data["text"],
+        data["is_italian"],
+        cross_validation=2,
+        factor=2,
+    )
+    n_samples = [item.n_samples for item in result.results]
+    assert n_samples == sorted(n_samples)
+    assert n_samples[-1] > n_samples[0]
+    last = [item for item in result.results if item.n_samples == n_samples[-1]]
+    assert result.best.mean_score() == max(item.mean_score() for item in last)
+    assert result.stop_reason == "completed"
+    # : stopped after the first iteration
+    budget = search.Budget(max_time=1e-9)
+    budget.start()
+    result = search.successive_halving(
+        model.base_pipeline(),
+        list(ParameterGrid(PARAM_GRID)),
+        data["text"],
+        data["is_italian"],
+        cross_validation=2,
+        factor=2,
+        budget=budget,
+    )
+    assert result.stop_reason == "time"
+    first, best = result.results[-2:]
+    assert best.params == first.params
+    assert (first.n_samples, best.n_samples) == (n_samples[0], len(data))
+
+
+# ======================================================================
+@pytest.mark.parametrize("strategy", search.STRATEGIES)
+def test_search(strategy, clean_filepath: Path) -> None:  # noqa: ANN001
+    """Test `search()` strategies."""
+    data = pd.read_csv(clean_filepath)
+    result = search.search(
+        model.base_pipeline(),
+        PARAM_GRID,
+        data["text"],
+        data["is_italian"],
+        strategy=strategy,
+        cross_validation=2,
+        budget=search.Budget(max_candidates=5),
+    )
+    assert len({repr(item.params) for item in result.results}) == 5  # noqa: PLR2004
+    assert result.best in result.results
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        search.search(
+            model.base_pipeline(),
+            PARAM_GRID,
+            data["text"],
+            data["is_italian"],
+            strategy="unknown",
+        )
+    with pytest.raises(ValueError, match="Patience is not supported"):
+        search.search(
+            model.base_pipeline(),
+            PARAM_GRID,
+            data["text"],
+            data["is_italian"],
+            strategy="halving",
+            budget=search.Budget(patience=1),
+        )
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    ("budget", "stop_reason", "n_results"),
+    [
+        (search.Budget(), "completed", 8),
+        (search.Budget(patience=1, tol=1.0), "patience", 2),
+        (search.Budget(max_time=1e-9), "time", 2),
+    ],
+)
+def test_sequential_search(
+    budget: search.Budget,
+    stop_reason: str,
+    n_results: int,
+    clean_filepath: Path,
+) -> None:
+    """Test `sequential_search()` early stopping."""
+    data = pd.read_csv(clean_filepath)
+    budget.start()
+    result = search.sequential_search(
+        model.base_pipeline(),
+        search.sample_candidates(PARAM_GRID),
+        data["text"],
+        data["is_italian"],
+        cross_validation=2,
+        budget=budget,
+        batch_size=2,
+    )
+    assert result.stop_reason == stop_reason
+    assert len(result.results) == n_results
+    assert result.best.mean_score() == max(
+        item.mean_score() for item in result.results
+    )
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    "search_func",
+    [search.sequential_search, search.successive_halving],
+)
+def test_search_no_candidates(search_func, clean_filepath: Path) -> None:  # noqa: ANN001
+    """Test the search strategies reject empty candidates."""
+    data = pd.read_csv(clean_filepath)
+    with pytest.raises(ValueError, match="No candidates"):
+        search_func(
+            model.base_pipeline(),
+            [],
+            data["text"],
+            data["is_italian"],
+        )
+
+
+# ======================================================================
+def test_search_budget_shared(clean_filepath: Path) -> None:
+    """Test `search()` does not restart a shared time budget."""
+    data = pd.read_csv(clean_filepath)
+    budget = search.Budget(max_time=1e-9)
+    kws = {"strategy": "grid", "cross_validation": 2, "budget": budget}
+    args = (
+        model.base_pipeline(),
+        PARAM_GRID,
+        data["text"],
+        data["is_italian"],
+    )
+    search.search(*args, **kws)
+    begin_time = budget.begin_time
+    assert budget.is_time_over()
+    search.search(*args, **kws)
+    assert budget.begin_time == begin_time
+
+
+# ======================================================================
+def test_evaluate_checkpoint(
+    clean_filepath: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test `evaluate()` resuming from a checkpoint."""
+    data = pd.read_csv(clean_filepath)
+    candidates = list(ParameterGrid(PARAM_GRID))
+    search_checkpoint = checkpoint.Checkpoint(tmp_path / "checkpoint.jsonl")
+    kws = {"cross_validation": N_SPLITS, "checkpoint": search_checkpoint}
+    expected = search.evaluate(
+        model.base_pipeline(),
+        candidates,
+        data["text"],
+        data["is_italian"],
+        **kws,
+    )
+    lines = search_checkpoint.filepath.read_text().splitlines()
+    assert len(lines) == len(candidates) * N_SPLITS
+    # : simulate an interrupted evaluation
+    search_checkpoint.filepath.write_text("\n".join(lines[:5]) + "\n")
+    result = search.evaluate(
+        model.base_pipeline(),
+        candidates,
+        data["text"],
+        data["is_italian"],
+        **kws,
+    )
+    assert [item.scores for item in result] == [
+        item.scores for item in expected
+    ]
+    # : nothing left to evaluate
+    monkeypatch.setattr(search, "_evaluate_task", None)
+    result = search.evaluate(
+        model.base_pipeline(),
+        candidates,
+        data["text"],
+        data["is_italian"],
+        **kws,
+    )
+    assert [item.scores for item in result] == [
+        item.scores for item in expected
+    ]
@@ -0,0 +1,81 @@
+"""Test ML Segment-level Prediction."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+
+from italiclas.ml import model, segmentation
+
+
+# ======================================================================
+@pytest.fixture
+def pipeline(clean_filepath: Path) -> Pipeline:
+    """Get a pipeline trained on the clean data."""
+    data = pd.read_csv(clean_filepath)
+    return model.base_pipeline().fit(data["text"], data["is_italian"])
+
+
+# ======================================================================
+@pytest.mark.parametrize("mode", segmentation.SEGMENTATIONS)
+def test_split_segments(mode: str) -> None:
+    """Test `split_segments()` covers all non-blank text."""
+    text = "Prima frase.  Seconda frase!\n\n  Third sentence?  "
+    spans = segmentation.split_segments(text, mode, window_size=10)
+    assert all(text[start:end].strip() for start, end in spans)
+    words = [word for start, end in spans for word in text[start:end].split()]
+    assert words == text.split()
+
+
+# ======================================================================
+def test_split_segments_invalid() -> None:
+    """Test `split_segments()` with an unknown mode."""
+    with pytest.raises(ValueError, match="Unknown segmentation"):
+        segmentation.split_segments("ciao", "paragraph")
+
+
+# ======================================================================
+@pytest.mark.parametrize("vectorizer", ["count", "hashing"])
+def test_classify_parallel(
+    vectorizer: str,
+    clean_filepath: Path,
+    mocker,  # noqa: ANN001
+) -> None:
+    """Test `classify()` in parallel against the sequential result."""
+    data = pd.read_csv(clean_filepath)
+    pipeline = model.base_pipeline(vectorizer)
+    pipeline.fit(data["text"], data["is_italian"])
+    spy = mocker.spy(segmentation.parallel, "parallel_config")
+    texts = ["ciao a tutti", "hello world", "come va?", "how are you?"] * 5
+    expected = segmentation.classify(pipeline, texts, n_jobs=1)
+    result = segmentation.classify(pipeline, texts, n_jobs=2, min_parallel=1)
+    assert np.allclose(result, expected)
+    if vectorizer == "hashing":
+        # : the pipeline is shared by threads (releasing the GIL)
+        spy.assert_called_once_with(2, "threading")
+    else:
+        spy.assert_not_called()
+    assert np.allclose(expected, pipeline.predict_proba(texts)[:, 1])
+    assert segmentation.classify(pipeline, []).shape == (0,)
+
+
+# ======================================================================
+def test_predict_segments(pipeline: Pipeline) -> None:
+    """Test `predict_segments()` on a mixed-language text."""
+    texts = ["questa è una frase in italiano.", "this is an English sentence."]
+    text = " ".join(texts)
+    result = segmentation.predict_segments(pipeline, text)
+    labels = pipeline.predict(texts)
+    assert [text[s.start : s.end] for s in result.segments] == texts
+    assert [s.is_italian for s in result.segments] == list(labels)
+    italian = sum(
+        len(segment)
+        for segment, label in zip(texts, labels, strict=True)
+        if label
+    )
+    assert result.italian_fraction == pytest.approx(
+        italian / sum(map(len, texts)),
+    )
+    assert segmentation.predict_segments(pipeline, " ").italian_fraction == 0
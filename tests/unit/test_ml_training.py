@@ -1 +1,112 @@
 """Test ML Training."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from italiclas.ml import model, naive_bayes, training
+from italiclas.utils import core
+
+
+# ======================================================================
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_fit_streaming(
+    n_jobs,  # noqa: ANN001
+    clean_filepath: Path,
+    mocker,  # noqa: ANN001
+) -> None:
+    """Test `fit_streaming()` against fitting on the full dataset."""
+    spy = mocker.spy(naive_bayes, "merge")
+    data = pd.read_csv(clean_filepath)
+    expected = model.base_pipeline("hashing").fit(
+        data["text"],
+        data["is_italian"],
+    )
+    result = training.fit_streaming(
+        model.base_pipeline("hashing"),
+        clean_filepath,
+        chunk_size=7,
+        n_jobs=n_jobs,
+    )
+    for name in (
+        "class_count_",
+        "feature_count_",
+        "class_log_prior_",
+        "feature_log_prob_",
+    ):
+        assert np.array_equal(
+            getattr(result["clf"], name),
+            getattr(expected["clf"], name),
+        )
+    # : the shard counts are folded into a running total
+    assert all(len(call.args[0]) == 2 for call in spy.call_args_list)  # noqa: PLR2004
+    assert spy.call_count == (0 if n_jobs == 1 else len(data) // 7)
+
+
+# ======================================================================
+def test_train_streaming(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `train()` in streaming mode."""
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    result = training.train(
+        clean_filepath,
+        pipeline_filepath,
+        tmp_path / "params.pkl.lzma",
+        streaming=True,
+        chunk_size=10,
+    )
+    assert pipeline_filepath.is_file()
+    assert result.predict(["ciao mondo"]).tolist() == [True]
+
+
+# ======================================================================
+def test_profile_training(clean_filepath: Path) -> None:
+    """Test `profile_training()`."""
+    result = training.profile_training(clean_filepath, (10, 20), 5)
+    assert [(item["size"], item["mode"]) for item in result] == [
+        (10, "full"),
+        (10, "streaming"),
+        (20, "full"),
+        (20, "streaming"),
+    ]
+    assert all(item["memory"] > 0 for item in result)
+
+
+# ======================================================================
+def test_train_feature_store(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `train()` reusing the feature store."""
+    params_filepath = tmp_path / "params.pkl.lzma"
+    params_filepath.parent.mkdir(parents=True, exist_ok=True)
+    core.save_obj({"vect__analyzer": "char_wb"}, params_filepath)
+    kws = {
+        "params_filepath": params_filepath,
+        "store_dirpath": tmp_path / "features",
+        "force": True,
+    }
+    expected = training.train(
+        clean_filepath,
+        tmp_path / "expected.pkl.lzma",
+        **kws,
+    )
+    num_entries = len(list((tmp_path / "features").iterdir()))
+    result = training.train(
+        clean_filepath,
+        tmp_path / "result.pkl.lzma",
+        **kws,
+    )
+    assert len(list((tmp_path / "features").iterdir())) == num_entries == 1
+    assert np.array_equal(
+        result["clf"].feature_log_prob_,
+        expected["clf"].feature_log_prob_,
+    )
+
+
+# ======================================================================
+def test_profile_dedup(clean_filepath: Path) -> None:
+    """Test `profile_dedup()`."""
+    result = training.profile_dedup(clean_filepath, chunk_size=25)
+    assert [item["mode"] for item in result] == ["none", "exact", "near"]
+    assert result[0]["size"] == result[1]["size"] == 60  # noqa: PLR2004
+    assert result[2]["size"] < result[1]["size"]
+    assert all(item["time"] > 0 for item in result)
@@ -0,0 +1,236 @@
+"""Test ML Updating."""
+
+import concurrent.futures
+import functools
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from italiclas.etl import clean_data, clean_store
+from italiclas.ml import model, training, updating
+from italiclas.utils import core
+
+
+# ======================================================================
+@pytest.mark.parametrize("is_store", [False, True])
+def test_update(
+    is_store: bool,  # noqa: FBT001
+    clean_filepath: Path,
+    tmp_path: Path,
+) -> None:
+    """Test `update()` against fitting on the full dataset."""
+    data = pd.read_csv(clean_filepath)
+    old_data, new_data = data.iloc[:30], data.iloc[30:]
+    if is_store:
+        new_data_filepath = tmp_path / "new_data"
+        clean_store.CleanStore(new_data_filepath).append(
+            new_data["text"],
+            new_data["is_italian"],
+        )
+    else:
+        new_data_filepath = tmp_path / "new_data.csv"
+        new_data.to_csv(new_data_filepath, index=False)
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    pipeline = model.base_pipeline("hashing")
+    pipeline.fit(old_data["text"], old_data["is_italian"])
+    core.save_obj(pipeline, pipeline_filepath)
+    expected = model.base_pipeline("hashing")
+    expected.fit(data["text"], data["is_italian"])
+
+    result_filepath = updating.update(new_data_filepath, pipeline_filepath)
+
+    assert result_filepath.is_file()
+    assert result_filepath != pipeline_filepath
+    for filepath in (result_filepath, pipeline_filepath):
+        result = core.load_obj(filepath)
+        assert np.array_equal(
+            result["clf"].feature_count_,
+            expected["clf"].feature_count_,
+        )
+        assert np.array_equal(
+            result["clf"].feature_log_prob_,
+            expected["clf"].feature_log_prob_,
+        )
+
+
+# ======================================================================
+def _update_slice(
+    start: int,
+    clean_filepath: Path,
+    pipeline_filepath: Path,
+) -> Path:
+    """Update the pipeline with 10 clean data rows (in any process)."""
+    data = pd.read_csv(clean_filepath)
+    return updating.update_with(
+        data["text"][start : start + 10],
+        data["is_italian"][start : start + 10],
+        pipeline_filepath,
+        keep_versions=2,
+    )
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    "executor_cls",
+    [
+        concurrent.futures.ThreadPoolExecutor,
+        concurrent.futures.ProcessPoolExecutor,
+    ],
+)
+def test_update_with_concurrent(
+    executor_cls,  # noqa: ANN001
+    clean_filepath: Path,
+    tmp_path: Path,
+) -> None:
+    """Test concurrent `update_with()` calls are all applied."""
+    data = pd.read_csv(clean_filepath)
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    pipeline = model.base_pipeline("hashing")
+    pipeline.fit(data["text"][:10], data["is_italian"][:10])
+    core.save_obj(pipeline, pipeline_filepath)
+    starts = range(10, len(data), 10)
+
+    with executor_cls(len(starts)) as executor:
+        list(
+            executor.map(
+                functools.partial(
+                    _update_slice,
+                    clean_filepath=clean_filepath,
+                    pipeline_filepath=pipeline_filepath,
+                ),
+                starts,
+            ),
+        )
+
+    result = core.load_obj(pipeline_filepath)
+    assert result["clf"].class_count_.sum() == len(data)
+    versions = sorted(tmp_path.glob("pipeline.*.pkl.lzma"))
+    assert len(versions) == 2  # noqa: PLR2004
+    assert core.load_obj(versions[-1])["clf"].class_count_.sum() == len(data)
+    assert (
+        sorted(
+            path.name
+            for path in tmp_path.iterdir()
+            if path.name.startswith(".")
+        )
+        == []
+    )
+
+
+# ======================================================================
+@pytest.mark.parametrize("derived", ["cascade", "router"])
+def test_update_with_derived(
+    derived: str,
+    clean_filepath: Path,
+    tmp_path: Path,
+) -> None:
+    """Test `update_with()` refuses to leave derived artifacts stale."""
+    data = pd.read_csv(clean_filepath)
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    pipeline = model.base_pipeline("hashing")
+    pipeline.fit(data["text"], data["is_italian"])
+    core.save_obj(pipeline, pipeline_filepath)
+    derived_filepath = tmp_path / f"{derived}.pkl.lzma"
+    derived_filepath.touch()
+    kws = {
+        f"with_{derived}": True,
+        f"{derived}_filepath": derived_filepath,
+    }
+    with pytest.raises(ValueError, match="Retrain instead"):
+        updating.update_with(["ciao"], [True], pipeline_filepath, **kws)
+    kws[f"with_{derived}"] = False
+    updating.update_with(["ciao"], [True], pipeline_filepath, **kws)
+
+
+# ======================================================================
+def test_prune_versions(tmp_path: Path) -> None:
+    """Test `prune_versions()`."""
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    versions = [f"2024010{i}T000000000000Z" for i in range(1, 5)]
+    for name in (
+        pipeline_filepath.name,
+        "pipeline.bucket0.pkl.lzma",
+        *(f"pipeline.{version}.pkl.lzma" for version in versions),
+    ):
+        (tmp_path / name).touch()
+    assert updating.prune_versions(pipeline_filepath, 0) == []
+    removed = updating.prune_versions(pipeline_filepath, 3)
+    assert removed == [tmp_path / f"pipeline.{versions[0]}.pkl.lzma"]
+    assert len(list(tmp_path.iterdir())) == 5  # noqa: PLR2004
+
+
+# ======================================================================
+def test_update_invalid_data(clean_df, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `update()` on invalid data."""
+    data_filepath = tmp_path / "new_data.csv"
+    clean_df.drop(columns=["is_italian"]).to_csv(data_filepath, index=False)
+    with pytest.raises(ValueError, match="Invalid new data input"):
+        updating.update(data_filepath, tmp_path / "pipeline.pkl.lzma")
+
+
+# ======================================================================
+def test_update_delta(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `update_delta()` against fitting on the full dataset."""
+    data = pd.read_csv(clean_filepath)
+    raw_data = data.rename(columns={"text": "Text"})
+    raw_data["Language"] = raw_data.pop("is_italian").map(
+        {True: "Italian", False: "English"},
+    )
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    raw_data.iloc[:30].to_csv(tmp_path / "raw.csv", index=False)
+    clean_data.processor("raw.csv", "clean", tmp_path, force=True)
+    with pytest.raises(ValueError, match="delta unavailable"):
+        updating.update_delta(tmp_path / "clean", pipeline_filepath)
+    pipeline = model.base_pipeline("hashing")
+    pipeline.fit(data["text"][:30], data["is_italian"][:30])
+    core.save_obj(pipeline, pipeline_filepath)
+    raw_data.to_csv(tmp_path / "raw.csv", index=False)
+    clean_data.processor("raw.csv", "clean", tmp_path, force=True)
+    expected = model.base_pipeline("hashing")
+    expected.fit(data["text"], data["is_italian"])
+
+    updating.update_delta(tmp_path / "clean", pipeline_filepath)
+
+    result = core.load_obj(pipeline_filepath)
+    assert np.array_equal(
+        result["clf"].feature_count_,
+        expected["clf"].feature_count_,
+    )
+    assert result.delta_id_ == clean_data.delta_id(tmp_path / "clean")
+    # : the same delta is not applied twice
+    with pytest.raises(ValueError, match="already applied"):
+        updating.update_delta(tmp_path / "clean", pipeline_filepath)
+    assert np.array_equal(
+        core.load_obj(pipeline_filepath)["clf"].feature_count_,
+        expected["clf"].feature_count_,
+    )
+
+
+# ======================================================================
+def test_update_delta_trained(clean_filepath: Path, tmp_path: Path) -> None:
+    """Test `update_delta()` refuses the delta included in the training."""
+    raw_data = pd.read_csv(clean_filepath).rename(columns={"text": "Text"})
+    raw_data["Language"] = raw_data.pop("is_italian").map(
+        {True: "Italian", False: "English"},
+    )
+    raw_data.iloc[:30].to_csv(tmp_path / "raw.csv", index=False)
+    clean_data.processor("raw.csv", "clean", tmp_path, force=True)
+    raw_data.to_csv(tmp_path / "raw.csv", index=False)
+    clean_data.processor("raw.csv", "clean", tmp_path, force=True)
+    pipeline_filepath = tmp_path / "pipeline.pkl.lzma"
+    params_filepath = tmp_path / "params.pkl.lzma"
+    # : skip the optimization
+    core.save_obj({}, params_filepath)
+    training.train(
+        tmp_path / "clean",
+        pipeline_filepath,
+        params_filepath,
+        store_dirpath=None,
+        with_cascade=False,
+        with_router=False,
+        force=True,
+    )
+    with pytest.raises(ValueError, match="already applied"):
+        updating.update_delta(tmp_path / "clean", pipeline_filepath)
@@ -0,0 +1,77 @@
+"""Test ML Vocabulary."""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.exceptions import NotFittedError
+from sklearn.feature_extraction.text import CountVectorizer
+
+from italiclas.ml import vocabulary
+
+TEXTS = ["Ciao Mondo, come va?", "hello world", "perché sì, ça va 😀"]
+
+
+# ======================================================================
+def test_compact_vocabulary() -> None:
+    """Test `CompactVocabulary` lookups."""
+    terms = ["è", "ciao", "a", "😀", "ab", "ciao"]
+    vocab = vocabulary.CompactVocabulary.from_terms(terms)
+    expected = sorted(set(terms))
+    assert len(vocab) == len(expected)
+    assert list(vocab) == expected
+    assert vocab.lookup(expected).tolist() == list(range(len(expected)))
+    assert vocab.lookup(["b", "", "ciao!"]).tolist() == [-1, -1, -1]
+    assert vocab["ab"] == expected.index("ab")
+    assert "hello" not in vocab
+    with pytest.raises(KeyError):
+        vocab["hello"]
+
+
+# ======================================================================
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_compact_vocabulary_save_load(mmap_mode, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `CompactVocabulary` save and (memory-mapped) load."""
+    vocab = vocabulary.CompactVocabulary.from_terms(["ciao", "mondo"])
+    vocab.save(tmp_path)
+    loaded = vocabulary.CompactVocabulary.load(tmp_path, mmap_mode)
+    assert isinstance(loaded.data, np.memmap) is (mmap_mode is not None)
+    assert list(loaded) == list(vocab)
+    assert loaded.lookup(["mondo", "ciao"]).tolist() == [1, 0]
+
+
+# ======================================================================
+@pytest.mark.parametrize("analyzer", ["char", "char_wb", "word"])
+@pytest.mark.parametrize("binary", [True, False])
+def test_compact_count_vectorizer(analyzer, binary) -> None:  # noqa: ANN001
+    """Test `CompactCountVectorizer` against `CountVectorizer`."""
+    kws = {"analyzer": analyzer, "ngram_range": (1, 3), "binary": binary}
+    expected_vect = CountVectorizer(**kws).fit(TEXTS)
+    vect = vocabulary.CompactCountVectorizer(**kws).fit(TEXTS)
+    assert not hasattr(vect, "vocabulary_")
+    vect = pickle.loads(pickle.dumps(vect))  # noqa: S301
+    inputs = [*TEXTS, "testo nuovo", ""]
+    result = vect.transform(inputs)
+    expected = expected_vect.transform(inputs)
+    assert result.shape == expected.shape
+    assert (result != expected).nnz == 0
+    assert np.array_equal(
+        vect.get_feature_names_out(),
+        expected_vect.get_feature_names_out(),
+    )
+
+
+# ======================================================================
+def test_compact_count_vectorizer_not_fitted() -> None:
+    """Test `CompactCountVectorizer` raises if not fitted."""
+    with pytest.raises(NotFittedError):
+        vocabulary.CompactCountVectorizer().transform(TEXTS)
+
+
+# ======================================================================
+def test_benchmark() -> None:
+    """Test `benchmark()`."""
+    terms = [f"term{i}" for i in range(1000)]
+    result = vocabulary.benchmark(terms)
+    assert result["compact_bytes"] < result["dict_bytes"]
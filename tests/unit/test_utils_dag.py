@@ -0,0 +1,185 @@
+"""Test Dependency-tracking Pipeline Runner."""
+
+import collections
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from italiclas.utils import dag
+
+
+# ======================================================================
+def _copier(
+    calls: collections.Counter,
+    name: str,
+    sources: list[Path],
+    target: Path,
+) -> Callable[[], None]:
+    """Get a stage function concatenating the sources into the target."""
+
+    def _func() -> None:
+        calls[name] += 1
+        target.write_text("".join(path.read_text() for path in sources))
+
+    return _func
+
+
+# ======================================================================
+@pytest.fixture
+def diamond(tmp_path: Path) -> tuple[dag.Pipeline, collections.Counter]:
+    """Fixture to create a diamond pipeline: a -> (b, c) -> d."""
+    calls: collections.Counter = collections.Counter()
+    source = tmp_path / "source.txt"
+    source.write_text("x")
+    paths = {name: tmp_path / f"{name}.txt" for name in "abcd"}
+    io = {
+        "a": [source],
+        "b": [paths["a"]],
+        "c": [paths["a"]],
+        "d": [paths["b"], paths["c"]],
+    }
+    stages = [
+        dag.Stage(
+            name,
+            _copier(calls, name, inputs, paths[name]),
+            inputs=inputs,
+            outputs=[paths[name]],
+        )
+        for name, inputs in io.items()
+    ]
+    return dag.Pipeline(stages, tmp_path / "state.json"), calls
+
+
+# ======================================================================
+def test_file_digest(tmp_path: Path) -> None:
+    """Test `file_digest()` of files and directories."""
+    assert dag.file_digest(tmp_path / "missing") is None
+    dirpath = tmp_path / "store"
+    dirpath.mkdir()
+    (dirpath / "a.bin").write_bytes(b"abc")
+    cache: dict = {}
+    digest = dag.file_digest(dirpath, cache)
+    assert list(cache) == [str(dirpath / "a.bin")]
+    # : hidden (temporary) files are ignored
+    (dirpath / ".a.bin.tmp").write_bytes(b"x")
+    assert dag.file_digest(dirpath, cache) == digest
+    (dirpath / "a.bin").write_bytes(b"abd")
+    assert dag.file_digest(dirpath, cache) != digest
+
+
+# ======================================================================
+def test_run(diamond, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `Pipeline.run()` reruns only the stale stages."""
+    pipeline, calls = diamond
+    results = pipeline.run()
+    names = [result.name for result in results]
+    assert (names[0], names[-1]) == ("a", "d")
+    assert all(result.is_run for result in results)
+    assert (tmp_path / "d.txt").read_text() == "xx"
+    assert set(calls.values()) == {1}
+    # : nothing changed
+    assert not any(result.is_run for result in pipeline.run())
+    # : an output changed (with the same size and modification time)
+    filepath = tmp_path / "c.txt"
+    stat = filepath.stat()
+    filepath.write_text("y")
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    # : only this stage runs, since it restores the same output
+    results = pipeline.run()
+    assert [result.name for result in results if result.is_run] == ["c"]
+    # : the source changed
+    (tmp_path / "source.txt").write_text("z")
+    pipeline.run()
+    assert (tmp_path / "d.txt").read_text() == "zz"
+    assert calls == {"a": 2, "b": 2, "c": 3, "d": 2}
+    # : the source was rewritten with the same content
+    (tmp_path / "source.txt").write_text("z")
+    assert not any(result.is_run for result in pipeline.run())
+    # : forced (and only a target with its dependencies)
+    results = pipeline.run(["b"], force=True)
+    assert [result.name for result in results] == ["a", "b"]
+
+
+# ======================================================================
+def test_run_adopt(diamond, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test `Pipeline.run()` adopts up-to-date untracked outputs."""
+    pipeline, calls = diamond
+    pipeline.run()
+    pipeline.state_filepath.unlink()
+    # : make the last output outdated
+    (tmp_path / "c.txt").write_text("x")
+    results = pipeline.run()
+    assert [result.name for result in results if result.is_run] == ["d"]
+    assert calls["d"] == 2  # noqa: PLR2004
+
+
+# ======================================================================
+def test_run_parallel(tmp_path: Path) -> None:
+    """Test `Pipeline.run()` runs independent stages in parallel."""
+    barrier = threading.Barrier(2, timeout=10)
+    stages = [
+        dag.Stage(name, barrier.wait, outputs=[tmp_path / name])
+        for name in ("a", "b")
+    ]
+    results = dag.Pipeline(stages, tmp_path / "state.json").run()
+    assert sorted(result.name for result in results) == ["a", "b"]
+
+
+# ======================================================================
+def test_run_error(tmp_path: Path) -> None:
+    """Test `Pipeline.run()` stops at a failing stage."""
+
+    def _fail() -> None:
+        msg = "Stage failure"
+        raise RuntimeError(msg)
+
+    calls: collections.Counter = collections.Counter()
+    stages = [
+        dag.Stage("a", _fail, outputs=[tmp_path / "a.txt"]),
+        dag.Stage(
+            "b",
+            _copier(calls, "b", [tmp_path / "a.txt"], tmp_path / "b.txt"),
+            inputs=[tmp_path / "a.txt"],
+            outputs=[tmp_path / "b.txt"],
+        ),
+    ]
+    with pytest.raises(RuntimeError, match="Stage failure"):
+        dag.Pipeline(stages, tmp_path / "state.json").run()
+    assert not calls
+
+
+# ======================================================================
+@pytest.mark.parametrize(
+    ("io", "match"),
+    [
+        ({"a": ([], ["x"]), "b": ([], ["x"])}, "Duplicate output"),
+        ({"a": (["y"], ["x"]), "b": (["x"], ["y"])}, "Cyclic stages"),
+    ],
+)
+def test_pipeline_invalid(io: dict, match: str, tmp_path: Path) -> None:
+    """Test `Pipeline()` with invalid stages."""
+    stages = [
+        dag.Stage(
+            name,
+            lambda: None,
+            inputs=[tmp_path / path for path in inputs],
+            outputs=[tmp_path / path for path in outputs],
+        )
+        for name, (inputs, outputs) in io.items()
+    ]
+    with pytest.raises(ValueError, match=match):
+        dag.Pipeline(stages, tmp_path / "state.json")
+    with pytest.raises(ValueError, match="Duplicate stage"):
+        dag.Pipeline(stages[:1] * 2, tmp_path / "state.json")
+
+
+# ======================================================================
+def test_upstream(diamond) -> None:  # noqa: ANN001
+    """Test `Pipeline.upstream()`."""
+    pipeline, _ = diamond
+    assert pipeline.upstream(["c"]) == {"a", "c"}
+    with pytest.raises(ValueError, match="Unknown stage"):
+        pipeline.upstream(["e"])